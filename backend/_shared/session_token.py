@@ -0,0 +1,248 @@
+'''
+Short-lived signed session tokens.
+
+Vendored into login, ai-chat and simple-ai by tools/sync_shared.py.
+
+    token, expires = issue(7, role='user', tariff='unlimited')    # login only
+    session = verify(token)         # Session, or raises InvalidToken
+    session = authenticate(event)   # Authorization: Bearer ...; None without a
+                                    # token, RequestError(401) for a bad one
+
+A token is v1.<kid>.<payload>.<signature>. The payload is base64url JSON
+{"sub", "role", "tariff", "iat", "exp", "jti"}; the signature is
+HMAC-SHA256 of everything before it under the key named kid. SESSION_KEYS
+holds "kid:secret" pairs separated by commas: the first one signs, all of
+them verify. To rotate, put a new key first, and drop the old one once
+TTL_SECONDS have passed.
+
+Verifying is a split, one HMAC, a base64 and a JSON decode, and two dict
+lookups in the revocation cache: a few microseconds and no I/O. Revoked
+token ids and users (every token issued before a moment) are kept in memory
+only until the tokens involved would have expired anyway. With DATABASE_URL,
+a daemon thread reads new rows of session_revocations every
+REVOCATION_SYNC_SECONDS, so a logout reaches every instance within that.
+Ids are handed out before commit, so a row can become visible after one
+with a higher id was read: each sync reads the last REVOCATION_REREAD_ROWS
+ids again and skips the rows it already has.
+SESSION_REQUIRED=true makes authenticate() refuse requests without a token.
+'''
+import base64
+import hashlib
+import hmac
+import math
+import os
+import secrets
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from runtime import RequestError, dumps, frozen_error, loads
+
+TTL_SECONDS = int(os.environ.get('SESSION_TTL_SECONDS') or 900)
+REVOCATION_SYNC_SECONDS = float(os.environ.get('SESSION_REVOCATION_SYNC_SECONDS') or 5)
+REQUIRED = os.environ.get('SESSION_REQUIRED') == 'true'
+# clock difference between instances tolerated on iat
+LEEWAY_SECONDS = 30
+MAX_REVOCATIONS = 100000
+REVOCATION_REREAD_ROWS = 1000
+VERSION = 'v1'
+
+UNAUTHORIZED = frozen_error(401, 'Invalid or expired session')
+LOGIN_REQUIRED = frozen_error(401, 'Login required')
+
+REVOCATIONS_SQL = '''
+SELECT id, jti, user_id, EXTRACT(EPOCH FROM revoked_at), EXTRACT(EPOCH FROM expires_at)
+FROM session_revocations
+WHERE id > %s AND expires_at > CURRENT_TIMESTAMP
+ORDER BY id
+'''
+
+_clock = time.time
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class Session:
+    __slots__ = ('user_id', 'role', 'tariff', 'issued_at', 'expires_at', 'token_id')
+
+    def __init__(self, claims: Dict[str, Any]):
+        self.user_id: int = claims['sub']
+        self.role: str = claims['role']
+        self.tariff: str = claims['tariff']
+        self.issued_at: int = claims['iat']
+        self.expires_at: int = claims['exp']
+        self.token_id: str = claims['jti']
+
+
+_keys: Optional[Dict[str, bytes]] = None
+_signing_kid: Optional[str] = None
+
+
+def keys() -> Dict[str, bytes]:
+    '''kid -> secret from SESSION_KEYS, parsed on first use.'''
+    global _keys, _signing_kid
+    if _keys is None:
+        parsed: Dict[str, bytes] = {}
+        for pair in (os.environ.get('SESSION_KEYS') or '').split(','):
+            kid, _, secret = pair.strip().partition(':')
+            if kid and secret:
+                parsed[kid] = secret.encode('utf-8')
+        _signing_kid = next(iter(parsed), None)
+        _keys = parsed
+    return _keys
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(secret: bytes, signed: str) -> str:
+    return _b64encode(hmac.new(secret, signed.encode('ascii'), hashlib.sha256).digest())
+
+
+def issue(user_id: int, role: str, tariff: str, ttl: int = TTL_SECONDS) -> Tuple[str, int]:
+    '''Signed token for the user and its expiry (unix seconds). Raises InvalidToken without SESSION_KEYS.'''
+    secret = keys().get(_signing_kid or '')
+    if secret is None:
+        raise InvalidToken('SESSION_KEYS not configured')
+    now = int(_clock())
+    claims = {'sub': int(user_id), 'role': role, 'tariff': tariff, 'iat': now, 'exp': now + ttl,
+              'jti': secrets.token_urlsafe(12)}
+    signed = f'{VERSION}.{_signing_kid}.{_b64encode(dumps(claims).encode("utf-8"))}'
+    return f'{signed}.{_sign(secret, signed)}', claims['exp']
+
+
+def verify(token: str) -> Session:
+    # a real token is base64url and dots; compare_digest and the ascii encode reject anything else
+    if not token.isascii():
+        raise InvalidToken('malformed token')
+    parts = token.split('.')
+    if len(parts) != 4 or parts[0] != VERSION:
+        raise InvalidToken('malformed token')
+    secret = keys().get(parts[1])
+    if secret is None:
+        raise InvalidToken('unknown key')
+    signed = token[:token.rindex('.')]
+    if not hmac.compare_digest(_sign(secret, signed).encode('ascii'), parts[3].encode('ascii')):
+        raise InvalidToken('bad signature')
+    try:
+        session = Session(loads(_b64decode(parts[2])))
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken('bad payload')
+    now = _clock()
+    if session.expires_at <= now or session.issued_at > now + LEEWAY_SECONDS:
+        raise InvalidToken('expired')
+    if _revoked_tokens.get(session.token_id) or session.issued_at < _revoked_users.get(session.user_id, (0, 0))[0]:
+        raise InvalidToken('revoked')
+    if _syncer is None and os.environ.get('DATABASE_URL'):
+        _start()
+    return session
+
+
+def bearer(event: Dict[str, Any]) -> Optional[str]:
+    headers = event.get('headers') or {}
+    value = headers.get('Authorization') or headers.get('authorization') or ''
+    if value[:7].lower() != 'bearer ':
+        return None
+    return value[7:].strip() or None
+
+
+def authenticate(event: Dict[str, Any]) -> Optional[Session]:
+    '''Session of the request; None without a token unless SESSION_REQUIRED. Raises RequestError(401).'''
+    token = bearer(event)
+    if token is None:
+        if REQUIRED:
+            raise RequestError(LOGIN_REQUIRED)
+        return None
+    try:
+        return verify(token)
+    except InvalidToken:
+        raise RequestError(UNAUTHORIZED)
+
+
+# jti -> expires at; user id -> (tokens issued before this whole second are revoked, entry expires at)
+_revoked_tokens: Dict[str, float] = {}
+_revoked_users: Dict[int, Tuple[float, float]] = {}
+_last_revocation_id = 0
+# ids read above _last_revocation_id - REVOCATION_REREAD_ROWS, which the next sync reads again
+_recent_revocation_ids: Set[int] = set()
+_lock = threading.Lock()
+_syncer: Optional[threading.Thread] = None
+
+
+def remember_revocation(token_id: Optional[str], user_id: Optional[int], revoked_at: float,
+                        expires_at: float) -> None:
+    '''Adds a revocation to this instance's cache (login does this for its own logouts right away).'''
+    with _lock:
+        if token_id:
+            _revoked_tokens[token_id] = expires_at
+        if user_id:
+            # iat is in whole seconds: a token issued later in the second of the logout
+            # (logging straight back in) has iat == floor(revoked_at) and stays valid
+            before = max(math.floor(revoked_at), _revoked_users.get(user_id, (0, 0))[0])
+            _revoked_users[user_id] = (before, max(expires_at, _revoked_users.get(user_id, (0, 0))[1]))
+        if len(_revoked_tokens) + len(_revoked_users) > MAX_REVOCATIONS:
+            _prune(_clock())
+
+
+def _prune(now: float) -> None:
+    for token_id in [t for t, expires in _revoked_tokens.items() if expires <= now]:
+        del _revoked_tokens[token_id]
+    for user_id in [u for u, (_, expires) in _revoked_users.items() if expires <= now]:
+        del _revoked_users[user_id]
+
+
+def sync_revocations(conn: Any) -> int:
+    '''Loads revocations added since the last call; returns how many.'''
+    global _last_revocation_id
+    with conn, conn.cursor() as cur:
+        cur.execute(REVOCATIONS_SQL, (max(0, _last_revocation_id - REVOCATION_REREAD_ROWS),))
+        rows = cur.fetchall()
+    added = 0
+    for row_id, token_id, user_id, revoked_at, expires_at in rows:
+        if row_id in _recent_revocation_ids:
+            continue
+        _recent_revocation_ids.add(row_id)
+        remember_revocation(token_id, user_id, float(revoked_at), float(expires_at))
+        _last_revocation_id = max(_last_revocation_id, row_id)
+        added += 1
+    floor = _last_revocation_id - REVOCATION_REREAD_ROWS
+    _recent_revocation_ids.difference_update([row_id for row_id in _recent_revocation_ids if row_id <= floor])
+    with _lock:
+        _prune(_clock())
+    return added
+
+
+def _run() -> None:
+    conn = None
+    while True:
+        try:
+            if conn is None or conn.closed:
+                import psycopg2
+                conn = psycopg2.connect(os.environ['DATABASE_URL'])
+            sync_revocations(conn)
+        except Exception as e:
+            print(dumps({'session_revocation_sync_error': str(e)}), file=sys.stderr, flush=True)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+        time.sleep(REVOCATION_SYNC_SECONDS)
+
+
+def _start() -> None:
+    global _syncer
+    with _lock:
+        if _syncer is not None:
+            return
+        _syncer = threading.Thread(target=_run, name='session-revocations', daemon=True)
+    _syncer.start()
@@ -0,0 +1,180 @@
+'''
+Rule-based Russian/English stemming for query routing.
+
+Vendored into simple-ai and ai-chat by tools/sync_shared.py.
+
+Russian follows the Snowball algorithm (RV/R2 regions, gerund, reflexive,
+adjectival, verb and noun endings, then и / ость / нн / ь clean-up).
+English is a light suffix stripper: plurals, -ed, -ing, -ly. Neither needs
+a dictionary, and stem() memoizes word -> stem, so a warm process pays one
+dict lookup per word.
+
+    stem('уравнения')          # 'уравнен'
+    query_stems('Что такое гравитация?')   # {'что', 'так', 'гравитац'}
+'''
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+WORD_RE = re.compile(r'[a-zа-яё]+')
+
+RU_VOWELS = frozenset('аеиоуыэюя')
+
+# (endings that must follow а/я, endings without a condition); longest match wins
+PERFECTIVE_GERUND = (('в', 'вши', 'вшись'), ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+ADJECTIVE = ((), ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+                  'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею'))
+PARTICIPLE = (('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь',
+         'нно'),
+        ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен',
+         'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'))
+NOUN = ((), ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей', 'ой',
+             'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию',
+             'ью', 'ю', 'ия', 'ья', 'я'))
+SUPERLATIVE = ((), ('ейше', 'ейш'))
+DERIVATIONAL = ((), ('ость', 'ост'))
+
+
+def _ordered(group: Tuple[Tuple[str, ...], Tuple[str, ...]]) -> List[Tuple[str, bool]]:
+    endings = [(e, True) for e in group[0]] + [(e, False) for e in group[1]]
+    return sorted(endings, key=lambda item: -len(item[0]))
+
+
+_PERFECTIVE_GERUND = _ordered(PERFECTIVE_GERUND)
+_ADJECTIVE = _ordered(ADJECTIVE)
+_PARTICIPLE = _ordered(PARTICIPLE)
+_REFLEXIVE = _ordered(REFLEXIVE)
+_VERB = _ordered(VERB)
+_NOUN = _ordered(NOUN)
+_SUPERLATIVE = _ordered(SUPERLATIVE)
+_DERIVATIONAL = _ordered(DERIVATIONAL)
+
+
+def _strip(word: str, start: int, endings: List[Tuple[str, bool]]) -> Optional[str]:
+    '''Removes the longest ending that lies in word[start:], or returns None.'''
+    for ending, after_a in endings:
+        cut = len(word) - len(ending)
+        if cut < start or not word.endswith(ending):
+            continue
+        if after_a and (cut - 1 < start or word[cut - 1] not in 'ая'):
+            return None
+        return word[:cut]
+    return None
+
+
+def _regions(word: str) -> Tuple[int, int]:
+    '''Start of RV and of R2 (Snowball definitions).'''
+    rv = len(word)
+    for i, ch in enumerate(word):
+        if ch in RU_VOWELS:
+            rv = i + 1
+            break
+    r1 = r2 = len(word)
+    for i in range(1, len(word)):
+        if word[i] not in RU_VOWELS and word[i - 1] in RU_VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in RU_VOWELS and word[i - 1] in RU_VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def stem_ru(word: str) -> str:
+    word = word.replace('ё', 'е')
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    stripped = _strip(word, rv, _PERFECTIVE_GERUND)
+    if stripped is None:
+        word = _strip(word, rv, _REFLEXIVE) or word
+        stripped = _strip(word, rv, _ADJECTIVE)
+        if stripped is not None:
+            stripped = _strip(stripped, rv, _PARTICIPLE) or stripped
+        else:
+            stripped = _strip(word, rv, _VERB)
+            if stripped is None:
+                stripped = _strip(word, rv, _NOUN)
+    if stripped is not None:
+        word = stripped
+
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    derived = _strip(word, max(rv, r2), _DERIVATIONAL)
+    if derived is not None:
+        word = derived
+
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    superlative = _strip(word, rv, _SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+        return word[:-1] if word.endswith('нн') and len(word) - 2 >= rv else word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
+
+
+def stem_en(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    for suffix in ('ingly', 'edly', 'ing', 'ed', 'ly'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            base = word[:-len(suffix)]
+            if any(ch in 'aeiouy' for ch in base):
+                if len(base) > 2 and base[-1] == base[-2] and base[-1] not in 'lsz':
+                    base = base[:-1]
+                return base
+    return word
+
+
+# function words and request phrasing ("объясни простыми словами") that say
+# nothing about the topic; dropped by content_stems()
+STOP_WORDS = '''
+а без более бы был была были было быть в вам вас весь во вот все всего всех вы где да даже для до его
+ее если есть еще же за здесь и из или им их к как какая какие какой когда кратко кто ли либо мне
+может можно мой мы на над надо не него нее нет ни них но ну о об объясни около он она они оно от очень
+по под помоги пожалуйста после потом почему при про простыми просто раз расскажи с сам свой себя
+слова словами со так такое такой там тебе тем теме тему то тоже только ты у уже хочу чем через что
+чтобы эта эти это этот я класса класс кратко виды вид его
+a an and are as at be but by can do does for from how i in is it me of on or please tell that the
+this to was what when where which who why with you about explain
+'''
+_stop_stems: FrozenSet[str] = frozenset()
+
+_cache: Dict[str, str] = {}
+CACHE_SIZE = 50000
+
+
+def stem(word: str) -> str:
+    '''Stem of a lower-case word, Russian or English by its first letter.'''
+    cached = _cache.get(word)
+    if cached is not None:
+        return cached
+    result = stem_en(word) if word[0] < 'а' else stem_ru(word)
+    if len(_cache) < CACHE_SIZE:
+        _cache[word] = result
+    return result
+
+
+def query_stems(text: str) -> FrozenSet[str]:
+    '''Stems of every word in a lower-case text.'''
+    return frozenset(stem(word) for word in WORD_RE.findall(text))
+
+
+def content_stems(text: str) -> List[str]:
+    '''Stems of the words in a lower-case text that can name a topic, in order.'''
+    global _stop_stems
+    if not _stop_stems:
+        _stop_stems = frozenset(stem(word) for word in STOP_WORDS.split())
+    return [s for s in map(stem, WORD_RE.findall(text)) if s not in _stop_stems]
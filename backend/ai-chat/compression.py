@@ -0,0 +1,123 @@
+'''
+Accept-Encoding negotiation and response compression.
+
+Vendored by tools/sync_shared.py into the functions that return long texts.
+
+    encoding = negotiate(event)
+    ...
+    return compress_response(json_response(200, data), encoding)
+
+Bodies shorter than COMPRESS_MIN_CHARS (env, default 1024) are sent as-is:
+below roughly one packet, compression costs CPU and saves no round trips.
+Compressed bodies are base64 text with isBase64Encoded set, which is how the
+platform expects binary responses. brotli is used when the package is
+installed and the client asks for it, gzip otherwise.
+
+Constant bodies (simple-ai static answers) are the same str object on every
+request, so compress_static() keeps their compressed form in an LRU cache and
+each one is compressed once per process at the highest level.
+'''
+import base64
+import os
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+MIN_CHARS = int(os.environ.get('COMPRESS_MIN_CHARS') or 1024)
+
+GZIP_LEVEL = 6
+GZIP_STATIC_LEVEL = 9
+BROTLI_QUALITY = 5
+BROTLI_STATIC_QUALITY = 11
+
+# brotli is optional; resolved on the first request that offers br
+_brotli: Any = None
+_brotli_resolved = False
+
+_negotiated: Dict[str, Optional[str]] = {}
+
+
+def _resolve_brotli() -> Any:
+    global _brotli, _brotli_resolved
+    try:
+        import brotli
+        _brotli = brotli
+    except ImportError:
+        _brotli = None
+    _brotli_resolved = True
+    return _brotli
+
+
+def parse_accept_encoding(value: str) -> Optional[str]:
+    '''Best supported coding for an Accept-Encoding value, or None for identity.'''
+    weights: Dict[str, float] = {}
+    for part in value.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params[:2].lower() == 'q=':
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if coding:
+            weights[coding] = q
+    wildcard = weights.get('*', 0.0)
+    supported = ['br', 'gzip'] if (_brotli if _brotli_resolved else _resolve_brotli()) else ['gzip']
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def negotiate(event: Dict[str, Any]) -> Optional[str]:
+    headers = event.get('headers') or {}
+    value = headers.get('Accept-Encoding') or headers.get('accept-encoding')
+    if not value:
+        return None
+    encoding = _negotiated.get(value, '')
+    if encoding == '':
+        encoding = parse_accept_encoding(value)
+        if len(_negotiated) < 256:
+            _negotiated[value] = encoding
+    return encoding
+
+
+def compress_body(body: str, encoding: str, static: bool = False) -> str:
+    '''Compresses a text body and returns it base64-encoded.'''
+    raw = body.encode('utf-8')
+    if encoding == 'br':
+        packed = _brotli.compress(raw, quality=BROTLI_STATIC_QUALITY if static else BROTLI_QUALITY)
+    else:
+        packer = zlib.compressobj(GZIP_STATIC_LEVEL if static else GZIP_LEVEL, zlib.DEFLATED, 31)
+        packed = packer.compress(raw) + packer.flush()
+    return base64.b64encode(packed).decode('ascii')
+
+
+@lru_cache(maxsize=256)
+def compress_static(body: str, encoding: str) -> str:
+    return compress_body(body, encoding, static=True)
+
+
+def compress_response(response: Dict[str, Any], encoding: Optional[str], static: bool = False) -> Dict[str, Any]:
+    '''
+    Business: Compresses a JSON response for the negotiated encoding when its body is large enough
+    Args: response - dict from json_response/encoded_response (headers are a private copy)
+          encoding - result of negotiate(); None leaves the body as-is
+          static - body is a constant str, compress it once and reuse
+    Returns: the same response dict
+    '''
+    body = response['body']
+    if len(body) < MIN_CHARS:
+        return response
+    headers = response['headers']
+    headers['Vary'] = 'Accept-Encoding'
+    if encoding is None:
+        return response
+    response['body'] = compress_static(body, encoding) if static else compress_body(body, encoding)
+    response['isBase64Encoded'] = True
+    headers['Content-Encoding'] = encoding
+    return response
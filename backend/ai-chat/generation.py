@@ -0,0 +1,128 @@
+'''
+Per-class generation profiles for ai-chat, and latency per class.
+
+    name, profile = choose(message)      # query_class.classify() -> PROFILES entry
+    ... client.chat.completions.create(model=profile['model'], max_tokens=profile['max_tokens'], ...)
+    observe(name, latency_ms, completion_tokens, truncated)
+    latency_report()                     # p50/p95/max per class, for GET ?view=latency
+
+Generation time grows with the answer, so a greeting or a definition gets a
+small max_tokens, a cheaper model where that is enough, and a hint in the
+system prompt that asks for a short answer (the cap alone would cut the
+answer mid-sentence). Essays get a long cap, math and code a low temperature.
+
+AI_CHAT_PROFILES overrides fields of the defaults with a JSON object, e.g.
+
+    {"definition": {"max_tokens": 300}, "essay": {"model": "gpt-4o"}}
+
+An unknown class or field, or a value out of range, raises ValueError at
+import, so a typo fails the deploy instead of being ignored.
+'''
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from query_class import CLASSES, classify
+from runtime import loads
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    'greeting': {
+        'model': 'gpt-4.1-nano', 'max_tokens': 150, 'temperature': 0.7,
+        'hint': {'ru': 'Ответь коротко и дружелюбно, в 1–2 предложениях.',
+                 'en': 'Reply briefly and warmly, in 1–2 sentences.'},
+    },
+    'question': {
+        'model': 'gpt-4o-mini', 'max_tokens': 500, 'temperature': 0.7,
+        'hint': {'ru': 'Ответь по существу, не длиннее нескольких абзацев.',
+                 'en': 'Answer to the point, in a few paragraphs at most.'},
+    },
+    'definition': {
+        'model': 'gpt-4o-mini', 'max_tokens': 500, 'temperature': 0.5,
+        'hint': {'ru': 'Дай определение и один пример, не длиннее 150 слов.',
+                 'en': 'Give the definition and one example, at most 150 words.'},
+    },
+    'math': {'model': 'gpt-4o-mini', 'max_tokens': 1000, 'temperature': 0.2, 'hint': {}},
+    'code': {'model': 'gpt-4o-mini', 'max_tokens': 1500, 'temperature': 0.2, 'hint': {}},
+    'essay': {'model': 'gpt-4o-mini', 'max_tokens': 3000, 'temperature': 0.8, 'hint': {}},
+    'general': {'model': 'gpt-4o-mini', 'max_tokens': 1000, 'temperature': 0.7, 'hint': {}},
+}
+
+MAX_TOKENS_LIMIT = 16000
+# latencies kept per class for the percentiles
+WINDOW = int(os.environ.get('AI_CHAT_LATENCY_WINDOW') or 1024)
+
+
+def _apply_overrides(raw: str) -> None:
+    overrides = loads(raw)
+    if not isinstance(overrides, dict):
+        raise ValueError('AI_CHAT_PROFILES must be a JSON object')
+    for name, fields in overrides.items():
+        if name not in PROFILES or not isinstance(fields, dict):
+            raise ValueError(f'AI_CHAT_PROFILES: unknown class {name!r}')
+        for field in fields:
+            if field not in PROFILES[name]:
+                raise ValueError(f'AI_CHAT_PROFILES: unknown field {name}.{field}')
+        profile = dict(PROFILES[name], **fields)
+        if not isinstance(profile['model'], str) or not profile['model']:
+            raise ValueError(f'AI_CHAT_PROFILES: {name}.model must be a model name')
+        if not isinstance(profile['max_tokens'], int) or not 1 <= profile['max_tokens'] <= MAX_TOKENS_LIMIT:
+            raise ValueError(f'AI_CHAT_PROFILES: {name}.max_tokens must be 1..{MAX_TOKENS_LIMIT}')
+        if not isinstance(profile['temperature'], (int, float)) or not 0 <= profile['temperature'] <= 2:
+            raise ValueError(f'AI_CHAT_PROFILES: {name}.temperature must be 0..2')
+        if not isinstance(profile['hint'], dict):
+            raise ValueError(f'AI_CHAT_PROFILES: {name}.hint must map language to text')
+        PROFILES[name] = profile
+
+
+if os.environ.get('AI_CHAT_PROFILES'):
+    _apply_overrides(os.environ['AI_CHAT_PROFILES'])
+
+
+def choose(message: str) -> Tuple[str, Dict[str, Any]]:
+    name = classify(message)
+    return name, PROFILES[name]
+
+
+def system_prompt(base: str, profile: Dict[str, Any], language: str) -> str:
+    hint = profile['hint'].get(language) or profile['hint'].get('en')
+    return f'{base}\n\n{hint}' if hint else base
+
+
+_lock = threading.Lock()
+# class -> [requests, errors, truncated, completion_tokens, latency_ms_max]
+_totals: Dict[str, List[float]] = {}
+_latencies: Dict[str, Deque[float]] = {}
+
+
+def observe(name: str, latency_ms: float, completion_tokens: int = 0, truncated: bool = False,
+            error: bool = False) -> None:
+    with _lock:
+        totals = _totals.get(name)
+        if totals is None:
+            totals = _totals[name] = [0, 0, 0, 0, 0.0]
+            _latencies[name] = deque(maxlen=WINDOW)
+        totals[0] += 1
+        totals[1] += error
+        totals[2] += truncated
+        totals[3] += completion_tokens
+        totals[4] = max(totals[4], latency_ms)
+        if not error:
+            _latencies[name].append(latency_ms)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 1) if ordered else 0.0
+
+
+def latency_report() -> List[Dict[str, Any]]:
+    '''Per-class counts and latency percentiles of this instance since start (last WINDOW calls).'''
+    with _lock:
+        rows = [(name, list(totals), sorted(_latencies[name])) for name, totals in _totals.items()]
+    return [
+        {'class': name, 'model': PROFILES[name]['model'], 'maxTokens': PROFILES[name]['max_tokens'],
+         'requests': int(totals[0]), 'errors': int(totals[1]), 'truncated': int(totals[2]),
+         'avgCompletionTokens': round(totals[3] / max(totals[0] - totals[1], 1), 1),
+         'p50Ms': _percentile(ordered, 0.5), 'p95Ms': _percentile(ordered, 0.95), 'maxMs': round(totals[4], 1)}
+        for name, totals, ordered in sorted(rows, key=lambda row: CLASSES.index(row[0]))
+    ]
@@ -1,57 +1,81 @@
-import json
+import hmac
+import math
 import os
-from openai import OpenAI
+import time
 
+from runtime import (
+    JSON_HEADERS, METHOD_NOT_ALLOWED, RequestError, error_response, frozen_error,
+    json_response, parse_json_body, preflight
+)
+from compression import compress_response, negotiate
+from profiling import profiled
+from ratelimit import RateLimiter
+from session_token import authenticate
+from timing import span, traced
+import chat_log
+import generation
+import upstream_pool
+import usage
+
+OPTIONS_RESPONSE = preflight('GET, POST, OPTIONS')
+MESSAGE_REQUIRED = frozen_error(400, 'Message is required')
+API_KEY_MISSING = frozen_error(500, 'OpenAI API key not configured')
+FORBIDDEN = frozen_error(403, 'Forbidden')
+UNKNOWN_VIEW = frozen_error(400, 'view must be top-spenders, daily-cost, latency or upstreams')
+BAD_RANGE = frozen_error(400, 'since/until must be ISO dates, at most a year apart')
+BAD_LIMIT = frozen_error(400, 'limit must be a number from 1 to 100')
+DATABASE_MISSING = frozen_error(503, 'DATABASE_URL not configured')
+
+REPORT_VIEWS = ('top-spenders', 'daily-cost', 'latency', 'upstreams')
+# requests per minute; every allowed request costs an OpenAI call
+LIMITER = RateLimiter('ai-chat', {'ip': 60, 'free': 20, 'unlimited': 120, 'admin': None})
+
+@traced
+@profiled
 def handler(event, context):
     '''
-    Business: AI chat endpoint using OpenAI GPT-4
-    Args: event with httpMethod, body containing message, userId, language
+    Business: AI chat endpoint using OpenAI GPT-4; GET returns the token/cost report for admins
+    Args: event with httpMethod, body containing message, userId, language;
+          optional Authorization: Bearer session token from the login function
+          (session users' exchanges are kept in chat-history)
+          (GET: queryStringParameters view, since, until, limit and X-Admin-Token header)
     Returns: AI response in JSON format
     '''
     method = event.get('httpMethod', 'POST')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
+        return OPTIONS_RESPONSE()
+    
+    if method == 'GET':
+        return usage_report(event)
     
     if method != 'POST':
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Method not allowed'})
-        }
+        return METHOD_NOT_ALLOWED()
     
-    body_data = json.loads(event.get('body', '{}'))
+    try:
+        with span('parse'):
+            body_data = parse_json_body(event)
+        session = authenticate(event)
+    except RequestError as e:
+        return e.response()
+    rejected = LIMITER.check(event, body_data.get('userId'), session)
+    if rejected:
+        return rejected
+    # a session names the user for certain; a bare userId is the client's word
+    user_id = session.user_id if session else body_data.get('userId')
     user_message = body_data.get('message', '')
     language = body_data.get('language', 'ru')
     
     if not user_message:
-        return {
-            'statusCode': 400,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Message is required'})
-        }
+        return MESSAGE_REQUIRED()
     
-    api_key = os.environ.get('OPENAI_API_KEY')
-    if not api_key:
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'OpenAI API key not configured'})
-        }
+    upstreams = upstream_pool.pool()
+    if upstreams is None:
+        return API_KEY_MISSING()
     
     try:
-        client = OpenAI(api_key=api_key)
-        
-        system_prompt = (
+        profile_name, profile = generation.choose(user_message)
+        base_prompt = (
             "Ты NeuroPulse — умный AI-ассистент для студентов и школьников.\n\n"
             "ТВОЯ ЗАДАЧА:\n"
             "- Помогать с учёбой: решать задачи по математике, физике, химии, программированию\n"
@@ -91,28 +115,94 @@ def handler(event, context):
             "IMPORTANT: Never say 'I don't know' — always offer a solution or alternative approach."
         )
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=1000,
-            temperature=0.7
-        )
+        system_prompt = generation.system_prompt(base_prompt, profile, language)
+        # what the upstream counts against the token budget: ~4 characters per prompt token plus the cap
+        estimated_tokens = (len(system_prompt) + len(user_message)) // 4 + profile['max_tokens']
+        started = time.perf_counter()
+        try:
+            with span('openai'):
+                response = upstreams.create(
+                    estimated_tokens,
+                    model=profile['model'],
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_message}
+                    ],
+                    max_tokens=profile['max_tokens'],
+                    temperature=profile['temperature']
+                )
+        except Exception:
+            latency_ms = (time.perf_counter() - started) * 1000
+            generation.observe(profile_name, latency_ms, error=True)
+            usage.record(user_id, profile['model'], language, latency_ms=latency_ms, error=True)
+            raise
         
+        latency_ms = (time.perf_counter() - started) * 1000
+        tokens = response.usage
+        completion_tokens = tokens.completion_tokens if tokens else 0
+        generation.observe(profile_name, latency_ms, completion_tokens,
+                           truncated=response.choices[0].finish_reason == 'length')
+        usage.record(user_id, profile['model'], language,
+                     tokens.prompt_tokens if tokens else 0, completion_tokens, latency_ms)
         ai_response = response.choices[0].message.content
+        if session and ai_response:
+            chat_log.record(session.user_id, user_message, ai_response)
         
-        return {
-            'statusCode': 200,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'isBase64Encoded': False,
-            'body': json.dumps({'response': ai_response})
-        }
+        with span('serialize'):
+            return compress_response(json_response(200, {'response': ai_response}), negotiate(event))
         
+    except upstream_pool.PoolBusy as e:
+        retry_after = max(1, math.ceil(e.retry_after))
+        return json_response(503, {'error': 'AI service is busy, please retry', 'retryAfter': retry_after},
+                             {**JSON_HEADERS, 'Retry-After': str(retry_after)})
+    except Exception as e:
+        return error_response(500, f'AI error: {str(e)}')
+
+def usage_report(event):
+    '''Top spenders or daily cost from ai_usage_daily, or per-class latency / upstream state; needs X-Admin-Token = USAGE_ADMIN_TOKEN.'''
+    token = os.environ.get('USAGE_ADMIN_TOKEN') or ''
+    headers = event.get('headers') or {}
+    supplied = headers.get('X-Admin-Token') or headers.get('x-admin-token') or ''
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        return FORBIDDEN()
+    
+    params = event.get('queryStringParameters') or {}
+    view = params.get('view')
+    if view not in REPORT_VIEWS:
+        return UNKNOWN_VIEW()
+    if view in ('latency', 'upstreams'):
+        # per instance and in memory: no database needed
+        upstreams = upstream_pool.pool()
+        rows = generation.latency_report() if view == 'latency' else upstreams.snapshot() if upstreams else []
+        return json_response(200, {'view': view, 'rows': rows})
+    try:
+        since, until = usage.report_range(params.get('since'), params.get('until'))
+    except ValueError:
+        return BAD_RANGE()
+    try:
+        limit = int(params.get('limit') or 20)
+    except ValueError:
+        return BAD_LIMIT()
+    if not 1 <= limit <= 100:
+        return BAD_LIMIT()
+    
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        return DATABASE_MISSING()
+    
+    try:
+        # this instance's pending counts first, so the report includes them
+        usage.flush()
+        import psycopg2
+        conn = psycopg2.connect(dsn)
+        try:
+            if view == 'top-spenders':
+                rows = usage.top_spenders(conn, since, until, limit)
+            else:
+                rows = usage.daily_cost(conn, since, until)
+        finally:
+            conn.close()
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': f'AI error: {str(e)}'})
-        }
\ No newline at end of file
+        return error_response(500, f'Report error: {str(e)}')
+    
+    return json_response(200, {'view': view, 'since': since.isoformat(), 'until': until.isoformat(), 'rows': rows})
\ No newline at end of file
@@ -0,0 +1,103 @@
+'''
+Coarse query classes: the math detectors simple-ai routes on plus a
+RU/EN phrase index that ai-chat uses to pick a generation profile.
+
+Vendored into simple-ai and ai-chat by tools/sync_shared.py.
+
+    classify('Привет!')                        # 'greeting'
+    classify('Что такое фотосинтез?')          # 'definition'
+    classify('Реши x^2 - 5x + 6 = 0')         # 'math'
+    classify('Напиши эссе о дружбе')           # 'essay'
+    classify('Почему небо голубое?')           # 'question'
+
+classify() reads only the first CLASSIFY_CHARS characters and walks their
+stems once through an intents.StemIndex, so it costs a few microseconds
+whatever the message size. Classes are checked in CLASSES order: an essay
+about an equation is an essay, "привет, объясни ..." is a definition.
+'''
+import re
+from typing import Any, Optional
+
+from intents import StemIndex
+from stemmer import WORD_RE, query_stems
+from timing import timed
+
+# in priority order; 'question' and 'general' are what is left, split by length
+CLASSES = ('essay', 'code', 'math', 'definition', 'greeting', 'question', 'general')
+
+CLASS_RULES = {
+    'essay': ['эссе', 'сочинение', 'реферат', 'доклад', 'курсовая', 'диплом', 'напиши статью',
+              'напиши текст', 'напиши рассказ', 'essay', 'article', 'term paper', 'write report',
+              'write story'],
+    'code': ['программа', 'программирование', 'код', 'функция', 'алгоритм', 'python', 'javascript',
+             'sql', 'code', 'program', 'function', 'algorithm'],
+    'math': ['уравнение', 'реши задачу', 'вычисли', 'посчитай', 'интеграл', 'производная', 'equation',
+             'solve', 'calculate', 'integral', 'derivative'],
+    'definition': ['что такое', 'кто такой', 'объясни', 'расскажи о', 'определение', 'what is',
+                   'who is', 'define', 'definition', 'explain'],
+    'greeting': ['привет', 'здравствуйте', 'добрый день', 'доброе утро', 'добрый вечер', 'hello', 'hi',
+                 'hey', 'good morning'],
+}
+
+CLASSIFY_CHARS = 1000
+# longer than this, a greeting is a question that starts politely
+GREETING_MAX_WORDS = 6
+# at most this many words and no other class: a short question
+QUESTION_MAX_WORDS = 15
+
+# a standalone x/y/z next to an '=' sign: "3x - 7 = 2x + 5", "x + y = 10, x - y = 2"
+VARIABLE_RE = re.compile(r'(?<![a-z])[xyz](?![a-z])')
+
+# Every pattern below runs in time linear in the query. An unanchored
+# leading \d+ is retried from every position of a digit run and each try
+# backtracks through the rest of it, so detection patterns use a single \d.
+BINARY_OP_RE = re.compile(r'\d\s*[+\-×x*÷/]\s*\d')
+POWER_RE = re.compile(r'\d\s*\^\s*\d')
+OPEN_PAREN_RE = re.compile(r'\(\d')
+
+
+def has_paren_group(query: str) -> bool:
+    '''Same as re.search(r'\(\d+.*?\)', query) without the quadratic retries.'''
+    # if the first "(digit" of a line has no ")" after it, no later one has
+    for line in query.split('\n'):
+        match = OPEN_PAREN_RE.search(line)
+        if match and ')' in line[match.end():]:
+            return True
+    return False
+
+
+@timed('detect_math')
+def has_math_expression(query: str) -> bool:
+    return bool(BINARY_OP_RE.search(query) or has_paren_group(query) or POWER_RE.search(query))
+
+
+def looks_like_equation(query: str, query_lower: str) -> bool:
+    return '=' in query_lower and VARIABLE_RE.search(query_lower) is not None
+
+
+_index: Optional[Any] = None
+
+
+def class_index() -> Any:
+    '''StemIndex over CLASS_RULES, built on first use.'''
+    global _index
+    if _index is None:
+        _index = StemIndex(CLASS_RULES)
+    return _index
+
+
+def classify(message: str) -> str:
+    text = message[:CLASSIFY_CHARS].lower()
+    labels = class_index().match(query_stems(text))
+    if 'essay' in labels:
+        return 'essay'
+    if 'code' in labels:
+        return 'code'
+    if 'math' in labels or looks_like_equation(text, text) or has_math_expression(text):
+        return 'math'
+    if 'definition' in labels:
+        return 'definition'
+    words = len(WORD_RE.findall(text))
+    if 'greeting' in labels and words <= GREETING_MAX_WORDS:
+        return 'greeting'
+    return 'question' if words <= QUESTION_MAX_WORDS and len(message) <= CLASSIFY_CHARS else 'general'
@@ -0,0 +1,236 @@
+'''
+Pool of OpenAI keys and endpoints for ai-chat.
+
+    response = pool().create(estimated_tokens, model=..., messages=..., max_tokens=...)
+
+Upstreams come from OPENAI_UPSTREAMS, a JSON list such as
+
+    [{"apiKey": "sk-a"}, {"apiKey": "sk-b", "baseUrl": "https://eu.example.com/v1"}]
+
+or else from OPENAI_API_KEYS (comma-separated, all on OPENAI_BASE_URL), or
+else the single OPENAI_API_KEY.
+
+A request goes to the upstream with the fewest requests in flight among
+those that are not parked and whose budget has room for it. The budget is
+what the last x-ratelimit-remaining-requests / -tokens headers reported,
+minus what was sent since, refilled at the reported reset time. A 429 parks
+the key for its Retry-After, a 5xx or connection error for
+FAILURE_PARK_SECONDS, a 401/403 for AUTH_PARK_SECONDS, and the request moves
+on to the next upstream. When nothing is ready the request waits for the
+first upstream to free up, at most MAX_WAIT_SECONDS; past that PoolBusy
+carries the wait so the client can be told when to retry.
+'''
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from runtime import loads
+
+MAX_WAIT_SECONDS = float(os.environ.get('OPENAI_POOL_MAX_WAIT_SECONDS') or 2)
+TIMEOUT_SECONDS = float(os.environ.get('OPENAI_TIMEOUT_SECONDS') or 60)
+RATE_LIMIT_PARK_SECONDS = 1.0
+FAILURE_PARK_SECONDS = 0.5
+AUTH_PARK_SECONDS = 300.0
+
+# "6m0s", "1s", "20ms", "44.760s"
+DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+_clock = time.monotonic
+
+
+class PoolBusy(Exception):
+    '''Every upstream is parked or out of budget for longer than MAX_WAIT_SECONDS.'''
+
+    def __init__(self, retry_after: float):
+        super().__init__(f'all upstreams busy, retry in {retry_after:.1f}s')
+        self.retry_after = retry_after
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def retry_after(headers: Any) -> Optional[float]:
+    '''Seconds from retry-after-ms or retry-after (seconds form only).'''
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return None
+
+
+class Upstream:
+    __slots__ = ('name', 'api_key', 'base_url', '_client', 'outstanding', 'parked_until', 'remaining_requests',
+                 'remaining_tokens', 'requests_reset_at', 'tokens_reset_at', 'dispatched', 'rate_limited',
+                 'failures')
+
+    def __init__(self, api_key: str, base_url: Optional[str]):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.name = f'{base_url or "openai"} …{api_key[-4:]}'
+        self._client: Any = None
+        self.outstanding = 0
+        self.parked_until = 0.0
+        # None until the first response says otherwise: no known limit
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self.dispatched = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    def client(self) -> Any:
+        '''OpenAI client for this key, built on first use and reused (keeps its connections).'''
+        if self._client is None:
+            # deferred: the SDK pulls in ~0.5s of imports that preflights and
+            # rejected requests never need on a cold start
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0,
+                                  timeout=TIMEOUT_SECONDS)
+        return self._client
+
+    def ready_at(self, tokens: int, now: float) -> float:
+        '''Earliest time this upstream can take a request of `tokens` tokens.'''
+        at = self.parked_until
+        if self.remaining_requests is not None and self.remaining_requests <= 0 and now < self.requests_reset_at:
+            at = max(at, self.requests_reset_at)
+        if self.remaining_tokens is not None and self.remaining_tokens < tokens and now < self.tokens_reset_at:
+            at = max(at, self.tokens_reset_at)
+        return at
+
+    def update_budget(self, headers: Any, now: float) -> None:
+        try:
+            if headers.get('x-ratelimit-remaining-requests') is not None:
+                self.remaining_requests = int(headers['x-ratelimit-remaining-requests'])
+                self.requests_reset_at = now + (parse_duration(headers.get('x-ratelimit-reset-requests')) or 0)
+            if headers.get('x-ratelimit-remaining-tokens') is not None:
+                self.remaining_tokens = int(headers['x-ratelimit-remaining-tokens'])
+                self.tokens_reset_at = now + (parse_duration(headers.get('x-ratelimit-reset-tokens')) or 0)
+        except ValueError:
+            pass
+
+    def park(self, seconds: float, now: float) -> None:
+        self.parked_until = max(self.parked_until, now + seconds)
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {'upstream': self.name, 'outstanding': self.outstanding, 'dispatched': self.dispatched,
+                'rateLimited': self.rate_limited, 'failures': self.failures,
+                'parkedForS': round(max(0.0, self.parked_until - now), 1),
+                'remainingRequests': self.remaining_requests, 'remainingTokens': self.remaining_tokens}
+
+
+class UpstreamPool:
+    def __init__(self, upstreams: List[Upstream]):
+        self.upstreams = upstreams
+        self.changed = threading.Condition()
+
+    def acquire(self, tokens: int, deadline: float) -> Upstream:
+        with self.changed:
+            while True:
+                now = _clock()
+                ready = [u for u in self.upstreams if u.ready_at(tokens, now) <= now]
+                if ready:
+                    upstream = min(ready, key=lambda u: (u.outstanding, u.dispatched))
+                    upstream.outstanding += 1
+                    upstream.dispatched += 1
+                    # spend the budget now; the response headers correct it
+                    if upstream.remaining_requests is not None:
+                        upstream.remaining_requests -= 1
+                    if upstream.remaining_tokens is not None:
+                        upstream.remaining_tokens -= tokens
+                    return upstream
+                first = min(u.ready_at(tokens, now) for u in self.upstreams)
+                if first > deadline:
+                    raise PoolBusy(first - now)
+                self.changed.wait(first - now)
+
+    def release(self, upstream: Upstream, status: int, headers: Any = None) -> None:
+        with self.changed:
+            now = _clock()
+            upstream.outstanding -= 1
+            if headers is not None:
+                upstream.update_budget(headers, now)
+            if status == 429:
+                upstream.rate_limited += 1
+                wait = retry_after(headers) if headers is not None else None
+                upstream.park(wait if wait is not None else RATE_LIMIT_PARK_SECONDS, now)
+            elif status in (401, 403):
+                upstream.failures += 1
+                upstream.park(AUTH_PARK_SECONDS, now)
+            elif status == 0 or status >= 500:
+                upstream.failures += 1
+                upstream.park(FAILURE_PARK_SECONDS, now)
+            self.changed.notify_all()
+
+    def create(self, tokens: int, **request: Any) -> Any:
+        '''chat.completions.create on the best upstream, failing over on 429, 5xx, 401/403 and network errors.'''
+        from openai import APIConnectionError, APIStatusError
+        deadline = _clock() + MAX_WAIT_SECONDS
+        last_error: Optional[Exception] = None
+        for _ in range(len(self.upstreams) + 1):
+            upstream = self.acquire(tokens, deadline)
+            try:
+                raw = upstream.client().chat.completions.with_raw_response.create(**request)
+            except APIStatusError as e:
+                status = e.status_code
+                self.release(upstream, status, e.response.headers)
+                if status == 429 or status in (401, 403) or status >= 500:
+                    last_error = e
+                    continue
+                raise
+            except APIConnectionError as e:
+                self.release(upstream, 0)
+                last_error = e
+                continue
+            except BaseException:
+                self.release(upstream, -1)
+                raise
+            self.release(upstream, raw.status_code, raw.headers)
+            return raw.parse()
+        if getattr(last_error, 'status_code', None) == 429:
+            now = _clock()
+            raise PoolBusy(max(0.0, min(u.ready_at(tokens, now) for u in self.upstreams) - now))
+        raise last_error
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self.changed:
+            now = _clock()
+            return [u.snapshot(now) for u in self.upstreams]
+
+
+def upstreams_from_env() -> List[Upstream]:
+    base_url = os.environ.get('OPENAI_BASE_URL') or None
+    if os.environ.get('OPENAI_UPSTREAMS'):
+        return [Upstream(entry['apiKey'], entry.get('baseUrl') or base_url)
+                for entry in loads(os.environ['OPENAI_UPSTREAMS']) if entry.get('apiKey')]
+    keys = os.environ.get('OPENAI_API_KEYS') or os.environ.get('OPENAI_API_KEY') or ''
+    return [Upstream(key.strip(), base_url) for key in keys.split(',') if key.strip()]
+
+
+_pool: Optional[UpstreamPool] = None
+_pool_lock = threading.Lock()
+
+
+def pool() -> Optional[UpstreamPool]:
+    '''Process-wide pool built from the environment on first use; None when no key is configured.'''
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                upstreams = upstreams_from_env()
+                if not upstreams:
+                    return None
+                _pool = UpstreamPool(upstreams)
+    return _pool
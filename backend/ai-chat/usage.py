@@ -0,0 +1,241 @@
+'''
+Token and cost accounting for ai-chat.
+
+    record(user_id, model, language, prompt_tokens, completion_tokens, latency_ms)
+
+Usage is kept and priced under the model alias: a dated snapshot name
+("gpt-4o-mini-2024-07-18", what OpenAI reports back) is recorded as its alias.
+
+record() only adds to an in-memory aggregate keyed by (user, UTC day, model,
+language) under a lock, so it costs about a microsecond on the request path.
+A daemon thread, started with the first record, flushes the aggregate to
+ai_usage_daily every FLUSH_SECONDS or as soon as FLUSH_KEYS keys are pending.
+Each flush is one batched INSERT ... ON CONFLICT DO UPDATE that adds the
+deltas to the stored row. A flush that fails merges its batch back into the
+buffer for the next attempt. Whatever is still pending at exit is flushed
+by an atexit hook.
+
+Without DATABASE_URL the aggregate stays in memory (snapshot() shows it).
+top_spenders() and daily_cost() are the read side for the admin report.
+'''
+import atexit
+import datetime
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from runtime import dumps
+
+FLUSH_SECONDS = float(os.environ.get('USAGE_FLUSH_SECONDS') or 10)
+FLUSH_KEYS = int(os.environ.get('USAGE_FLUSH_KEYS') or 500)
+# beyond this many pending keys (database down for long) new keys are dropped
+MAX_PENDING_KEYS = 50000
+
+# USD per 1M tokens (prompt, completion)
+PRICES: Dict[str, Tuple[float, float]] = {
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1-nano': (0.10, 0.40),
+}
+
+SNAPSHOT_RE = re.compile(r'-\d{4}-\d{2}-\d{2}$')
+
+# (user_id, day, model, language)
+Key = Tuple[int, datetime.date, str, str]
+
+# requests, errors, prompt_tokens, completion_tokens, cost_usd, latency_ms_total, latency_ms_max
+_FIELDS = 7
+
+UPSERT_SQL = '''
+INSERT INTO ai_usage_daily (user_id, day, model, language, requests, errors, prompt_tokens,
+                            completion_tokens, cost_usd, latency_ms_total, latency_ms_max)
+VALUES %s
+ON CONFLICT (day, user_id, model, language) DO UPDATE SET
+    requests = ai_usage_daily.requests + EXCLUDED.requests,
+    errors = ai_usage_daily.errors + EXCLUDED.errors,
+    prompt_tokens = ai_usage_daily.prompt_tokens + EXCLUDED.prompt_tokens,
+    completion_tokens = ai_usage_daily.completion_tokens + EXCLUDED.completion_tokens,
+    cost_usd = ai_usage_daily.cost_usd + EXCLUDED.cost_usd,
+    latency_ms_total = ai_usage_daily.latency_ms_total + EXCLUDED.latency_ms_total,
+    latency_ms_max = GREATEST(ai_usage_daily.latency_ms_max, EXCLUDED.latency_ms_max),
+    updated_at = CURRENT_TIMESTAMP
+'''
+
+TOP_SPENDERS_SQL = '''
+SELECT u.user_id, users.username, users.subscription_type,
+       SUM(u.requests), SUM(u.prompt_tokens), SUM(u.completion_tokens), SUM(u.cost_usd)
+FROM ai_usage_daily u
+LEFT JOIN users ON users.id = u.user_id
+WHERE u.day BETWEEN %s AND %s
+GROUP BY u.user_id, users.username, users.subscription_type
+ORDER BY SUM(u.cost_usd) DESC
+LIMIT %s
+'''
+
+DAILY_COST_SQL = '''
+SELECT u.day, u.model, u.language, COALESCE(users.subscription_type, 'free'),
+       SUM(u.requests), SUM(u.errors), SUM(u.prompt_tokens), SUM(u.completion_tokens), SUM(u.cost_usd),
+       SUM(u.latency_ms_total)
+FROM ai_usage_daily u
+LEFT JOIN users ON users.id = u.user_id
+WHERE u.day BETWEEN %s AND %s
+GROUP BY 1, 2, 3, 4
+ORDER BY 1 DESC, 9 DESC
+'''
+
+_lock = threading.Lock()
+_pending: Dict[Key, List[float]] = {}
+_wake = threading.Event()
+_flusher: Optional[threading.Thread] = None
+_dropped = 0
+
+
+def alias(model: str) -> str:
+    '''"gpt-4o-mini-2024-07-18" -> "gpt-4o-mini"; an alias is returned as it is.'''
+    return SNAPSHOT_RE.sub('', model)
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def user_key(user_id: Any) -> int:
+    '''userId from the request body as an int; 0 for anonymous or malformed ids.'''
+    try:
+        value = int(user_id)
+    except (TypeError, ValueError):
+        return 0
+    return value if 0 < value < 2 ** 31 else 0
+
+
+def record(user_id: Any, model: str, language: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+           latency_ms: float = 0.0, error: bool = False) -> None:
+    global _dropped
+    model = alias(model)
+    key = (user_key(user_id), datetime.datetime.now(datetime.timezone.utc).date(), model, str(language)[:8])
+    cost = cost_usd(model, prompt_tokens, completion_tokens)
+    with _lock:
+        row = _pending.get(key)
+        if row is None:
+            if len(_pending) >= MAX_PENDING_KEYS:
+                _dropped += 1
+                return
+            row = _pending[key] = [0, 0, 0, 0, 0.0, 0, 0]
+        row[0] += 1
+        row[1] += error
+        row[2] += prompt_tokens
+        row[3] += completion_tokens
+        row[4] += cost
+        row[5] += latency_ms
+        row[6] = max(row[6], latency_ms)
+        pending = len(_pending)
+    if _flusher is None:
+        _start()
+    if pending >= FLUSH_KEYS:
+        _wake.set()
+
+
+def snapshot() -> Dict[Key, List[float]]:
+    with _lock:
+        return {key: list(row) for key, row in _pending.items()}
+
+
+def _take() -> Dict[Key, List[float]]:
+    global _pending
+    with _lock:
+        batch, _pending = _pending, {}
+    return batch
+
+
+def _merge_back(batch: Dict[Key, List[float]]) -> None:
+    with _lock:
+        for key, row in batch.items():
+            current = _pending.get(key)
+            if current is None:
+                if len(_pending) < MAX_PENDING_KEYS:
+                    _pending[key] = row
+                continue
+            for i in range(_FIELDS - 1):
+                current[i] += row[i]
+            current[6] = max(current[6], row[6])
+
+
+def flush() -> int:
+    '''Writes the pending aggregate in one batched upsert; returns the number of rows.'''
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn or not _pending:
+        return 0
+    batch = _take()
+    rows = [(user, day, model, language, int(r[0]), int(r[1]), int(r[2]), int(r[3]), round(r[4], 6),
+             int(r[5]), int(r[6])) for (user, day, model, language), r in batch.items()]
+    try:
+        import psycopg2
+        from psycopg2.extras import execute_values
+        conn = psycopg2.connect(dsn)
+        try:
+            with conn, conn.cursor() as cur:
+                execute_values(cur, UPSERT_SQL, rows, page_size=1000)
+        finally:
+            conn.close()
+    except Exception as e:
+        _merge_back(batch)
+        print(dumps({'usage_flush_error': str(e), 'rows': len(rows)}), file=sys.stderr, flush=True)
+        return 0
+    return len(rows)
+
+
+def _run() -> None:
+    while True:
+        _wake.wait(FLUSH_SECONDS)
+        _wake.clear()
+        flush()
+
+
+def _start() -> None:
+    global _flusher
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_run, name='usage-flusher', daemon=True)
+    _flusher.start()
+    atexit.register(flush)
+
+
+def _day(value: Optional[str], default: datetime.date) -> datetime.date:
+    return datetime.date.fromisoformat(value) if value else default
+
+
+def report_range(since: Optional[str], until: Optional[str], max_days: int = 366) -> Tuple[datetime.date, datetime.date]:
+    '''ISO dates from query parameters; defaults to the last 7 days. Raises ValueError.'''
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    end = _day(until, today)
+    start = _day(since, end - datetime.timedelta(days=6))
+    if start > end or (end - start).days >= max_days:
+        raise ValueError('bad date range')
+    return start, end
+
+
+def top_spenders(conn: Any, since: datetime.date, until: datetime.date, limit: int = 20) -> List[Dict[str, Any]]:
+    with conn.cursor() as cur:
+        cur.execute(TOP_SPENDERS_SQL, (since, until, limit))
+        return [
+            {'userId': user, 'username': name, 'tariff': tariff or 'free', 'requests': int(requests),
+             'promptTokens': int(prompt), 'completionTokens': int(completion), 'costUsd': float(cost)}
+            for user, name, tariff, requests, prompt, completion, cost in cur.fetchall()
+        ]
+
+
+def daily_cost(conn: Any, since: datetime.date, until: datetime.date) -> List[Dict[str, Any]]:
+    with conn.cursor() as cur:
+        cur.execute(DAILY_COST_SQL, (since, until))
+        return [
+            {'day': day.isoformat(), 'model': model, 'language': language, 'tariff': tariff,
+             'requests': int(requests), 'errors': int(errors), 'promptTokens': int(prompt),
+             'completionTokens': int(completion), 'costUsd': float(cost),
+             'avgLatencyMs': round(float(latency) / max(int(requests), 1), 1)}
+            for day, model, language, tariff, requests, errors, prompt, completion, cost, latency in cur.fetchall()
+        ]
@@ -0,0 +1,171 @@
+'''
+Read side of ai_requests: one user's exchanges, newest first.
+
+    page = recent(user_id, limit, cursor)          # {'items': [...], 'nextCursor': str or None}
+    page = search(user_id, query, limit, cursor)   # the same, only exchanges matching query
+    item = exchange(user_id, request_id)           # full texts, or None
+
+Pages are keyset paginated on (created_at, id): the cursor is the last row
+of the previous page, and the next page is one range scan of the
+ai_requests_user_recent index (V0008) from there, so page 500 costs what
+page 1 does however many rows the user has. List items carry the first
+PREVIEW_CHARS characters of the question and answer and a truncated flag;
+exchange() returns the full texts.
+
+search() matches the generated search_vector (Russian and English lexemes)
+against the query parsed by both stemmers, with websearch syntax ("quoted
+phrases", -excluded, or). It filters the SEARCH_WINDOW rows after the
+cursor first, which fills the page for common words, and only when that
+falls short intersects the GIN index with the user's rows for the older
+ones, which is quick because the words are then rare. Either way a page
+costs about the same for ten rows of history or a hundred thousand.
+'''
+import base64
+import datetime
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from runtime import RequestError, frozen_error
+
+PREVIEW_CHARS = 280
+MAX_QUERY_CHARS = 200
+
+DATABASE_MISSING = frozen_error(503, 'DATABASE_URL not configured')
+BAD_CURSOR = frozen_error(400, 'Invalid cursor')
+
+# the first page starts after every real row
+_START = (datetime.datetime.max, 2 ** 31 - 1)
+# rows a search walks newest first before it turns to the GIN index
+SEARCH_WINDOW = 1000
+
+_PREVIEW = '''
+SELECT id, left(request_text, %(preview)s), left(response_text, %(preview)s),
+       octet_length(request_text) > octet_length(left(request_text, %(preview)s))
+           OR octet_length(response_text) > octet_length(left(response_text, %(preview)s)),
+       created_at
+'''
+_AFTER_CURSOR = 'user_id = %(user)s AND (created_at, id) < (%(at)s, %(id)s)'
+_MATCHES = "search_vector @@ (websearch_to_tsquery('russian', %(query)s) || websearch_to_tsquery('english', %(query)s))"
+
+RECENT_SQL = _PREVIEW + f'''FROM ai_requests
+WHERE {_AFTER_CURSOR}
+ORDER BY created_at DESC, id DESC
+LIMIT %(limit)s
+'''
+# the SEARCH_WINDOW rows after the cursor, filtered: quick when the words are common
+SEARCH_RECENT_SQL = _PREVIEW + f'''FROM (
+    SELECT * FROM ai_requests
+    WHERE {_AFTER_CURSOR}
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(window)s
+) recent
+WHERE {_MATCHES}
+ORDER BY created_at DESC, id DESC
+LIMIT %(limit)s
+'''
+WINDOW_END_SQL = f'''
+SELECT created_at, id FROM ai_requests
+WHERE {_AFTER_CURSOR}
+ORDER BY created_at DESC, id DESC
+OFFSET %(window)s - 1
+LIMIT 1
+'''
+# everything older than the window: the user's matches as a BitmapAnd of the GIN and
+# recency indexes, so rare words do not walk the whole history (the planner cannot tell
+# a rare word from a common one, and left to choose it walks)
+SEARCH_OLDER_SQL = f'''
+WITH hits AS MATERIALIZED (
+    SELECT id, created_at FROM ai_requests WHERE {_AFTER_CURSOR} AND {_MATCHES}
+)
+''' + _PREVIEW + '''FROM ai_requests
+JOIN (SELECT id FROM hits ORDER BY created_at DESC, id DESC LIMIT %(limit)s) page USING (id)
+ORDER BY created_at DESC, id DESC
+'''
+EXCHANGE_SQL = '''
+SELECT id, request_text, response_text, created_at FROM ai_requests WHERE id = %s AND user_id = %s
+'''
+
+
+def _connect() -> Any:
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        raise RequestError(DATABASE_MISSING)
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    return conn
+
+
+_local = threading.local()
+
+
+def _fetch(sql: str, params: Any) -> List[Tuple[Any, ...]]:
+    conn = getattr(_local, 'conn', None)
+    if conn is None or conn.closed:
+        conn = _local.conn = _connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+    except Exception:
+        conn.close()
+        raise
+
+
+def encode_cursor(created_at: datetime.datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()} {row_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[datetime.datetime, int]:
+    '''(created_at, id) to continue after; raises RequestError(400) for a cursor not made by encode_cursor.'''
+    if not cursor:
+        return _START
+    try:
+        text = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        moment, row_id = text.split(' ')
+        return datetime.datetime.fromisoformat(moment), int(row_id)
+    except ValueError:
+        raise RequestError(BAD_CURSOR)
+
+
+def _page(rows: List[Tuple[Any, ...]], limit: int) -> Dict[str, Any]:
+    '''rows: up to limit + 1 of them; one more than the page tells whether there is a next one.'''
+    items = [
+        {'id': request_id, 'request': request_text, 'response': response_text, 'truncated': bool(truncated),
+         'createdAt': created_at.isoformat()}
+        for request_id, request_text, response_text, truncated, created_at in rows[:limit]
+    ]
+    last = rows[limit - 1] if len(rows) > limit else None
+    return {'items': items, 'nextCursor': encode_cursor(last[4], last[0]) if last else None}
+
+
+def _params(user_id: int, limit: int, cursor: Optional[str], **extra: Any) -> Dict[str, Any]:
+    at, row_id = decode_cursor(cursor)
+    return {'user': user_id, 'at': at, 'id': row_id, 'preview': PREVIEW_CHARS, 'limit': limit + 1, **extra}
+
+
+def recent(user_id: int, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+    return _page(_fetch(RECENT_SQL, _params(user_id, limit, cursor)), limit)
+
+
+def search(user_id: int, query: str, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+    params = _params(user_id, limit, cursor, query=query[:MAX_QUERY_CHARS], window=SEARCH_WINDOW)
+    rows = _fetch(SEARCH_RECENT_SQL, params)
+    if len(rows) < params['limit']:
+        end = _fetch(WINDOW_END_SQL, params)
+        if end:
+            # the window was full: continue after its last row
+            at, row_id = end[0]
+            rows += _fetch(SEARCH_OLDER_SQL, {**params, 'at': at, 'id': row_id,
+                                              'limit': params['limit'] - len(rows)})
+    return _page(rows, limit)
+
+
+def exchange(user_id: int, request_id: int) -> Optional[Dict[str, Any]]:
+    rows = _fetch(EXCHANGE_SQL, (request_id, user_id))
+    if not rows:
+        return None
+    request_id, request_text, response_text, created_at = rows[0]
+    return {'id': request_id, 'request': request_text, 'response': response_text,
+            'createdAt': created_at.isoformat()}
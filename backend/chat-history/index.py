@@ -0,0 +1,68 @@
+from typing import Dict, Any
+
+from runtime import METHOD_NOT_ALLOWED, RequestError, error_response, frozen_error, json_response, preflight
+from session_token import LOGIN_REQUIRED, authenticate
+from timing import span, traced
+import history
+
+OPTIONS_RESPONSE = preflight('GET, OPTIONS')
+BAD_LIMIT = frozen_error(400, 'limit must be a number from 1 to 100')
+BAD_ID = frozen_error(400, 'id must be a number')
+NOT_FOUND = frozen_error(404, 'Not found')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+@traced
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: История запросов пользователя к AI: новые сверху, постраничная выдача и поиск по-русски и по-английски
+    Args: event - dict with httpMethod GET, Authorization: Bearer session token from the login function,
+          queryStringParameters id (one exchange in full), or q (search), limit and cursor (nextCursor
+          of the previous page)
+          context - object with request_id
+    Returns: HTTP response dict with items (texts cut to a preview, truncated flag) and nextCursor,
+             or with id, request and response for id
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return OPTIONS_RESPONSE()
+    
+    if method != 'GET':
+        return METHOD_NOT_ALLOWED()
+    
+    try:
+        session = authenticate(event)
+        if session is None:
+            return LOGIN_REQUIRED()
+        
+        params = event.get('queryStringParameters') or {}
+        if params.get('id'):
+            try:
+                request_id = int(params['id'])
+            except ValueError:
+                return BAD_ID()
+            with span('exchange'):
+                item = history.exchange(session.user_id, request_id) if 0 < request_id < 2 ** 31 else None
+            return json_response(200, item) if item else NOT_FOUND()
+        
+        try:
+            limit = int(params.get('limit') or DEFAULT_LIMIT)
+        except ValueError:
+            return BAD_LIMIT()
+        if not 1 <= limit <= MAX_LIMIT:
+            return BAD_LIMIT()
+        
+        query = (params.get('q') or '').strip()
+        with span('page'):
+            if query:
+                page = history.search(session.user_id, query, limit, params.get('cursor'))
+            else:
+                page = history.recent(session.user_id, limit, params.get('cursor'))
+        return json_response(200, page)
+        
+    except RequestError as e:
+        return e.response()
+    except Exception as e:
+        return error_response(500, f'History error: {str(e)}')
@@ -0,0 +1,160 @@
+'''
+Shared request/response runtime for NeuroPulse cloud functions.
+
+Every function directory is deployed on its own, so this file is vendored into
+each of them as runtime.py. Edit the copy in backend/_shared/ and run
+`python tools/sync_shared.py` to refresh the others.
+'''
+import base64
+from typing import Any, Dict, Optional
+
+MAX_BODY_CHARS = 64 * 1024
+
+CORS_HEADERS: Dict[str, str] = {'Access-Control-Allow-Origin': '*'}
+JSON_HEADERS: Dict[str, str] = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+# The JSON backend is resolved on first use: importing orjson (or the stdlib
+# json package) costs milliseconds that preflights and frozen responses never
+# need to pay on a cold start.
+_orjson: Any = None
+_json_resolved = False
+
+
+def _resolve_json() -> None:
+    global _orjson, _json_resolved
+    try:
+        import orjson
+        _orjson = orjson
+    except ImportError:
+        _orjson = None
+    _json_resolved = True
+
+
+def dumps(data: Any) -> str:
+    '''
+    Compact UTF-8 JSON. orjson is used when installed; the stdlib fallback
+    produces the same text so responses do not depend on the backend.
+    '''
+    if not _json_resolved:
+        _resolve_json()
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(data).decode('utf-8')
+        except TypeError:
+            pass
+    import json
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(text: Any) -> Any:
+    if not _json_resolved:
+        _resolve_json()
+    if _orjson is not None:
+        return _orjson.loads(text)
+    import json
+    return json.loads(text)
+
+
+class FrozenResponse:
+    '''
+    Constant response, encoded once on first use. Calling it returns a fresh
+    event-style dict, so callers may add headers without touching the constant.
+    '''
+    __slots__ = ('status', 'headers', 'data', 'body')
+
+    def __init__(self, status: int, data: Any, headers: Dict[str, str], body: Optional[str] = None):
+        self.status = status
+        self.headers = dict(headers)
+        self.data = data
+        self.body = body
+
+    def __call__(self) -> Dict[str, Any]:
+        body = self.body
+        if body is None:
+            body = self.body = dumps(self.data)
+        return {'statusCode': self.status, 'headers': self.headers.copy(), 'body': body}
+
+
+def preflight(methods: str) -> FrozenResponse:
+    return FrozenResponse(200, None, {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': methods,
+        'Access-Control-Allow-Headers': 'Content-Type, X-User-Id, Authorization',
+        'Access-Control-Max-Age': '86400'
+    }, body='')
+
+
+def frozen_error(status: int, message: str, headers: Dict[str, str] = JSON_HEADERS) -> FrozenResponse:
+    return FrozenResponse(status, {'error': message}, headers)
+
+
+def frozen_json(status: int, data: Any, headers: Dict[str, str] = JSON_HEADERS) -> FrozenResponse:
+    return FrozenResponse(status, data, headers)
+
+
+def encoded_response(status: int, body: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    '''Response around a body that is already JSON text (see json_response).'''
+    return {
+        'statusCode': status,
+        'headers': (headers if headers is not None else JSON_HEADERS).copy(),
+        'isBase64Encoded': False,
+        'body': body
+    }
+
+
+def json_response(status: int, data: Any, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return encoded_response(status, dumps(data), headers)
+
+
+def error_response(status: int, message: str) -> Dict[str, Any]:
+    return json_response(status, {'error': message})
+
+
+METHOD_NOT_ALLOWED = frozen_error(405, 'Method not allowed')
+INVALID_JSON = frozen_error(400, 'Invalid JSON')
+BODY_TOO_LARGE = frozen_error(413, 'Request body too large')
+
+
+class RequestError(Exception):
+    '''Raised by request helpers; carries the ready response for the client.'''
+
+    def __init__(self, response: FrozenResponse):
+        super().__init__(response.status)
+        self.response = response
+
+
+def parse_json_body(event: Dict[str, Any], max_chars: int = MAX_BODY_CHARS) -> Dict[str, Any]:
+    '''
+    Business: Single body-parsing path for all functions
+    Args: event - platform event; body may be missing, None or base64-encoded
+          max_chars - size cap checked before decoding
+    Returns: parsed JSON object, or raises RequestError (400/413)
+    '''
+    raw = event.get('body')
+    if not raw:
+        return {}
+    if len(raw) > max_chars:
+        raise RequestError(BODY_TOO_LARGE)
+    try:
+        if event.get('isBase64Encoded'):
+            raw = base64.b64decode(raw)
+        data = loads(raw)
+    except ValueError:
+        raise RequestError(INVALID_JSON)
+    if not isinstance(data, dict):
+        raise RequestError(INVALID_JSON)
+    return data
+
+
+TIMER_EVENT = 'yandex.cloud.events.serverless.triggers.TimerMessage'
+
+
+def is_timer(event: Dict[str, Any]) -> bool:
+    '''Timer trigger invocations carry messages instead of an HTTP request, so they cannot be forged over HTTP.'''
+    if event.get('httpMethod'):
+        return False
+    messages = event.get('messages') or []
+    return any((m.get('event_metadata') or {}).get('event_type') == TIMER_EVENT for m in messages)
@@ -0,0 +1,146 @@
+'''
+Per-stage request timing for NeuroPulse cloud functions.
+
+Vendored into each function directory by tools/sync_shared.py.
+
+    @traced
+    def handler(event, context):
+        with span('parse'):
+            ...
+
+    @timed('math')
+    def solve_math_expression(query): ...
+
+A sampled request collects stage durations, keyed on context.request_id, and
+returns them in a Server-Timing header plus one JSON log line on stdout.
+Sampling is set by TIMING_SAMPLE_RATE (0..1, default 0). Requests that are
+not sampled only pay for a context-variable lookup per span.
+'''
+import functools
+import os
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from runtime import dumps
+
+SAMPLE_RATE = float(os.environ.get('TIMING_SAMPLE_RATE') or 0)
+
+if 0 < SAMPLE_RATE < 1:
+    from random import random as _random
+
+_clock = time.perf_counter
+
+
+class Trace:
+    __slots__ = ('request_id', 'started', 'stages')
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = _clock()
+        self.stages: List[Tuple[str, float]] = []
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages.append((name, seconds))
+
+    def totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds * 1000
+        return totals
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar('neuropulse_trace', default=None)
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'started')
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> '_Span':
+        self.started = _clock()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.trace.add(self.name, _clock() - self.started)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str) -> Any:
+    trace = _current.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            trace = _current.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            started = _clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                trace.add(name, _clock() - started)
+        return wrapper
+    return decorator
+
+
+def server_timing(totals: Dict[str, float], total_ms: float) -> str:
+    parts = [f'{name};dur={ms:.2f}' for name, ms in totals.items()]
+    parts.append(f'total;dur={total_ms:.2f}')
+    return ', '.join(parts)
+
+
+def traced(handler: Callable[[Dict[str, Any], Any], Dict[str, Any]]) -> Callable:
+    '''
+    Business: Wraps a function handler with sampled stage timing
+    Args: handler - handler(event, context) returning an HTTP response dict
+    Returns: handler with the same signature; sampled responses gain Server-Timing
+    '''
+    @functools.wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        if not SAMPLE_RATE or (SAMPLE_RATE < 1 and _random() >= SAMPLE_RATE):
+            return handler(event, context)
+        trace = Trace(getattr(context, 'request_id', '') or '')
+        token = _current.set(trace)
+        try:
+            response = handler(event, context)
+        finally:
+            _current.reset(token)
+        total_ms = (_clock() - trace.started) * 1000
+        totals = trace.totals()
+        headers = dict(response.get('headers') or {})
+        headers['Server-Timing'] = server_timing(totals, total_ms)
+        headers['Timing-Allow-Origin'] = '*'
+        response['headers'] = headers
+        sys.stdout.write(dumps({
+            'event': 'timing',
+            'function': getattr(context, 'function_name', ''),
+            'request_id': trace.request_id,
+            'method': event.get('httpMethod'),
+            'status': response.get('statusCode'),
+            'total_ms': round(total_ms, 3),
+            'stages': {name: round(ms, 3) for name, ms in totals.items()}
+        }) + '\n')
+        return response
+    return wrapper
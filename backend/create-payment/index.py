@@ -1,9 +1,17 @@
-import json
 import os
-import uuid
 import base64
-import requests
 
+from runtime import (
+    METHOD_NOT_ALLOWED, RequestError, error_response, frozen_error,
+    json_response, parse_json_body, preflight
+)
+from timing import span, traced
+
+OPTIONS_RESPONSE = preflight('POST, OPTIONS')
+MISSING_FIELDS = frozen_error(400, 'Missing required fields')
+NOT_CONFIGURED = frozen_error(500, 'Payment system not configured')
+
+@traced
 def handler(event, context):
     '''
     Business: Create YooKassa payment for tariff purchase
@@ -13,25 +21,16 @@ def handler(event, context):
     method = event.get('httpMethod', 'POST')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
+        return OPTIONS_RESPONSE()
     
     if method != 'POST':
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Method not allowed'})
-        }
+        return METHOD_NOT_ALLOWED()
     
-    body_data = json.loads(event.get('body', '{}'))
+    try:
+        with span('parse'):
+            body_data = parse_json_body(event)
+    except RequestError as e:
+        return e.response()
     user_id = body_data.get('userId')
     tariff_type = body_data.get('tariffType')
     amount = body_data.get('amount')
@@ -39,21 +38,14 @@ def handler(event, context):
     country = body_data.get('country', 'ru')
     
     if not all([user_id, tariff_type, amount]):
-        return {
-            'statusCode': 400,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Missing required fields'})
-        }
+        return MISSING_FIELDS()
     
     shop_id = os.environ.get('YOOKASSA_SHOP_ID')
     secret_key = os.environ.get('YOOKASSA_SECRET_KEY')
+    api_url = os.environ.get('YOOKASSA_API_URL', 'https://api.yookassa.ru/v3')
     
     if not shop_id or not secret_key:
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Payment system not configured'})
-        }
+        return NOT_CONFIGURED()
     
     currency_map = {
         '₽': 'RUB',
@@ -64,8 +56,6 @@ def handler(event, context):
     
     yookassa_currency = currency_map.get(currency, 'RUB')
     
-    idempotence_key = str(uuid.uuid4())
-    
     payment_data = {
         'amount': {
             'value': str(amount),
@@ -85,6 +75,12 @@ def handler(event, context):
     }
     
     try:
+        # deferred: requests (urllib3, charset detection) and uuid (platform)
+        # are only needed once the payment is actually sent
+        import requests
+        import uuid
+        
+        idempotence_key = str(uuid.uuid4())
         auth_string = f'{shop_id}:{secret_key}'
         auth_bytes = auth_string.encode('utf-8')
         auth_base64 = base64.b64encode(auth_bytes).decode('utf-8')
@@ -95,36 +91,24 @@ def handler(event, context):
             'Content-Type': 'application/json'
         }
         
-        response = requests.post(
-            'https://api.yookassa.ru/v3/payments',
-            headers=headers,
-            json=payment_data,
-            timeout=10
-        )
+        with span('yookassa'):
+            response = requests.post(
+                f'{api_url}/payments',
+                headers=headers,
+                json=payment_data,
+                timeout=10
+            )
         
         if response.status_code == 200:
             payment_response = response.json()
             confirmation_url = payment_response.get('confirmation', {}).get('confirmation_url')
             
-            return {
-                'statusCode': 200,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'isBase64Encoded': False,
-                'body': json.dumps({
-                    'paymentUrl': confirmation_url,
-                    'paymentId': payment_response.get('id')
-                })
-            }
+            return json_response(200, {
+                'paymentUrl': confirmation_url,
+                'paymentId': payment_response.get('id')
+            })
         else:
-            return {
-                'statusCode': 500,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': f'Payment creation failed: {response.text}'})
-            }
+            return error_response(500, f'Payment creation failed: {response.text}')
             
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': f'Payment error: {str(e)}'})
-        }
\ No newline at end of file
+        return error_response(500, f'Payment error: {str(e)}')
\ No newline at end of file
@@ -0,0 +1,159 @@
+from typing import Dict, Any
+import os
+import time
+
+from runtime import (
+    METHOD_NOT_ALLOWED, RequestError, error_response, frozen_error,
+    json_response, parse_json_body, preflight
+)
+from ratelimit import RateLimiter
+from timing import span, traced
+import session_token
+
+OPTIONS_RESPONSE = preflight('POST, OPTIONS')
+CREDENTIALS_REQUIRED = frozen_error(400, 'username and password are required')
+UNKNOWN_ACTION = frozen_error(400, 'action must be login, refresh or logout')
+BAD_CREDENTIALS = frozen_error(401, 'Wrong username or password')
+NOT_CONFIGURED = frozen_error(500, 'Sessions not configured')
+DATABASE_MISSING = frozen_error(503, 'DATABASE_URL not configured')
+
+# bcrypt only accepts 72 bytes; anything far longer is not a password
+MAX_PASSWORD_CHARS = 256
+# password guessing: a bcrypt check costs ~50 ms of CPU per attempt
+LIMITER = RateLimiter('login', {'ip': 20})
+
+USER_BY_NAME_SQL = 'SELECT id, password_hash, role, subscription_type FROM users WHERE username = %s'
+USER_BY_ID_SQL = 'SELECT id, username, role, subscription_type FROM users WHERE id = %s'
+REVOKE_SQL = '''
+INSERT INTO session_revocations (jti, user_id, revoked_at, expires_at)
+VALUES (%s, %s, to_timestamp(%s), to_timestamp(%s))
+'''
+
+@traced
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Вход по логину и паролю; выдаёт короткоживущий подписанный токен сессии
+    Args: event - dict with httpMethod, body (action: login | refresh | logout,
+          username, password; logout: everywhere) and Authorization: Bearer for refresh/logout
+          context - object with request_id
+    Returns: HTTP response dict with token, expiresAt and user
+    '''
+    method: str = event.get('httpMethod', 'POST')
+    
+    if method == 'OPTIONS':
+        return OPTIONS_RESPONSE()
+    
+    if method != 'POST':
+        return METHOD_NOT_ALLOWED()
+    
+    try:
+        with span('parse'):
+            body_data = parse_json_body(event)
+        rejected = LIMITER.check(event)
+        if rejected:
+            return rejected
+        
+        action = body_data.get('action') or 'login'
+        if action == 'login':
+            return login(body_data)
+        if action == 'refresh':
+            return refresh(event)
+        if action == 'logout':
+            return logout(event, bool(body_data.get('everywhere')))
+        return UNKNOWN_ACTION()
+        
+    except RequestError as e:
+        return e.response()
+    except Exception as e:
+        return error_response(500, f'Login error: {str(e)}')
+
+_dummy_hash = None
+
+def dummy_hash() -> bytes:
+    '''Hash checked for unknown usernames, so they take as long as wrong passwords.'''
+    global _dummy_hash
+    if _dummy_hash is None:
+        import bcrypt
+        _dummy_hash = bcrypt.hashpw(b'not a password', bcrypt.gensalt(10))
+    return _dummy_hash
+
+def connect():
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        raise RequestError(DATABASE_MISSING)
+    import psycopg2
+    return psycopg2.connect(dsn)
+
+def session_response(user_id: int, username: str, role: str, subscription_type: str) -> Dict[str, Any]:
+    tariff = subscription_type or 'free'
+    try:
+        token, expires_at = session_token.issue(user_id, role or 'user', tariff)
+    except session_token.InvalidToken:
+        return NOT_CONFIGURED()
+    return json_response(200, {
+        'token': token,
+        'expiresAt': expires_at,
+        'user': {'id': user_id, 'username': username, 'role': role or 'user', 'tariff': tariff}
+    })
+
+def login(body_data: Dict[str, Any]) -> Dict[str, Any]:
+    username = str(body_data.get('username') or '').strip()
+    password = str(body_data.get('password') or '')
+    if not username or not password or len(password) > MAX_PASSWORD_CHARS:
+        return CREDENTIALS_REQUIRED()
+    if not session_token.keys():
+        return NOT_CONFIGURED()
+    
+    conn = connect()
+    try:
+        with span('lookup'), conn.cursor() as cur:
+            cur.execute(USER_BY_NAME_SQL, (username,))
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    
+    import bcrypt
+    with span('bcrypt'):
+        stored = row[1].encode('utf-8') if row and row[1] else dummy_hash()
+        try:
+            matches = bcrypt.checkpw(password.encode('utf-8')[:72], stored)
+        except ValueError:
+            matches = False
+    if not row or not matches:
+        return BAD_CREDENTIALS()
+    return session_response(row[0], username, row[2], row[3])
+
+def refresh(event: Dict[str, Any]) -> Dict[str, Any]:
+    '''New token for a valid one, with role and tariff read again (a payment may have changed them).'''
+    session = session_token.authenticate(event)
+    if session is None:
+        raise RequestError(session_token.LOGIN_REQUIRED)
+    conn = connect()
+    try:
+        with span('lookup'), conn.cursor() as cur:
+            cur.execute(USER_BY_ID_SQL, (session.user_id,))
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    if not row:
+        raise RequestError(session_token.UNAUTHORIZED)
+    return session_response(row[0], row[1], row[2], row[3])
+
+def logout(event: Dict[str, Any], everywhere: bool) -> Dict[str, Any]:
+    '''Revokes this token, or with everywhere every token of the user issued so far.'''
+    session = session_token.authenticate(event)
+    if session is None:
+        raise RequestError(session_token.LOGIN_REQUIRED)
+    now = time.time()
+    token_id = None if everywhere else session.token_id
+    user_id = session.user_id if everywhere else None
+    # a user-wide revocation must outlive every token issued before it
+    expires_at = now + session_token.TTL_SECONDS if everywhere else session.expires_at
+    conn = connect()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(REVOKE_SQL, (token_id, user_id, now, expires_at))
+    finally:
+        conn.close()
+    session_token.remember_revocation(token_id, user_id, now, expires_at)
+    return json_response(200, {'success': True})
@@ -0,0 +1,263 @@
+'''
+Sliding-window rate limits per user and per client IP.
+
+Vendored into simple-ai and ai-chat by tools/sync_shared.py.
+
+    LIMITER = RateLimiter('ai-chat', {'ip': 60, 'free': 20, 'unlimited': 120, 'admin': None})
+
+    rejected = LIMITER.check(event, body_data.get('userId'), session)
+    if rejected:
+        return rejected          # 429 with Retry-After; nothing else was done
+
+Limits are requests per WINDOW_SECONDS. Every request counts against its
+client IP; a request that names a user also counts against the user, with
+the limit of the user's tariff: users.role 'admin', else
+users.subscription_type, else 'free'. With a session token (session_token)
+user and tariff come from the token; otherwise from userId in the body or
+X-User-Id, and the tariff from the database. A limit of None is no limit. RATE_LIMITS (JSON) overrides the limits of the function,
+and RATE_LIMITS=off turns limiting off (load tests).
+
+The count is the sliding-window estimate: hits in the current fixed window
+plus the previous window's hits weighted by how much of it still overlaps.
+
+check() never touches the database. Each instance counts in memory, and
+with DATABASE_URL a daemon thread every SYNC_SECONDS adds the new hits to
+the UNLOGGED rate_limit_hits table in one upsert, reads back the totals of
+every instance for the keys it saw, and loads the tariffs of users it has
+not seen (a new user gets the 'free' limit until then). Between syncs an
+instance only misses the other instances' most recent hits.
+'''
+import math
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from runtime import JSON_HEADERS, dumps, frozen_error, loads
+
+WINDOW_SECONDS = 60
+SYNC_SECONDS = float(os.environ.get('RATE_LIMIT_SYNC_SECONDS') or 1)
+TARIFF_TTL_SECONDS = 300
+# beyond this many keys in memory the idle ones are dropped
+MAX_KEYS = 100000
+
+RATE_LIMITED = frozen_error(429, 'Too many requests, please slow down', {**JSON_HEADERS, 'Retry-After': '1'})
+
+UPSERT_SQL = '''
+INSERT INTO rate_limit_hits (key, window_start, hits) VALUES %s
+ON CONFLICT (key, window_start) DO UPDATE SET hits = rate_limit_hits.hits + EXCLUDED.hits
+RETURNING key, window_start, hits
+'''
+PREVIOUS_SQL = 'SELECT key, hits FROM rate_limit_hits WHERE window_start = %s AND key = ANY(%s)'
+TARIFFS_SQL = 'SELECT id, role, subscription_type FROM users WHERE id = ANY(%s)'
+CLEANUP_SQL = 'DELETE FROM rate_limit_hits WHERE window_start < %s'
+
+_clock = time.time
+
+
+class _Counter:
+    __slots__ = ('window', 'current', 'previous', 'pending', 'touched')
+
+    def __init__(self, window: int):
+        self.window = window
+        # hits of every instance as of the last sync, plus this instance's since
+        self.current = 0
+        self.previous = 0
+        # this instance's hits in `window` not yet written to the database
+        self.pending = 0
+        self.touched = 0.0
+
+    def roll(self, window: int) -> None:
+        if window != self.window:
+            self.previous = self.current if window == self.window + 1 else 0
+            self.current = 0
+            self.pending = 0
+            self.window = window
+
+    def estimate(self, now: float) -> float:
+        overlap = 1 - (now % WINDOW_SECONDS) / WINDOW_SECONDS
+        return self.current + self.previous * overlap
+
+
+def client_ip(event: Dict[str, Any]) -> str:
+    return ((event.get('requestContext') or {}).get('identity') or {}).get('sourceIp') or 'unknown'
+
+
+def user_id(event: Dict[str, Any], body_user: Any) -> int:
+    '''X-User-Id header or userId from the body as an int; 0 when missing or malformed.'''
+    headers = event.get('headers') or {}
+    raw = headers.get('X-User-Id') or headers.get('x-user-id') or body_user
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return 0
+    return value if 0 < value < 2 ** 31 else 0
+
+
+class RateLimiter:
+    def __init__(self, scope: str, limits: Dict[str, Optional[int]]):
+        '''scope prefixes the keys, so functions sharing the table keep separate counts.'''
+        self.scope = scope
+        self.limits = dict(limits)
+        self.enabled = True
+        configured = os.environ.get('RATE_LIMITS')
+        if configured == 'off':
+            self.enabled = False
+        elif configured:
+            self.limits.update(loads(configured))
+        self.counters: Dict[str, _Counter] = {}
+        # user id -> (tariff, expires at)
+        self.tariffs: Dict[int, Tuple[str, float]] = {}
+        self.unknown_users: Set[int] = set()
+        self.shared = bool(os.environ.get('DATABASE_URL'))
+        self.lock = threading.Lock()
+        self.syncer: Optional[threading.Thread] = None
+        self.cleaned_window = 0
+        self.rejected = 0
+
+    def tariff(self, user: int, now: float) -> str:
+        cached = self.tariffs.get(user)
+        if cached is None or cached[1] < now:
+            if self.shared and len(self.unknown_users) < MAX_KEYS:
+                self.unknown_users.add(user)
+            return cached[0] if cached else 'free'
+        return cached[0]
+
+    def _counter(self, key: str, now: float, window: int) -> _Counter:
+        counter = self.counters.get(key)
+        if counter is None:
+            if len(self.counters) >= MAX_KEYS:
+                self._evict(now)
+            counter = self.counters[key] = _Counter(window)
+        counter.roll(window)
+        counter.touched = now
+        return counter
+
+    @staticmethod
+    def _wait(counter: _Counter, limit: Optional[int], now: float) -> Optional[float]:
+        '''Seconds until one more hit fits under limit, or None if it fits now.'''
+        if limit is not None and counter.estimate(now) + 1 > limit:
+            # the previous window's weight falls off linearly; without it, wait for the next window
+            if counter.previous and counter.current < limit:
+                excess = counter.estimate(now) + 1 - limit
+                return max(1.0, excess / counter.previous * WINDOW_SECONDS)
+            return max(1.0, WINDOW_SECONDS - now % WINDOW_SECONDS)
+        return None
+
+    def check(self, event: Dict[str, Any], body_user: Any = None, session: Any = None) -> Optional[Dict[str, Any]]:
+        '''None when the request may proceed (and is counted), else the 429 response.'''
+        if not self.enabled:
+            return None
+        now = _clock()
+        window = int(now // WINDOW_SECONDS)
+        user = session.user_id if session is not None else user_id(event, body_user)
+        keys: List[Tuple[str, Optional[int]]] = [(f'{self.scope}:ip:{client_ip(event)}', self.limits.get('ip'))]
+        with self.lock:
+            if user:
+                if session is not None:
+                    tariff = 'admin' if session.role == 'admin' else session.tariff
+                else:
+                    tariff = self.tariff(user, now)
+                keys.append((f'{self.scope}:user:{user}', self.limits.get(tariff, self.limits.get('free'))))
+            counters = [(self._counter(key, now, window), limit) for key, limit in keys]
+            wait = max((w for w in (self._wait(c, limit, now) for c, limit in counters) if w is not None),
+                       default=None)
+            if wait is None:
+                for counter, _ in counters:
+                    counter.current += 1
+                    counter.pending += 1
+            else:
+                self.rejected += 1
+        if self.syncer is None and self.shared:
+            self._start()
+        if wait is None:
+            return None
+        response = RATE_LIMITED()
+        response['headers']['Retry-After'] = str(math.ceil(wait))
+        return response
+
+    def _evict(self, now: float) -> None:
+        idle = [key for key, c in self.counters.items() if now - c.touched > 2 * WINDOW_SECONDS]
+        for key in idle or list(self.counters)[:len(self.counters) // 10]:
+            del self.counters[key]
+
+    def sync(self, conn: Any) -> None:
+        '''Writes pending hits, reads back the totals of every instance, loads unknown tariffs.'''
+        now = _clock()
+        window = int(now // WINDOW_SECONDS)
+        with self.lock:
+            batch = []
+            for key, counter in self.counters.items():
+                if now - counter.touched <= SYNC_SECONDS * 2 + 1:
+                    counter.roll(window)
+                    batch.append((key, window, counter.pending))
+                    counter.pending = 0
+            users = list(self.unknown_users)
+            self.unknown_users.clear()
+        if not batch and not users:
+            return
+        try:
+            with conn, conn.cursor() as cur:
+                totals, previous, tariffs = [], [], []
+                if batch:
+                    from psycopg2.extras import execute_values
+                    totals = execute_values(cur, UPSERT_SQL, batch, page_size=1000, fetch=True)
+                    cur.execute(PREVIOUS_SQL, (window - 1, [key for key, _, _ in batch]))
+                    previous = cur.fetchall()
+                if users:
+                    cur.execute(TARIFFS_SQL, (users,))
+                    tariffs = cur.fetchall()
+                if window != self.cleaned_window:
+                    cur.execute(CLEANUP_SQL, (window - 2,))
+                    self.cleaned_window = window
+        except Exception:
+            with self.lock:
+                for key, batch_window, hits in batch:
+                    counter = self.counters.get(key)
+                    if counter is not None and counter.window == batch_window:
+                        counter.pending += hits
+                self.unknown_users.update(users)
+            raise
+        with self.lock:
+            for key, batch_window, hits in totals:
+                counter = self.counters.get(key)
+                if counter is not None and counter.window == batch_window:
+                    # database total plus what this instance counted since the batch was taken
+                    counter.current = hits + counter.pending
+            for key, hits in previous:
+                counter = self.counters.get(key)
+                if counter is not None and counter.window == window:
+                    counter.previous = max(counter.previous, hits)
+            if len(self.tariffs) > MAX_KEYS:
+                self.tariffs = {user: cached for user, cached in self.tariffs.items() if cached[1] > now}
+            found = {user: (role, subscription) for user, role, subscription in tariffs}
+            for user in users:
+                role, subscription = found.get(user, (None, None))
+                tariff = 'admin' if role == 'admin' else subscription or 'free'
+                self.tariffs[user] = (tariff if tariff in self.limits else 'free', now + TARIFF_TTL_SECONDS)
+
+    def _run(self) -> None:
+        conn = None
+        while True:
+            time.sleep(SYNC_SECONDS)
+            try:
+                if conn is None or conn.closed:
+                    import psycopg2
+                    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+                self.sync(conn)
+            except Exception as e:
+                print(dumps({'rate_limit_sync_error': str(e), 'scope': self.scope}), file=sys.stderr, flush=True)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+
+    def _start(self) -> None:
+        with self.lock:
+            if self.syncer is not None:
+                return
+            self.syncer = threading.Thread(target=self._run, name=f'ratelimit-{self.scope}', daemon=True)
+        self.syncer.start()
@@ -0,0 +1,88 @@
+from typing import Dict, Any
+import os
+import time
+
+from runtime import (
+    CORS_HEADERS, METHOD_NOT_ALLOWED, RequestError, dumps, encoded_response,
+    error_response, frozen_error, json_response, preflight
+)
+from timing import span, traced
+import payment_listener
+
+OPTIONS_RESPONSE = preflight('GET, OPTIONS')
+MISSING_PAYMENT_ID = frozen_error(400, 'paymentId is required')
+DATABASE_MISSING = frozen_error(503, 'DATABASE_URL not configured')
+
+# a request is held at most this long; the function timeout must be longer
+MAX_WAIT_SECONDS = float(os.environ.get('PAYMENT_STATUS_WAIT_SECONDS') or 25)
+# an EventSource reconnects this long after a pending response ends
+SSE_RETRY_MS = 500
+SSE_HEADERS = {**CORS_HEADERS, 'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'}
+
+@traced
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Сообщает странице payment-success, что платёж зачислен, без опроса: запрос ждёт события
+    Args: event - dict with httpMethod GET, queryStringParameters paymentId (from create-payment)
+          and wait (seconds to hold the request, default and cap PAYMENT_STATUS_WAIT_SECONDS);
+          Accept: text/event-stream answers in EventSource format
+          context - object with request_id
+    Returns: HTTP response dict with paymentId and status pending | credited | failed
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return OPTIONS_RESPONSE()
+    
+    if method != 'GET':
+        return METHOD_NOT_ALLOWED()
+    
+    params = event.get('queryStringParameters') or {}
+    payment_id = params.get('paymentId')
+    if not payment_id or len(payment_id) > 64:
+        return MISSING_PAYMENT_ID()
+    try:
+        wait = max(0.0, min(float(params.get('wait') or MAX_WAIT_SECONDS), MAX_WAIT_SECONDS))
+    except ValueError:
+        wait = MAX_WAIT_SECONDS
+    
+    if not os.environ.get('DATABASE_URL'):
+        return DATABASE_MISSING()
+    
+    try:
+        with span('wait'):
+            outcome = wait_for(payment_id, wait)
+    except RequestError as e:
+        return e.response()
+    except Exception as e:
+        return error_response(500, f'Payment status error: {str(e)}')
+    
+    data = {'paymentId': payment_id, 'status': 'pending', **(outcome or {})}
+    headers = event.get('headers') or {}
+    accept = headers.get('Accept') or headers.get('accept') or ''
+    if 'text/event-stream' in accept:
+        return encoded_response(200, sse_body(data), SSE_HEADERS)
+    return json_response(200, data)
+
+def wait_for(payment_id: str, wait: float):
+    '''The payment's outcome, waiting up to wait seconds for it; None if it is still pending.'''
+    deadline = time.monotonic() + wait
+    listening = wait > 0 and payment_listener.ready()
+    with payment_listener.waiter(payment_id) as woken:
+        while True:
+            outcome = payment_listener.latest(payment_id)
+            remaining = deadline - time.monotonic()
+            if outcome is not None or remaining <= 0:
+                return outcome
+            woken.wait(remaining if listening else min(remaining, payment_listener.POLL_SECONDS))
+            woken.clear()
+
+def sse_body(data: Dict[str, Any]) -> str:
+    '''
+    The platform sends a response only once it is complete, so a stream is one
+    held request: a final status is sent as an event, a pending one only sets
+    retry, and the EventSource reconnects and waits again.
+    '''
+    if data['status'] == 'pending':
+        return f'retry: {SSE_RETRY_MS}\n: pending\n\n'
+    return f'retry: {SSE_RETRY_MS}\nevent: payment\ndata: {dumps(data)}\n\n'
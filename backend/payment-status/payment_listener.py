@@ -0,0 +1,156 @@
+'''
+Waiting for a payment's outcome without polling the database.
+
+    status = latest(payment_id)            # credited / failed event row, or None
+    with waiter(payment_id) as woken:      # woken is set when an event for payment_id commits
+        ...
+
+One daemon thread per instance holds a single LISTEN payment_events
+connection (the outbox trigger in V0007 notifies with the payment id on
+commit) and wakes the requests waiting on that id. Outbox reads are one
+indexed lookup each and share a second connection under a lock, so however
+many browsers wait, the instance keeps two connections.
+
+A waiter is registered before the outbox is read, so an event that commits
+in between still wakes it. When the listener reconnects every waiter is
+woken, as notifications sent while it was away are lost; the waiters read
+the outbox again. ready() tells whether LISTEN is in place, and callers
+that find it is not fall back to reading the outbox every POLL_SECONDS.
+'''
+import os
+import select
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+
+from runtime import RequestError, dumps, frozen_error
+
+CHANNEL = 'payment_events'
+# how long a request waits for LISTEN to be in place before falling back to polling
+READY_SECONDS = 2.0
+POLL_SECONDS = 2.0
+RECONNECT_SECONDS = 1.0
+# select() timeout; also how often a dead listener connection is noticed
+LISTEN_IDLE_SECONDS = 30.0
+
+DATABASE_MISSING = frozen_error(503, 'DATABASE_URL not configured')
+
+LATEST_SQL = '''
+SELECT status, tariff_type, requests_added, subscription_type, created_at FROM payment_events
+WHERE provider_payment_id = %s
+ORDER BY id DESC
+LIMIT 1
+'''
+
+
+def _connect() -> Any:
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        raise RequestError(DATABASE_MISSING)
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    return conn
+
+
+_reader: Any = None
+_reader_lock = threading.Lock()
+
+
+def latest(payment_id: str) -> Optional[Dict[str, Any]]:
+    '''The payment's latest outbox event, or None while it has none.'''
+    global _reader
+    with _reader_lock:
+        if _reader is None or _reader.closed:
+            _reader = _connect()
+        try:
+            with _reader.cursor() as cur:
+                cur.execute(LATEST_SQL, (payment_id,))
+                row = cur.fetchone()
+        except Exception:
+            _reader.close()
+            raise
+    if row is None:
+        return None
+    status, tariff_type, requests_added, subscription_type, created_at = row
+    return {'status': status, 'tariffType': tariff_type, 'requestsAdded': requests_added,
+            'subscriptionType': subscription_type, 'at': created_at.isoformat()}
+
+
+_waiters: Dict[str, Set[threading.Event]] = {}
+_waiters_lock = threading.Lock()
+_ready = threading.Event()
+_listener_lock = threading.Lock()
+_listener_started = False
+
+
+@contextmanager
+def waiter(payment_id: str) -> Iterator[threading.Event]:
+    woken = threading.Event()
+    with _waiters_lock:
+        _waiters.setdefault(payment_id, set()).add(woken)
+    try:
+        yield woken
+    finally:
+        with _waiters_lock:
+            events = _waiters.get(payment_id)
+            if events is not None:
+                events.discard(woken)
+                if not events:
+                    del _waiters[payment_id]
+
+
+def _wake(payment_id: Optional[str] = None) -> None:
+    '''Wakes the waiters on payment_id, or all of them.'''
+    with _waiters_lock:
+        if payment_id is None:
+            events = [event for waiting in _waiters.values() for event in waiting]
+        else:
+            events = list(_waiters.get(payment_id, ()))
+    for event in events:
+        event.set()
+
+
+def _listen() -> None:
+    while True:
+        conn = None
+        try:
+            conn = _connect()
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN {CHANNEL}')
+            _ready.set()
+            # anything committed while no connection was listening
+            _wake()
+            while True:
+                if select.select([conn], [], [], LISTEN_IDLE_SECONDS) == ([], [], []):
+                    # idle: make sure the connection is still there
+                    with conn.cursor() as cur:
+                        cur.execute('SELECT 1')
+                else:
+                    conn.poll()
+                notifies, conn.notifies = conn.notifies, []
+                for payment_id in {notify.payload for notify in notifies}:
+                    _wake(payment_id)
+        except Exception as e:
+            _ready.clear()
+            print(dumps({'payment_listener_error': str(e)}), file=sys.stderr, flush=True)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        time.sleep(RECONNECT_SECONDS)
+
+
+def ready() -> bool:
+    '''Starts the listener once per instance; True when LISTEN is in place.'''
+    global _listener_started
+    if not _listener_started:
+        with _listener_lock:
+            if not _listener_started:
+                threading.Thread(target=_listen, name='payment-listener', daemon=True).start()
+                _listener_started = True
+    return _ready.wait(READY_SECONDS)
@@ -0,0 +1,148 @@
+'''
+What a paid tariff gives the user, and the statement that credits it.
+
+Vendored into payment-webhook and reconcile-payments by tools/sync_shared.py.
+
+    credited, users = credit(cur, [PaidPayment(...), ...])   # inside a transaction
+
+A payment is credited at most once: payments.provider_payment_id is unique,
+and one statement records the payment with credited_at and adds the tariff
+to its user. A payment that is already credited is skipped by the
+ON CONFLICT ... WHERE clause, so the webhook and the reconciliation job can
+race on the same payment and only one of them credits it. Any number of
+payments is one round trip; per-user sums are applied with one UPDATE.
+
+Only the tariff's price is credited: the statement joins each payment to
+TARIFF_PRICES on tariff, currency and amount, so a payment tagged with a
+tariff it did not pay for (the client picks amount and tariffType when it
+creates the payment) is neither recorded nor credited, whoever calls
+credit(). price_mismatch() tells callers why, so they can set it aside.
+
+The same statement writes a 'credited' row to the payment_events outbox for
+every payment it credits, so payment-status sees the event exactly when the
+credit commits (its NOTIFY trigger fires on commit too).
+'''
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# tariff -> (bonus_requests added, subscription_type set, subscription_requests set)
+TARIFF_CREDITS: Dict[str, Tuple[int, Optional[str], int]] = {
+    'starter': (20, None, 0),
+    'advanced': (40, None, 0),
+    'unlimited': (0, 'unlimited', 999999),
+}
+
+# tariff -> currency -> price, as the pricing page shows them (RUB: tariffs.price_rub)
+TARIFF_PRICES: Dict[str, Dict[str, Decimal]] = {
+    'starter': {'RUB': Decimal('199.00'), 'USD': Decimal('2.99'), 'EUR': Decimal('2.49'), 'GBP': Decimal('2.19')},
+    'advanced': {'RUB': Decimal('299.00'), 'USD': Decimal('4.49'), 'EUR': Decimal('3.99'), 'GBP': Decimal('3.49')},
+    'unlimited': {'RUB': Decimal('749.00'), 'USD': Decimal('11.99'), 'EUR': Decimal('9.99'), 'GBP': Decimal('8.99')},
+}
+
+CREDIT_SQL = '''
+WITH prices (tariff_type, currency, price) AS (
+    SELECT * FROM unnest(%s::text[], %s::text[], %s::numeric[])
+),
+paid (provider_payment_id, user_id, amount, currency, tariff_type, paid_at) AS (
+    SELECT given.* FROM unnest(%s::text[], %s::integer[], %s::numeric[], %s::text[], %s::text[], %s::timestamp[])
+        AS given (provider_payment_id, user_id, amount, currency, tariff_type, paid_at)
+    JOIN prices ON prices.tariff_type = given.tariff_type AND prices.currency = given.currency
+                   AND prices.price = given.amount
+),
+credits (tariff_type, bonus_requests, subscription_type, subscription_requests) AS (
+    SELECT * FROM unnest(%s::text[], %s::integer[], %s::text[], %s::integer[])
+),
+recorded AS (
+    INSERT INTO payments (user_id, amount, currency, payment_method, status, provider_payment_id, tariff_type,
+                          paid_at, credited_at)
+    SELECT user_id, amount, currency, 'yookassa', 'succeeded', provider_payment_id, tariff_type, paid_at,
+           CURRENT_TIMESTAMP
+    FROM paid
+    ON CONFLICT (provider_payment_id) DO UPDATE SET
+        status = 'succeeded', paid_at = EXCLUDED.paid_at, credited_at = EXCLUDED.credited_at
+    WHERE payments.credited_at IS NULL
+    RETURNING provider_payment_id, user_id, tariff_type
+),
+events AS (
+    INSERT INTO payment_events (provider_payment_id, user_id, status, tariff_type, requests_added,
+                                subscription_type)
+    SELECT recorded.provider_payment_id, recorded.user_id, 'credited', recorded.tariff_type,
+           credits.bonus_requests + credits.subscription_requests, credits.subscription_type
+    FROM recorded JOIN credits USING (tariff_type)
+),
+per_user AS (
+    SELECT recorded.user_id, SUM(credits.bonus_requests) AS bonus_requests,
+           MAX(credits.subscription_type) AS subscription_type,
+           MAX(credits.subscription_requests) AS subscription_requests
+    FROM recorded JOIN credits USING (tariff_type)
+    GROUP BY recorded.user_id
+),
+updated AS (
+    UPDATE users SET
+        bonus_requests = COALESCE(users.bonus_requests, 0) + per_user.bonus_requests,
+        subscription_type = COALESCE(per_user.subscription_type, users.subscription_type),
+        subscription_requests = GREATEST(COALESCE(users.subscription_requests, 0), per_user.subscription_requests),
+        updated_at = CURRENT_TIMESTAMP
+    FROM per_user
+    WHERE users.id = per_user.user_id
+    RETURNING users.id
+)
+SELECT (SELECT COUNT(*) FROM recorded), (SELECT COUNT(*) FROM updated)
+'''
+
+# TARIFF_PRICES as (tariff_type, currency, price) arrays, for unnest()
+PRICE_COLUMNS = (
+    [tariff_type for tariff_type, prices in TARIFF_PRICES.items() for _ in prices],
+    [currency for prices in TARIFF_PRICES.values() for currency in prices],
+    [price for prices in TARIFF_PRICES.values() for price in prices.values()],
+)
+
+_CREDIT_COLUMNS = (
+    list(TARIFF_CREDITS),
+    [credits[0] for credits in TARIFF_CREDITS.values()],
+    [credits[1] for credits in TARIFF_CREDITS.values()],
+    [credits[2] for credits in TARIFF_CREDITS.values()],
+)
+
+
+class PaidPayment(NamedTuple):
+    provider_payment_id: str
+    user_id: int
+    amount: Any
+    currency: Optional[str]
+    tariff_type: str
+    # naive UTC datetime or ISO string
+    paid_at: Any
+
+
+def requests_added(tariff_type: str) -> Tuple[int, Optional[str]]:
+    '''Requests the tariff adds and the subscription it sets, as reported to the client.'''
+    bonus, subscription, subscription_requests = TARIFF_CREDITS.get(tariff_type, (0, None, 0))
+    return bonus + subscription_requests, subscription
+
+
+def price_mismatch(tariff_type: str, amount: Any, currency: Optional[str]) -> Optional[str]:
+    '''Why the payment is not the tariff's price, or None when it is.'''
+    price = TARIFF_PRICES.get(tariff_type, {}).get(currency or '')
+    if price is None:
+        return f'no {tariff_type!r} price in {currency!r}'
+    if Decimal(str(amount)) != price:
+        return f'paid {amount} {currency}, {tariff_type!r} costs {price}'
+    return None
+
+
+def credit(cur: Any, payments: List[PaidPayment]) -> Tuple[int, int]:
+    '''Records and credits the payments not credited yet that paid their tariff's price; returns (payments credited, users updated).'''
+    # a repeated id would make ON CONFLICT touch the same row twice in one statement
+    unique = {p.provider_payment_id: p for p in payments if p.tariff_type in TARIFF_CREDITS}
+    if not unique:
+        return 0, 0
+    rows = list(unique.values())
+    cur.execute(CREDIT_SQL, (
+        *PRICE_COLUMNS,
+        [p.provider_payment_id for p in rows], [p.user_id for p in rows], [p.amount for p in rows],
+        [p.currency for p in rows], [p.tariff_type for p in rows], [p.paid_at for p in rows],
+        *_CREDIT_COLUMNS,
+    ))
+    credited, users = cur.fetchone()
+    return credited, users
@@ -1,94 +1,83 @@
-import json
-import os
 from typing import Dict, Any
+import time
 
+from runtime import (
+    METHOD_NOT_ALLOWED, RequestError, error_response, frozen_error,
+    frozen_json, is_timer, json_response, parse_json_body, preflight
+)
+from crediting import requests_added
+from timing import span, traced
+import payment_jobs
+
+OPTIONS_RESPONSE = preflight('POST, OPTIONS')
+IGNORED = frozen_json(200, {'status': 'ignored', 'reason': 'payment not succeeded'})
+MISSING_METADATA = frozen_error(400, 'Missing userId or tariffType in metadata')
+MISSING_PAYMENT_ID = frozen_error(400, 'Missing payment id')
+
+# a timer run works the queue at most this long
+DRAIN_SECONDS = 20
+
+@traced
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
-    Business: Обрабатывает webhook от ЮKassa при успешной оплате и начисляет запросы
-    Args: event - dict with httpMethod, body (JSON с данными платежа от ЮKassa)
+    Business: Принимает webhook от ЮKassa при успешной оплате и ставит начисление запросов в очередь
+    Args: event - dict with httpMethod, body (JSON с данными платежа от ЮKassa),
+          or a timer trigger message that works off the queue
           context - object with request_id
     Returns: HTTP response dict
     '''
+    if is_timer(event):
+        return json_response(200, payment_jobs.drain(time.monotonic() + DRAIN_SECONDS))
+    
     method: str = event.get('httpMethod', 'POST')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
+        return OPTIONS_RESPONSE()
     
     if method != 'POST':
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'error': 'Method not allowed'})
-        }
+        return METHOD_NOT_ALLOWED()
     
     try:
-        body_data = json.loads(event.get('body', '{}'))
+        with span('parse'):
+            body_data = parse_json_body(event)
         
-        payment_status = body_data.get('object', {}).get('status')
-        metadata = body_data.get('object', {}).get('metadata', {})
+        payment = body_data.get('object') or {}
+        payment_status = payment.get('status')
+        metadata = payment.get('metadata') or {}
         
         user_id = metadata.get('userId')
         tariff_type = metadata.get('tariffType')
         
         if payment_status != 'succeeded':
-            return {
-                'statusCode': 200,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'status': 'ignored', 'reason': 'payment not succeeded'})
-            }
+            return IGNORED()
         
         if not user_id or not tariff_type:
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': 'Missing userId or tariffType in metadata'})
-            }
+            return MISSING_METADATA()
+        
+        payment_id = payment.get('id')
+        if not payment_id or not isinstance(payment_id, str) or len(payment_id) > 64:
+            return MISSING_PAYMENT_ID()
         
-        requests_to_add = 0
-        subscription_type = None
+        # the ack is one insert; crediting happens in payment_jobs workers
+        with span('enqueue'):
+            queued = payment_jobs.enqueue(payment_id, str(body_data.get('event') or 'payment.succeeded')[:64], body_data)
+        payment_jobs.start_workers()
         
-        if tariff_type == 'starter':
-            requests_to_add = 20
-        elif tariff_type == 'advanced':
-            requests_to_add = 40
-        elif tariff_type == 'unlimited':
-            subscription_type = 'unlimited'
-            requests_to_add = 999999
+        requests_to_add, subscription_type = requests_added(tariff_type)
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
+        with span('serialize'):
+            return json_response(200, {
                 'success': True,
+                'queued': queued,
+                'paymentId': payment_id,
                 'userId': user_id,
                 'tariffType': tariff_type,
                 'requestsAdded': requests_to_add,
                 'subscriptionType': subscription_type,
-                'message': f'Successfully processed payment for user {user_id}'
+                'message': f'Payment for user {user_id} accepted for crediting'
             })
-        }
         
-    except json.JSONDecodeError:
-        return {
-            'statusCode': 400,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'error': 'Invalid JSON in request body'})
-        }
+    except RequestError as e:
+        return e.response()
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'error': f'Internal server error: {str(e)}'})
-        }
+        return error_response(500, f'Internal server error: {str(e)}')
@@ -0,0 +1,251 @@
+'''
+Durable queue of YooKassa notifications, credited off the request path.
+
+    queued = enqueue(payment_id, event, body)   # webhook: one INSERT, then ack
+    start_workers()                             # WORKERS daemon threads, once per instance
+    drain(deadline)                             # timer trigger: work due jobs until none or deadline
+
+The webhook only validates and inserts, on a connection kept per thread, so
+its latency is one round trip. A redelivered notification hits the unique
+(provider_payment_id, event) key and inserts nothing.
+
+Workers claim due jobs with FOR UPDATE SKIP LOCKED, so threads and instances
+share the table without handing a job out twice. A claim is a lease: run_at
+moves LEASE_SECONDS ahead and attempts goes up, so the job of a worker that
+died comes back on its own. Working a job asks YooKassa for the payment and
+credits it in the transaction that marks the job done. The notification
+itself is never trusted: without YooKassa credentials a job is retried
+like any failure, and dead after MAX_ATTEMPTS, but never credited.
+
+A failure is retried after BACKOFF_BASE_SECONDS * 2^(attempts - 1), jittered
+and capped at BACKOFF_CAP_SECONDS, and the job is dead after MAX_ATTEMPTS.
+Poison, a payment that can never be credited (unknown payment, user or
+tariff, no amount, an amount that is not the tariff's price), is dead at
+once. Dead jobs keep last_error, and a 'failed' payment_events row tells a
+browser waiting in payment-status to stop waiting; 'credited' rows are
+written by crediting.credit itself.
+
+Background threads only run while the instance is warm, so a timer trigger
+calling drain() picks up retries that come due while nothing is running.
+'''
+import os
+import random
+import sys
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional
+
+from crediting import TARIFF_CREDITS, PaidPayment, credit, price_mismatch
+from runtime import RequestError, dumps, frozen_error
+from yookassa import YooKassa
+
+WORKERS = int(os.environ.get('PAYMENT_WORKERS') or 2)
+CLAIM_BATCH = 10
+LEASE_SECONDS = 60
+BACKOFF_BASE_SECONDS = 5.0
+BACKOFF_CAP_SECONDS = 3600.0
+MAX_ATTEMPTS = 10
+IDLE_POLL_SECONDS = 2.0
+# done jobs are kept this long so redeliveries still find them; payment events too
+RETENTION_DAYS = 7
+CLEANUP_SECONDS = 3600
+
+DATABASE_MISSING = frozen_error(503, 'DATABASE_URL not configured')
+
+ENQUEUE_SQL = '''
+INSERT INTO payment_jobs (provider_payment_id, event, payload) VALUES (%s, %s, %s)
+ON CONFLICT (provider_payment_id, event) DO NOTHING
+'''
+CLAIM_SQL = '''
+UPDATE payment_jobs SET run_at = CURRENT_TIMESTAMP + make_interval(secs => %s), attempts = attempts + 1
+WHERE id IN (
+    SELECT id FROM payment_jobs
+    WHERE status = 'queued' AND run_at <= CURRENT_TIMESTAMP
+    ORDER BY run_at
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id, provider_payment_id, attempts
+'''
+DONE_SQL = "UPDATE payment_jobs SET status = 'done', finished_at = CURRENT_TIMESTAMP, last_error = NULL WHERE id = %s"
+RETRY_SQL = 'UPDATE payment_jobs SET run_at = CURRENT_TIMESTAMP + make_interval(secs => %s), last_error = %s WHERE id = %s'
+DEAD_SQL = '''
+UPDATE payment_jobs SET status = 'dead', finished_at = CURRENT_TIMESTAMP, last_error = %s WHERE id = %s;
+INSERT INTO payment_events (provider_payment_id, status, detail) VALUES (%s, 'failed', %s)
+'''
+CLEANUP_SQL = '''
+DELETE FROM payment_jobs WHERE status = 'done' AND finished_at < CURRENT_TIMESTAMP - make_interval(days => %s);
+DELETE FROM payment_events WHERE created_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+'''
+
+
+class Poison(Exception):
+    '''The job can never succeed; it is dead-lettered without retries.'''
+
+
+def _connect() -> Any:
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        raise RequestError(DATABASE_MISSING)
+    import psycopg2
+    return psycopg2.connect(dsn)
+
+
+_local = threading.local()
+
+
+def enqueue(payment_id: str, event: str, body: Dict[str, Any]) -> bool:
+    '''Stores the notification; False when it was already stored (a redelivery).'''
+    conn = getattr(_local, 'conn', None)
+    if conn is None or conn.closed:
+        conn = _local.conn = _connect()
+        conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(ENQUEUE_SQL, (payment_id, event, dumps(body)))
+            inserted = cur.rowcount == 1
+    except Exception:
+        conn.close()
+        raise
+    _wake.set()
+    return inserted
+
+
+def backoff(attempts: int) -> float:
+    delay = min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def confirm(provider: Optional[YooKassa], payment_id: str) -> PaidPayment:
+    '''The payment as YooKassa reports it. Raises Poison, or anything else to retry.'''
+    if provider is None:
+        # anyone can post a notification: only YooKassa's own answer is credited
+        raise RuntimeError('YOOKASSA_SHOP_ID / YOOKASSA_SECRET_KEY not configured')
+    payment = provider.get(payment_id)
+    if payment is None:
+        raise Poison('YooKassa does not know this payment')
+    status = payment.get('status')
+    if status == 'canceled':
+        raise Poison('payment was canceled')
+    if status != 'succeeded':
+        raise RuntimeError(f'payment is {status}, not succeeded yet')
+    metadata = payment.get('metadata') or {}
+    try:
+        user_id = int(metadata.get('userId'))
+    except (TypeError, ValueError):
+        raise Poison(f'bad userId {metadata.get("userId")!r}')
+    tariff_type = metadata.get('tariffType')
+    if tariff_type not in TARIFF_CREDITS:
+        raise Poison(f'unknown tariff {tariff_type!r}')
+    amount = payment.get('amount') or {}
+    try:
+        value = Decimal(str(amount.get('value')))
+    except InvalidOperation:
+        raise Poison(f'bad amount {amount.get("value")!r}')
+    mismatch = price_mismatch(tariff_type, value, amount.get('currency'))
+    if mismatch:
+        raise Poison(mismatch)
+    return PaidPayment(payment_id, user_id, value, amount.get('currency'), tariff_type,
+                       payment.get('captured_at') or payment.get('created_at'))
+
+
+def _mark(conn: Any, sql: str, params: Any) -> None:
+    with conn, conn.cursor() as cur:
+        cur.execute(sql, params)
+
+
+def work(conn: Any, provider: Optional[YooKassa], limit: int = CLAIM_BATCH) -> Dict[str, int]:
+    '''Claims up to limit due jobs and works them; returns how many ended done, retried and dead.'''
+    import psycopg2
+    with conn, conn.cursor() as cur:
+        cur.execute(CLAIM_SQL, (LEASE_SECONDS, limit))
+        jobs = cur.fetchall()
+    counts = {'done': 0, 'retried': 0, 'dead': 0}
+    for job_id, payment_id, attempts in jobs:
+        try:
+            paid = confirm(provider, payment_id)
+            with conn, conn.cursor() as cur:
+                credit(cur, [paid])
+                cur.execute(DONE_SQL, (job_id,))
+            counts['done'] += 1
+            continue
+        except (Poison, psycopg2.IntegrityError) as e:
+            # IntegrityError: the user does not exist
+            error, dead = str(e), True
+        except psycopg2.OperationalError:
+            # the connection is gone: the lease brings the job back
+            raise
+        except Exception as e:
+            error, dead = f'{type(e).__name__}: {e}', attempts >= MAX_ATTEMPTS
+        if dead:
+            _mark(conn, DEAD_SQL, (error, job_id, payment_id, error))
+            counts['dead'] += 1
+            print(dumps({'payment_job_dead': job_id, 'paymentId': payment_id, 'attempts': attempts,
+                         'error': error}), file=sys.stderr, flush=True)
+        else:
+            _mark(conn, RETRY_SQL, (backoff(attempts), error, job_id))
+            counts['retried'] += 1
+    return counts
+
+
+def drain(deadline: float) -> Dict[str, int]:
+    '''Works due jobs in this thread until none are left or time.monotonic() passes deadline.'''
+    totals = {'done': 0, 'retried': 0, 'dead': 0}
+    conn = _connect()
+    try:
+        provider = YooKassa.from_env()
+        while time.monotonic() < deadline:
+            counts = work(conn, provider)
+            for name, count in counts.items():
+                totals[name] += count
+            if not sum(counts.values()):
+                break
+        with conn, conn.cursor() as cur:
+            cur.execute(CLEANUP_SQL, (RETENTION_DAYS, RETENTION_DAYS))
+    finally:
+        conn.close()
+    return totals
+
+
+_wake = threading.Event()
+_workers_lock = threading.Lock()
+_workers_started = False
+
+
+def _run() -> None:
+    provider = YooKassa.from_env()
+    conn = None
+    cleaned_at = 0.0
+    while True:
+        worked = 0
+        try:
+            if conn is None or conn.closed:
+                conn = _connect()
+            worked = sum(work(conn, provider).values())
+            if time.monotonic() - cleaned_at > CLEANUP_SECONDS:
+                _mark(conn, CLEANUP_SQL, (RETENTION_DAYS, RETENTION_DAYS))
+                cleaned_at = time.monotonic()
+        except Exception as e:
+            print(dumps({'payment_worker_error': str(e)}), file=sys.stderr, flush=True)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+        if not worked:
+            _wake.wait(IDLE_POLL_SECONDS)
+            _wake.clear()
+
+
+def start_workers() -> None:
+    global _workers_started
+    if _workers_started:
+        return
+    with _workers_lock:
+        if _workers_started:
+            return
+        for index in range(WORKERS):
+            threading.Thread(target=_run, name=f'payment-worker-{index}', daemon=True).start()
+        _workers_started = True
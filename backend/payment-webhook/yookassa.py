@@ -0,0 +1,100 @@
+'''
+Read side of the YooKassa API: one payment, or the payment list page by page.
+
+Vendored into payment-webhook and reconcile-payments by tools/sync_shared.py.
+
+    provider = YooKassa.from_env()           # None without YOOKASSA_SHOP_ID / _SECRET_KEY
+    payment = provider.get(payment_id)       # dict, or None if YooKassa does not know it
+    for items in provider.pages(since, until):
+        ...
+
+429s, 5xx and network errors are retried HTTP_RETRIES times with
+exponential backoff (Retry-After when given); anything else, or running out
+of retries, raises ProviderError. Each thread keeps its own HTTP session,
+so connections are reused across calls.
+'''
+import datetime
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from runtime import loads
+
+PAGE_SIZE = 100
+HTTP_TIMEOUT_SECONDS = 30
+HTTP_RETRIES = 5
+
+
+class ProviderError(Exception):
+    pass
+
+
+def isoformat(moment: datetime.datetime) -> str:
+    '''YooKassa's timestamp format, UTC with milliseconds.'''
+    return moment.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + \
+        f'{moment.microsecond // 1000:03d}Z'
+
+
+class YooKassa:
+    def __init__(self, api_url: str, shop_id: str, secret_key: str):
+        self.api_url = api_url.rstrip('/')
+        self.auth = (shop_id, secret_key)
+        self.local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> Optional['YooKassa']:
+        shop_id = os.environ.get('YOOKASSA_SHOP_ID')
+        secret_key = os.environ.get('YOOKASSA_SECRET_KEY')
+        if not shop_id or not secret_key:
+            return None
+        return cls(os.environ.get('YOOKASSA_API_URL', 'https://api.yookassa.ru/v3'), shop_id, secret_key)
+
+    def _session(self) -> Any:
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            # deferred: requests is only needed once YooKassa is actually called
+            import requests
+            session = self.local.session = requests.Session()
+        return session
+
+    def get(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        return self._get(f'/payments/{payment_id}', None, allow_missing=True)
+
+    def pages(self, since: datetime.datetime, until: datetime.datetime,
+              stop: Optional[threading.Event] = None) -> Iterator[List[Dict[str, Any]]]:
+        '''Succeeded payments created in [since, until), a page at a time.'''
+        params = {'status': 'succeeded', 'limit': PAGE_SIZE,
+                  'created_at.gte': isoformat(since), 'created_at.lt': isoformat(until)}
+        while stop is None or not stop.is_set():
+            page = self._get('/payments', params)
+            yield page.get('items') or []
+            if not page.get('next_cursor'):
+                return
+            params['cursor'] = page['next_cursor']
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]], allow_missing: bool = False) -> Any:
+        import requests
+        session = self._session()
+        for attempt in range(HTTP_RETRIES + 1):
+            wait = min(8.0, 0.5 * 2 ** attempt)
+            try:
+                response = session.get(f'{self.api_url}{path}', params=params, auth=self.auth,
+                                       timeout=HTTP_TIMEOUT_SECONDS)
+            except requests.RequestException as e:
+                if attempt == HTTP_RETRIES:
+                    raise ProviderError(f'YooKassa GET {path} failed: {e}')
+                time.sleep(wait)
+                continue
+            if response.status_code == 200:
+                return loads(response.content)
+            if response.status_code == 404 and allow_missing:
+                return None
+            if (response.status_code != 429 and response.status_code < 500) or attempt == HTTP_RETRIES:
+                raise ProviderError(f'YooKassa GET {path} failed: {response.status_code} {response.text[:200]}')
+            try:
+                wait = float(response.headers.get('Retry-After') or wait)
+            except ValueError:
+                pass
+            time.sleep(wait)
+        raise ProviderError(f'YooKassa GET {path} failed')
@@ -0,0 +1,102 @@
+from typing import Dict, Any
+import datetime
+import hmac
+import os
+import sys
+
+from runtime import (
+    METHOD_NOT_ALLOWED, RequestError, dumps, error_response, frozen_error,
+    is_timer, json_response, parse_json_body, preflight
+)
+from timing import span, traced
+from yookassa import YooKassa
+import reconcile
+
+OPTIONS_RESPONSE = preflight('POST, OPTIONS')
+FORBIDDEN = frozen_error(403, 'Forbidden')
+BAD_RANGE = frozen_error(400, 'since/until must be ISO dates, since before until, at most a year apart')
+NOT_CONFIGURED = frozen_error(500, 'Payment system not configured')
+DATABASE_MISSING = frozen_error(503, 'DATABASE_URL not configured')
+ALREADY_RUNNING = frozen_error(409, 'Reconciliation already running')
+
+# a timer run looks this far back; webhooks are retried by YooKassa for about a day
+LOOKBACK_HOURS = float(os.environ.get('RECONCILE_LOOKBACK_HOURS') or 72)
+MAX_RANGE = datetime.timedelta(days=366)
+
+@traced
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Сверяет платежи ЮKassa с таблицей payments и начисляет те, что потеряли webhook
+    Args: event - timer trigger message, or dict with httpMethod, X-Admin-Token = RECONCILE_ADMIN_TOKEN
+          and body (since, until: ISO dates; default the last RECONCILE_LOOKBACK_HOURS)
+          context - object with request_id
+    Returns: HTTP response dict with pages, fetched, missing, credited and skipped counts
+    '''
+    if is_timer(event):
+        body_data: Dict[str, Any] = {}
+    else:
+        method: str = event.get('httpMethod', 'POST')
+        
+        if method == 'OPTIONS':
+            return OPTIONS_RESPONSE()
+        
+        if method != 'POST':
+            return METHOD_NOT_ALLOWED()
+        
+        if not is_admin(event):
+            return FORBIDDEN()
+        
+        try:
+            with span('parse'):
+                body_data = parse_json_body(event)
+        except RequestError as e:
+            return e.response()
+    
+    try:
+        since, until = window(body_data.get('since'), body_data.get('until'))
+    except ValueError:
+        return BAD_RANGE()
+    
+    provider = YooKassa.from_env()
+    if provider is None:
+        return NOT_CONFIGURED()
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        return DATABASE_MISSING()
+    
+    try:
+        import psycopg2
+        conn = psycopg2.connect(dsn)
+        try:
+            with span('reconcile'):
+                stats = reconcile.reconcile(conn, provider, since, until)
+        finally:
+            conn.close()
+    except reconcile.AlreadyRunning:
+        return ALREADY_RUNNING()
+    except Exception as e:
+        return error_response(500, f'Reconciliation error: {str(e)}')
+    
+    print(dumps({'reconcile': stats}), file=sys.stderr, flush=True)
+    return json_response(200, stats)
+
+def is_admin(event: Dict[str, Any]) -> bool:
+    token = os.environ.get('RECONCILE_ADMIN_TOKEN') or ''
+    headers = event.get('headers') or {}
+    supplied = headers.get('X-Admin-Token') or headers.get('x-admin-token') or ''
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+def window(since: Any, until: Any):
+    '''[since, until) as aware UTC datetimes. Raises ValueError.'''
+    now = datetime.datetime.now(datetime.timezone.utc)
+    end = parse_moment(until) if until else now
+    start = parse_moment(since) if since else end - datetime.timedelta(hours=LOOKBACK_HOURS)
+    if not start < end or end - start > MAX_RANGE:
+        raise ValueError('bad range')
+    return start, end
+
+def parse_moment(value: Any) -> datetime.datetime:
+    moment = datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment
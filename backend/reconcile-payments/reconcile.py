@@ -0,0 +1,195 @@
+'''
+Reconciliation of YooKassa payments against the payments table.
+
+    stats = reconcile(conn, YooKassa.from_env(), since, until)
+
+Finds succeeded payments that were never credited (a lost or failed
+webhook) and credits them, with a fixed number of statements however many
+payments the window holds:
+
+1. [since, until) is cut into SLICES ranges paged concurrently, one HTTP
+   session each, 100 payments a page, status=succeeded only. Cursor
+   paging is sequential, so slices are what makes the fetch parallel.
+2. Pages go into a temp table with COPY, COPY_ROWS at a time, while the
+   rest are still being fetched.
+3. One query diffs the temp table against payments and users into
+   reconcile_missing: every payment without a credited payments row, the
+   creditable ones (known user, the tariff's price in its currency) first.
+   The rest are reported as skipped, for a human to look at.
+4. The missing ones are credited BATCH_SIZE at a time through
+   crediting.credit, each batch its own short transaction, so user rows are
+   never locked for long and an interrupted run keeps what it credited.
+   A payment the webhook credits meanwhile is skipped by credit().
+
+A session advisory lock keeps runs from overlapping (AlreadyRunning).
+'''
+import datetime
+import io
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from crediting import PRICE_COLUMNS, PaidPayment, credit
+from yookassa import YooKassa, isoformat
+
+SLICES = int(os.environ.get('RECONCILE_SLICES') or 4)
+COPY_ROWS = 20000
+BATCH_SIZE = int(os.environ.get('RECONCILE_BATCH_SIZE') or 1000)
+# pg_try_advisory_lock key of this job
+LOCK_KEY = 460046
+
+LOCK_SQL = 'SELECT pg_try_advisory_lock(%s)'
+UNLOCK_SQL = 'SELECT pg_advisory_unlock(%s)'
+STAGE_SQL = '''
+DROP TABLE IF EXISTS provider_payments, reconcile_missing;
+CREATE TEMP TABLE provider_payments (
+    id TEXT, amount TEXT, currency TEXT, user_ref TEXT, tariff_type TEXT, paid_at TIMESTAMPTZ
+)
+'''
+COPY_SQL = 'COPY provider_payments FROM STDIN'
+# every succeeded payment without a credited payments row; the creditable ones
+# (known user, the tariff's price in its currency) first, numbered for batching
+DIFF_SQL = r'''
+ANALYZE provider_payments;
+CREATE TEMP TABLE reconcile_missing AS
+SELECT row_number() OVER (ORDER BY m.creditable DESC, m.paid_at, m.id) AS n, m.*
+FROM (
+    SELECT p.id, users.id AS user_id, p.currency, p.tariff_type, p.paid_at, p.amount,
+           users.id IS NOT NULL AND prices.price IS NOT NULL AS creditable
+    FROM (
+        SELECT DISTINCT ON (id) id, currency, tariff_type, user_ref, paid_at AT TIME ZONE 'UTC' AS paid_at,
+               CASE WHEN amount ~ '^[0-9]{1,8}(\.[0-9]{1,2})?$' THEN amount::numeric(10, 2) END AS amount
+        FROM provider_payments ORDER BY id
+    ) p
+    LEFT JOIN payments ON payments.provider_payment_id = p.id
+    LEFT JOIN users ON users.id = CASE WHEN p.user_ref ~ '^[0-9]{1,9}$' THEN p.user_ref::integer END
+    LEFT JOIN unnest(%s::text[], %s::text[], %s::numeric[]) AS prices (tariff_type, currency, price)
+        ON prices.tariff_type = p.tariff_type AND prices.currency = p.currency AND prices.price = p.amount
+    WHERE payments.credited_at IS NULL
+) m;
+CREATE INDEX ON reconcile_missing (n);
+SELECT (SELECT COUNT(DISTINCT id) FROM provider_payments),
+       COUNT(*) FILTER (WHERE creditable), COUNT(*) FILTER (WHERE NOT creditable),
+       (array_agg(id ORDER BY id) FILTER (WHERE NOT creditable))[1:20]
+FROM reconcile_missing
+'''
+BATCH_SQL = '''
+SELECT id, user_id, amount, currency, tariff_type, paid_at FROM reconcile_missing
+WHERE n > %s AND n <= %s
+'''
+
+# COPY text format: backslash, tab and line breaks must be escaped
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+class AlreadyRunning(Exception):
+    pass
+
+
+def slices(since: datetime.datetime, until: datetime.datetime, count: int) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    step = (until - since) / max(1, count)
+    bounds = [since + step * i for i in range(count)] + [until]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _field(value: Any) -> str:
+    if value is None:
+        return '\\N'
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_line(item: Dict[str, Any]) -> str:
+    amount = item.get('amount') or {}
+    metadata = item.get('metadata') or {}
+    return '\t'.join(_field(value) for value in (
+        item.get('id'), amount.get('value'), amount.get('currency'), metadata.get('userId'),
+        metadata.get('tariffType'), item.get('captured_at') or item.get('created_at'),
+    )) + '\n'
+
+
+def _fetch(provider: YooKassa, since: datetime.datetime, until: datetime.datetime,
+           pages: 'queue.Queue[Any]', stop: threading.Event) -> None:
+    try:
+        for items in provider.pages(since, until, stop):
+            pages.put(items)
+    finally:
+        pages.put(None)
+
+
+def stage(cur: Any, provider: YooKassa, since: datetime.datetime, until: datetime.datetime) -> int:
+    '''Fetches the window into provider_payments; returns the number of pages.'''
+    cur.execute(STAGE_SQL)
+    ranges = slices(since, until, SLICES)
+    pages: 'queue.Queue[Any]' = queue.Queue()
+    stop = threading.Event()
+    buffer, rows, page_count, running = io.StringIO(), 0, 0, len(ranges)
+    with ThreadPoolExecutor(max_workers=len(ranges) or 1) as pool:
+        futures = [pool.submit(_fetch, provider, start, end, pages, stop) for start, end in ranges]
+        try:
+            while running:
+                items = pages.get()
+                if items is None:
+                    running -= 1
+                    continue
+                page_count += 1
+                buffer.writelines(copy_line(item) for item in items)
+                rows += len(items)
+                if rows >= COPY_ROWS:
+                    buffer.seek(0)
+                    cur.copy_expert(COPY_SQL, buffer)
+                    buffer, rows = io.StringIO(), 0
+        finally:
+            stop.set()
+        for future in futures:
+            # a slice that failed would otherwise look like an empty one
+            future.result()
+    if rows:
+        buffer.seek(0)
+        cur.copy_expert(COPY_SQL, buffer)
+    return page_count
+
+
+def reconcile(conn: Any, provider: YooKassa, since: datetime.datetime,
+              until: datetime.datetime) -> Dict[str, Any]:
+    '''Credits every succeeded payment of [since, until) that is not credited yet. Raises AlreadyRunning.'''
+    started = time.monotonic()
+    with conn, conn.cursor() as cur:
+        cur.execute(LOCK_SQL, (LOCK_KEY,))
+        if not cur.fetchone()[0]:
+            raise AlreadyRunning('another reconciliation is running')
+    try:
+        with conn, conn.cursor() as cur:
+            page_count = stage(cur, provider, since, until)
+            fetched_at = time.monotonic()
+            cur.execute(DIFF_SQL, PRICE_COLUMNS)
+            fetched, missing, skipped, skipped_ids = cur.fetchone()
+        diffed_at = time.monotonic()
+
+        credited = users = 0
+        for after in range(0, missing, BATCH_SIZE):
+            with conn, conn.cursor() as cur:
+                cur.execute(BATCH_SQL, (after, after + BATCH_SIZE))
+                batch_credited, batch_users = credit(cur, [PaidPayment(*row) for row in cur.fetchall()])
+            credited += batch_credited
+            users += batch_users
+    finally:
+        with conn, conn.cursor() as cur:
+            cur.execute(UNLOCK_SQL, (LOCK_KEY,))
+
+    return {
+        'since': isoformat(since),
+        'until': isoformat(until),
+        'pages': page_count,
+        'fetched': fetched,
+        'missing': missing,
+        'credited': credited,
+        'usersCredited': users,
+        'skipped': skipped,
+        'skippedIds': skipped_ids or [],
+        'fetchSeconds': round(fetched_at - started, 2),
+        'diffSeconds': round(diffed_at - fetched_at, 2),
+        'creditSeconds': round(time.monotonic() - diffed_at, 2),
+    }
@@ -0,0 +1,364 @@
+'''
+Polynomial equations in one variable and small linear systems for simple-ai.
+
+    solve_problem('реши уравнение x³ - 6x² + 11x - 6 = 0')
+    solve_problem('x + y = 10, x - y = 2')
+
+The equation is cut out of the query (the runs of digits, x/y/z and
+operators around '='), parsed into coefficients and solved:
+
+    degree 1-2     closed form, with the same steps a teacher would write
+    degree 3+      eigenvalues of the companion matrix (numpy.roots)
+    systems        numpy.linalg.solve, or lstsq + ranks when A is singular
+                   or not square
+
+Answers are cached by the normalized problem text, so a problem that a
+whole class is sending is parsed and solved once. numpy is imported only
+by the branches that need it, outside the request's CPU budget. Numbers
+longer than MAX_NUMBER_DIGITS raise budget.TooComplex.
+'''
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from budget import TooComplex, check, exempt
+
+MAX_DEGREE = 8
+MAX_UNKNOWNS = 4
+MAX_EQUATIONS = 6
+MAX_NUMBER_DIGITS = 15
+EPS = 1e-9
+
+VARIABLES = 'xyz'
+SUPERSCRIPTS = {2: '²', 3: '³', 4: '⁴', 5: '⁵', 6: '⁶', 7: '⁷', 8: '⁸'}
+SUBSCRIPTS = dict(zip('0123456789', '₀₁₂₃₄₅₆₇₈₉'))
+
+# runs of letters; the ones that are not all x/y/z are words and end a span
+WORD_RE = re.compile(r'[^\W\d_]+')
+SPAN_RE = re.compile(r'[0-9xyz+\-*/^=.,;()\s]+')
+# brackets, and operands side by side ("5 x", "2 3"): products the parser would misread
+AMBIGUOUS_RE = re.compile(r'[()]|[0-9xyz.][ \t]+[0-9xyz]')
+BLANKS_RE = re.compile(r'[^\S\n]+')
+# (variable, power) -> coefficient; ('', 0) is the constant term
+Terms = Dict[Tuple[str, int], float]
+
+TERM_RE = re.compile(r'([+-]?)(\d+(?:\.\d+)?)?(?:\*?([xyz])(?:\^(\d+)|([2-8])(?![\d.]))?)?')
+
+
+def _word(match: re.Match) -> str:
+    return match.group() if not match.group().strip(VARIABLES) else '|'
+
+
+def extract(query_lower: str) -> str:
+    '''
+    The equation part of a query: latin x/y/z, digits, operators; no spaces.
+
+    Only the spans holding '=' are taken (or, with no '=' anywhere, the ones
+    holding an unknown), joined by ',', so numbers elsewhere in the text
+    ("номер 5:", "для 8 класса") stay out. Brackets and operands written side
+    by side give '': the parser does not expand "2(x+1)", and a guess would
+    be a confident wrong answer.
+    '''
+    text = query_lower.replace('²', '^2').replace('³', '^3').replace('−', '-').replace('×', '*')
+    spans = [span.strip(' \t\r\n.,;') for span in SPAN_RE.findall(WORD_RE.sub(_word, text))]
+    chosen = [span for span in spans if '=' in span] or [span for span in spans if any(v in span for v in VARIABLES)]
+    if any(AMBIGUOUS_RE.search(span) for span in chosen):
+        return ''
+    return ','.join(BLANKS_RE.sub('', span) for span in chosen)
+
+
+def parse_side(side: str) -> Optional[Terms]:
+    '''Sum of terms -> {(variable, power): coefficient}; ('', 0) is the constant.'''
+    terms: Terms = {}
+    pos = 0
+    while pos < len(side):
+        match = TERM_RE.match(side, pos)
+        sign, number, variable, power, short_power = match.groups()
+        if match.end() == pos or (number is None and variable is None):
+            return None
+        if pos > 0 and not sign:
+            return None
+        if number is not None and len(number) > MAX_NUMBER_DIGITS:
+            raise TooComplex()
+        value = float(number) if number is not None else 1.0
+        if sign == '-':
+            value = -value
+        exponent = int(power or short_power or 1) if variable else 0
+        # x^0 is 1: a constant, not a term of its own that the solver would not see
+        key = (variable, exponent) if exponent else ('', 0)
+        terms[key] = terms.get(key, 0.0) + value
+        pos = match.end()
+    return terms if terms else None
+
+
+def parse_equation(text: str) -> Optional[Tuple[Terms, Terms]]:
+    '''"lhs = rhs" -> (lhs, rhs) terms; a bare polynomial means "= 0".'''
+    sides = text.split('=')
+    if len(sides) > 2:
+        return None
+    left = parse_side(sides[0])
+    right = parse_side(sides[1]) if len(sides) == 2 else {}
+    if left is None or right is None:
+        return None
+    return left, right
+
+
+def difference(left: Terms, right: Terms) -> Terms:
+    terms = dict(left)
+    for key, value in right.items():
+        terms[key] = terms.get(key, 0.0) - value
+    return terms
+
+
+def fmt(value: float) -> str:
+    if abs(value - round(value)) < EPS:
+        return str(int(round(value)))
+    return f'{value:.6g}'
+
+
+def fmt_complex(value: complex) -> str:
+    if abs(value.imag) < EPS:
+        return fmt(value.real)
+    imag = '' if abs(abs(value.imag) - 1) < EPS else fmt(abs(value.imag))
+    if abs(value.real) < EPS:
+        return f'{"-" if value.imag < 0 else ""}{imag}i'
+    return f'{fmt(value.real)} {"-" if value.imag < 0 else "+"} {imag}i'
+
+
+def paren(value: float) -> str:
+    return f'({fmt(value)})' if value < -EPS else fmt(value)
+
+
+def term_text(variable: str, power: int) -> str:
+    if not variable:
+        return ''
+    return variable + (SUPERSCRIPTS.get(power, f'^{power}') if power > 1 else '')
+
+
+def side_text(terms: Terms) -> str:
+    '''{('x', 2): 2, ('x', 1): -3, ('', 0): 1} -> "2x² - 3x + 1".'''
+    parts = []
+    for (variable, power), c in sorted(terms.items(), key=lambda item: (-item[0][1], item[0][0])):
+        if abs(c) < EPS:
+            continue
+        magnitude = '' if variable and abs(abs(c) - 1) < EPS else fmt(abs(c))
+        parts.append(('-' if c < 0 else '+', magnitude + term_text(variable, power)))
+    if not parts:
+        return '0'
+    text = ('-' if parts[0][0] == '-' else '') + parts[0][1]
+    return text + ''.join(f' {sign} {body}' for sign, body in parts[1:])
+
+
+def poly_text(coefficients: List[float], variable: str = 'x') -> str:
+    '''Highest power first -> "2x³ - 6x + 1".'''
+    degree = len(coefficients) - 1
+    return side_text({(variable if degree - i else '', degree - i): c for i, c in enumerate(coefficients)})
+
+
+def reduced(original: str, canonical: str) -> str:
+    '''The "bring everything to the left" line, when the equation was not written that way.'''
+    if original == canonical:
+        return ''
+    return f'Переносим всё в левую часть:\n{canonical}\n\n'
+
+
+def solve_linear(original: str, a: float, b: float) -> str:
+    x = -b / a
+    lines = [f'**Решение уравнения {original}**', '',
+             '📐 **Шаг 1: Переносим члены с x влево, числа вправо**',
+             f'{poly_text([a, 0])} = {fmt(-b)}', '']
+    if abs(a - 1) > EPS:
+        lines += [f'📐 **Шаг 2: Делим обе части на {fmt(a)}**',
+                  f'x = {fmt(-b)} / {fmt(a)}', f'x = {fmt(x)}', '']
+    lines.append(f'✅ **Ответ: x = {fmt(x)}**')
+    return '\n'.join(lines)
+
+
+def solve_quadratic(original: str, a: float, b: float, c: float) -> str:
+    d = b * b - 4 * a * c
+    header = f"""**Решение квадратного уравнения {original}**
+
+{reduced(original, f'{poly_text([a, b, c])} = 0')}📐 **Шаг 1: Коэффициенты**
+- a = {fmt(a)} (при x²)
+- b = {fmt(b)} (при x)
+- c = {fmt(c)} (свободный член)
+
+🔢 **Шаг 2: Дискриминант**
+D = b² - 4ac = {paren(b)}² - 4×{paren(a)}×{paren(c)} = {fmt(b * b)} - {paren(4 * a * c)} = {fmt(d)}
+"""
+    if abs(d) < EPS:
+        x = -b / (2 * a)
+        return header + f"""
+✅ D = 0, уравнение имеет 1 корень
+
+📊 **Шаг 3: Корень уравнения**
+x = -b / 2a = {fmt(-b)} / {fmt(2 * a)} = {fmt(x)}
+
+✅ **Ответ: x = {fmt(x)}**"""
+    if d > 0:
+        root = d ** 0.5
+        x1, x2 = (-b + root) / (2 * a), (-b - root) / (2 * a)
+        return header + f"""
+✅ D = {fmt(d)} > 0, уравнение имеет 2 корня
+
+📊 **Шаг 3: Корни уравнения**
+x₁ = (-b + √D) / 2a = ({fmt(-b)} + {fmt(root)}) / {fmt(2 * a)} = {fmt(x1)}
+x₂ = (-b - √D) / 2a = ({fmt(-b)} - {fmt(root)}) / {fmt(2 * a)} = {fmt(x2)}
+
+✅ **Ответ: x₁ = {fmt(x1)}, x₂ = {fmt(x2)}**"""
+    root = (-d) ** 0.5
+    x1, x2 = complex(-b, root) / (2 * a), complex(-b, -root) / (2 * a)
+    return header + f"""
+⚠️ D = {fmt(d)} < 0, действительных корней нет
+
+📊 **Шаг 3: Комплексные корни**
+x = (-b ± i√|D|) / 2a = ({fmt(-b)} ± {fmt_complex(complex(0, root))}) / {fmt(2 * a)}
+
+✅ **Ответ: действительных корней нет; x₁ = {fmt_complex(x1)}, x₂ = {fmt_complex(x2)}**"""
+
+
+def solve_polynomial(original: str, coefficients: List[float]) -> str:
+    with exempt():
+        import numpy as np
+
+    degree = len(coefficients) - 1
+    monic = [c / coefficients[0] for c in coefficients]
+    companion = np.zeros((degree, degree))
+    companion[0, :] = [-c for c in monic[1:]]
+    companion[1:, :-1] = np.eye(degree - 1)
+    # np.roots takes the eigenvalues of this same matrix
+    roots = sorted(np.roots(coefficients), key=lambda r: (abs(r.imag) > 1e-7, r.real, r.imag))
+    roots = [complex(r.real, 0.0) if abs(r.imag) <= 1e-7 else complex(r) for r in roots]
+    real = [r.real for r in roots if not r.imag]
+    other = [r for r in roots if r.imag]
+    residual = max(abs(np.polyval(coefficients, r)) for r in roots)
+
+    lines = [f'**Решение уравнения {original}**', '', reduced(original, f'{poly_text(coefficients)} = 0')
+             + f'📐 **Шаг 1: Многочлен степени {degree}**',
+             'Формулы Кардано и Феррари громоздки, а с 5-й степени общих формул нет, поэтому '
+             'корни ищем численно.', '']
+    if abs(monic[0] - coefficients[0]) > EPS:
+        lines += [f'🔢 **Делим на старший коэффициент {fmt(coefficients[0])}**', f'{poly_text(monic)} = 0', '']
+    lines += ['🧮 **Шаг 2: Сопровождающая матрица**',
+              'В первой строке — коэффициенты с обратным знаком, под ней единичная диагональ. '
+              'Её собственные значения — ровно корни многочлена:', '']
+    lines += ['| ' + '  '.join(f'{fmt(v):>6}' for v in row) + ' |' for row in companion]
+    lines += ['', '📊 **Шаг 3: Собственные значения (корни)**']
+    lines += [f'x{"".join(SUBSCRIPTS[d] for d in str(i))} = {fmt_complex(r)}' for i, r in enumerate(roots, 1)]
+    lines += ['', f'✔️ **Проверка:** подстановка корней даёт |P(x)| ≤ {residual:.1e}', '']
+    answer = []
+    if real:
+        answer.append('x = ' + ', '.join(fmt(r) for r in real))
+    if other:
+        answer.append(('комплексные корни ' if real else 'действительных корней нет; x = ')
+                      + ', '.join(fmt_complex(r) for r in other))
+    lines.append(f'✅ **Ответ: {"; ".join(answer)}**')
+    return '\n'.join(lines)
+
+
+def solve_single(left: Terms, right: Terms, variable: str) -> Optional[str]:
+    terms = difference(left, right)
+    degree = max(power for _, power in terms)
+    if degree > MAX_DEGREE:
+        return None
+    coefficients = [terms.get((variable if p else '', p), 0.0) for p in range(degree, -1, -1)]
+    while len(coefficients) > 1 and abs(coefficients[0]) < EPS:
+        coefficients.pop(0)
+    original = f'{side_text(left)} = {side_text(right)}'
+    if len(coefficients) == 1:
+        if abs(coefficients[0]) < EPS:
+            return f'**Уравнение {original} верно при любом {variable}**\n\n✅ **Ответ: {variable} — любое число**'
+        return f'**Уравнение {original} сводится к {fmt(coefficients[0])} = 0**\n\n✅ **Ответ: решений нет**'
+    if variable != 'x':
+        return None
+    if len(coefficients) == 2:
+        return solve_linear(original, *coefficients)
+    if len(coefficients) == 3:
+        return solve_quadratic(original, *coefficients)
+    return solve_polynomial(original, coefficients)
+
+
+def substituted(row: List[float], variables: List[str], solution: List[float]) -> str:
+    '''"x + 2y" with x = 3, y = -1 -> "3 + 2·(-1)".'''
+    parts = []
+    for c, value in zip(row, solution):
+        if abs(c) < EPS:
+            continue
+        body = paren(value) if abs(abs(c) - 1) < EPS else f'{fmt(abs(c))}·{paren(value)}'
+        parts.append(('-' if c < 0 else '+', body))
+    text = ('-' if parts[0][0] == '-' else '') + parts[0][1]
+    return text + ''.join(f' {sign} {body}' for sign, body in parts[1:])
+
+
+def solve_system(equations: List[Terms], variables: List[str]) -> Optional[str]:
+    with exempt():
+        import numpy as np
+
+    if any(power > 1 for eq in equations for _, power in eq):
+        return None
+    a = np.array([[eq.get((v, 1), 0.0) for v in variables] for eq in equations])
+    b = np.array([-eq.get(('', 0), 0.0) for eq in equations])
+    if not a.any(axis=1).all():
+        return None
+    lines = ['**Решение системы линейных уравнений**', '', '📐 **Шаг 1: Система**']
+    lines += [f'{side_text({(v, 1): c for v, c in zip(variables, row)})} = {fmt(rhs)}' for row, rhs in zip(a, b)]
+    lines += ['', '🧮 **Шаг 2: Матричный вид A·X = B**',
+              'A = [' + '; '.join(' '.join(fmt(c) for c in row) for row in a) + ']',
+              'B = [' + ' '.join(fmt(c) for c in b) + ']', '']
+
+    n = len(variables)
+    rank_a = int(np.linalg.matrix_rank(a))
+    rank_ab = int(np.linalg.matrix_rank(np.column_stack([a, b])))
+    if a.shape[0] == n and rank_a == n:
+        solution = np.linalg.solve(a, b)
+        lines += ['🔢 **Шаг 3: Определитель**',
+                  f'det A = {fmt(float(np.linalg.det(a)))} ≠ 0, решение единственное', '',
+                  '📊 **Шаг 4: Решение (метод Гаусса)**']
+    elif rank_a != rank_ab:
+        lines += ['🔢 **Шаг 3: Ранги**', f'rang A = {rank_a}, rang (A|B) = {rank_ab}', '',
+                  '✅ **Ответ: система несовместна, решений нет**']
+        return '\n'.join(lines)
+    else:
+        solution = np.linalg.lstsq(a, b, rcond=None)[0]
+        lines += ['🔢 **Шаг 3: Ранги**', f'rang A = rang (A|B) = {rank_a}', '']
+        if rank_a < n:
+            lines += [f'Неизвестных {n}, независимых уравнений {rank_a} — решений бесконечно много.',
+                      'Вот одно из них (с наименьшей нормой, метод наименьших квадратов):', '']
+        else:
+            lines += ['Лишние уравнения следуют из остальных, решение единственное.', '']
+        lines.append('📊 **Шаг 4: Решение**')
+
+    values = [float(x) for x in solution]
+    lines += [f'{v} = {fmt(x)}' for v, x in zip(variables, values)]
+    lines += ['', '✔️ **Проверка:**']
+    lines += [f'{substituted(row, variables, values)} = {fmt(float(row @ solution))} ✓' for row in a]
+    lines += ['', '✅ **Ответ: ' + ', '.join(f'{v} = {fmt(x)}' for v, x in zip(variables, values)) + '**']
+    return '\n'.join(lines)
+
+
+@lru_cache(maxsize=1024)
+def solve_text(problem: str) -> Optional[str]:
+    '''Answer for an extracted problem ("2x+5=13", "x+y=10,x-y=2"); None if it does not parse.'''
+    parts = [p for p in re.split(r'[,;\n]', problem) if p]
+    if not parts or len(parts) > MAX_EQUATIONS:
+        return None
+    equations = []
+    for part in parts:
+        check()
+        equations.append(parse_equation(part))
+    if any(eq is None for eq in equations):
+        return None
+    variables = sorted({v for left, right in equations for v, _ in (*left, *right) if v})
+    if not variables or len(variables) > MAX_UNKNOWNS:
+        return None
+    if len(equations) == 1:
+        return solve_single(*equations[0], variables[0]) if len(variables) == 1 else None
+    return solve_system([difference(left, right) for left, right in equations], variables)
+
+
+def solve_problem(query_lower: str) -> Optional[str]:
+    '''Step-by-step solution of the equation or system in a query, or None.'''
+    problem = extract(query_lower)
+    if not any(v in problem for v in VARIABLES):
+        return None
+    return solve_text(problem)
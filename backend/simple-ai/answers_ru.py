@@ -0,0 +1,577 @@
+'''
+Static Russian answers for simple-ai: the CONTENT of pack_ru.
+
+Kept out of index.py and the pack so that a cold start (and every preflight
+or rejected request) does not pay for unmarshalling several KB of text;
+index.answers() imports this module on first use. Every answer is a StaticAnswer, so its
+response body is encoded once per process.
+'''
+from static_answer import StaticAnswer, static_table
+
+SPORT = StaticAnswer("""**Спорт — это физическая активность и соревнования для развития тела, духа и характера.**
+
+🏃 **Что такое спорт?**
+
+Спорт — это организованная физическая деятельность, направленная на достижение результатов, укрепление здоровья и развитие личности. Он включает тренировки, соревнования и игры.
+
+💪 **Основные функции спорта:**
+
+**1. Физическое развитие**
+- Укрепляет мышцы, кости и суставы
+- Улучшает работу сердца и лёгких
+- Повышает выносливость и гибкость
+- Помогает контролировать вес
+
+**2. Психологическая польза**
+- Снижает стресс и тревожность
+- Улучшает настроение (выработка эндорфинов)
+- Развивает дисциплину и целеустремлённость
+- Повышает самооценку и уверенность
+
+**3. Социальное значение**
+- Учит работе в команде
+- Развивает лидерские качества
+- Помогает заводить друзей
+- Воспитывает уважение к соперникам
+
+⚽ **Виды спорта:**
+
+**Командные:**
+- Футбол, баскетбол, волейбол, хоккей
+
+**Индивидуальные:**
+- Бег, плавание, теннис, гимнастика
+
+**Силовые:**
+- Тяжёлая атлетика, бодибилдинг, пауэрлифтинг
+
+**Экстремальные:**
+- Сноубординг, паркур, скалолазание, сёрфинг
+
+🎯 **Почему важно заниматься спортом?**
+
+✅ Здоровье: профилактика болезней, долголетие
+✅ Красота: подтянутое тело, хорошая осанка
+✅ Энергия: бодрость на весь день
+✅ Характер: сила воли, упорство, стрессоустойчивость
+✅ Успех: спортсмены более целеустремлённые в жизни
+
+💡 **Как начать?**
+1. Выбери вид спорта по душе
+2. Начни с 20-30 минут 3 раза в неделю
+3. Увеличивай нагрузку постепенно
+4. Найди единомышленников для мотивации
+
+🏆 **Вывод:**
+Спорт — это не просто физкультура, это образ жизни, который делает нас здоровее, счастливее и успешнее!""")
+
+PHOTOSYNTHESIS = StaticAnswer("""**Фотосинтез — процесс, при котором растения создают питательные вещества из света, воды и углекислого газа.**
+
+🌱 **Что происходит:**
+
+**Химическая формула:**
+6CO₂ + 6H₂O + свет → C₆H₁₂O₆ + 6O₂
+
+(углекислый газ + вода + энергия света → глюкоза + кислород)
+
+🔬 **Где происходит:**
+- В **хлоропластах** — зелёных органеллах клеток листьев
+- **Хлорофилл** (зелёный пигмент) улавливает свет
+
+⚡ **Две фазы фотосинтеза:**
+
+**1. Световая фаза** (только на свету):
+- Хлорофилл поглощает энергию солнечного света
+- Вода (H₂O) расщепляется на водород (H) и кислород (O₂)
+- Кислород выделяется в атмосферу через устьица листьев
+- Образуется энергия (АТФ) для темновой фазы
+
+**2. Темновая фаза** (может идти без света):
+- CO₂ из воздуха попадает в лист через устьица
+- Углекислый газ соединяется с водородом
+- Образуется **глюкоза** (C₆H₁₂O₆) — сахар, питание для растения
+- Из глюкозы растение строит крахмал, целлюлозу, белки
+
+🌍 **Значение для жизни на Земле:**
+
+✅ **Производство кислорода** — растения вырабатывают весь O₂ в атмосфере
+✅ **Пища для всех** — растения = основа пищевой цепи
+✅ **Поглощение CO₂** — очищение воздуха от углекислого газа
+✅ **Энергия** — основа всей жизни (растения → животные → человек)
+
+💡 **Простыми словами:**
+
+Представь, что растение — это **живая солнечная батарея**:
+1. Ловит свет листьями
+2. Берёт воду из почвы корнями
+3. Вдыхает CO₂ из воздуха
+4. Превращает всё это в еду (сахар) для себя
+5. Выдыхает кислород для нас!
+
+🌿 **Без фотосинтеза:**
+- Не было бы кислорода → мы не смогли бы дышать
+- Не было бы растений → нечего было бы есть
+- Жизнь на Земле была бы невозможна!
+
+🎯 **Интересный факт:**
+Один большой дуб за год производит кислорода столько, что хватит для дыхания 10 человек!""")
+
+ARTICLE_SPORT = StaticAnswer("""**Роль спорта в жизни современного человека**
+
+В XXI веке спорт стал неотъемлемой частью жизни миллионов людей по всему миру. Это не просто физическая активность, а целая культура, влияющая на здоровье, социальную жизнь и личностное развитие.
+
+**Физическое здоровье**
+
+Регулярные занятия спортом укрепляют сердечно-сосудистую систему, повышают иммунитет и продлевают жизнь. Исследования показывают, что люди, занимающиеся спортом 3-4 раза в неделю, на 40% реже страдают хроническими заболеваниями. Физическая активность помогает контролировать вес, улучшает обмен веществ и повышает общий тонус организма.
+
+**Психологическое благополучие**
+
+Во время тренировок организм вырабатывает эндорфины — гормоны счастья, которые снижают стресс и улучшают настроение. Спорт помогает бороться с депрессией, повышает самооценку и уверенность в себе. Регулярные занятия развивают дисциплину, целеустремлённость и умение преодолевать трудности.
+
+**Социальная значимость**
+
+Командные виды спорта учат работать в коллективе, уважать соперников и радоваться успехам других. Спортивные секции и клубы — отличное место для новых знакомств и создания дружеских связей. Спорт объединяет людей разных возрастов, национальностей и социальных слоёв.
+
+**Спорт в современном мире**
+
+Сегодня доступны сотни видов спорта — от классических (футбол, плавание) до экстремальных (паркур, скейтбординг). Технологии делают занятия удобнее: фитнес-трекеры, приложения для тренировок, онлайн-марафоны. Спортивная индустрия создаёт миллионы рабочих мест и вносит вклад в экономику.
+
+**Заключение**
+
+Спорт — это инвестиция в своё здоровье, настроение и будущее. Необязательно становиться профессиональным спортсменом — даже 30 минут активности в день способны значительно улучшить качество жизни. Главное — найти занятие по душе и сделать спорт частью своей повседневности.
+
+---
+*Статья готова! Можешь использовать как основу для реферата или эссе.* ✨""")
+
+ARTICLE_EDUCATION = StaticAnswer("""**Современные технологии в образовании**
+
+XXI век изменил подход к обучению. Интернет, искусственный интеллект и онлайн-платформы сделали знания доступными каждому.
+
+**Онлайн-образование**
+
+Курсы от ведущих университетов мира теперь доступны бесплатно. Платформы вроде Coursera, Khan Academy позволяют учиться в удобном темпе из любой точки мира.
+
+**Интерактивное обучение**
+
+VR-технологии погружают студентов в виртуальные лаборатории. AI-помощники адаптируют программу под каждого ученика, делая обучение персонализированным.
+
+**Геймификация**
+
+Игровые элементы в учёбе повышают мотивацию. Баллы, достижения и рейтинги превращают скучные задания в увлекательный процесс.
+
+**Заключение**
+
+Технологии не заменят учителя, но сделают образование доступнее, интереснее и эффективнее. Будущее — за гибридным обучением, сочетающим лучшее из онлайн и офлайн-миров.
+
+---
+*Готовый текст для презентации или доклада!* 💻""")
+
+LOGIC_MONTY_HALL = StaticAnswer("""**Решение логической задачи**
+
+**Задача:**
+У вас есть 3 двери. За одной — приз, за остальными — пусто. Вы выбрали дверь №1. Ведущий открывает дверь №3 (пусто) и предлагает изменить выбор. Что делать?
+
+**Решение:**
+
+🧠 **Анализ вероятностей:**
+
+**Если НЕ меняете выбор:**
+- Вероятность выигрыша = 1/3 (33%)
+- Ваш первый выбор случаен
+
+**Если МЕНЯЕТЕ выбор:**
+- Вероятность выигрыша = 2/3 (67%)!
+- Ведущий всегда открывает пустую дверь
+- Если вы изначально выбрали пустую (2/3), приз точно за другой закрытой
+
+✅ **Ответ: ВСЕГДА меняйте выбор!**
+
+**Почему это работает:**
+1. В 2 из 3 случаев вы сначала выбираете пустую дверь
+2. Ведущий открывает другую пустую
+3. Значит, за оставшейся — приз!
+
+💡 Это знаменитая "парадокс Монти Холла" — пример того, как интуиция обманывает!
+
+---
+
+Задай свою логическую задачу — решу пошагово! 🎯""")
+
+# explain_topic: first key found in the query wins, in this order
+TOPICS = static_table({
+    'интернет': """**Как работает интернет?**
+
+🌐 **Простое объяснение:**
+
+Интернет — это глобальная сеть компьютеров, соединённых кабелями и спутниками.
+
+**Что происходит, когда вы открываете сайт:**
+
+1️⃣ **Вы вводите адрес** (например, google.com)
+
+2️⃣ **DNS-сервер** переводит имя в IP-адрес (как номер телефона)
+- google.com → 142.250.185.46
+
+3️⃣ **Запрос идёт через провайдера** по оптоволокну/кабелю
+
+4️⃣ **Сервер Google** получает запрос и отправляет данные обратно
+
+5️⃣ **Ваш браузер** собирает данные и показывает страницу
+
+**Скорость:** Сигнал проходит тысячи километров за доли секунды!
+
+**Безопасность:** HTTPS шифрует данные, чтобы никто не мог их прочитать.
+
+💡 По сути, интернет — это миллиарды компьютеров, говорящих на одном языке (протокол TCP/IP)!""",
+
+    'гравитация': """**Что такое гравитация?**
+
+🌍 **Определение:**
+Гравитация — сила притяжения между всеми объектами с массой.
+
+**Как работает:**
+- Чем больше масса объекта — тем сильнее притяжение
+- Земля притягивает всё к центру (9.8 м/с²)
+- Солнце удерживает планеты на орбите
+
+**Закон Ньютона:**
+F = G × (m₁ × m₂) / r²
+
+Где:
+- F — сила притяжения
+- G — гравитационная постоянная
+- m₁, m₂ — массы объектов
+- r — расстояние между ними
+
+**Интересные факты:**
+🌙 На Луне вы весите в 6 раз меньше (слабее гравитация)
+🪐 На Юпитере — в 2.5 раза больше (сильнее гравитация)
+🕳️ Чёрные дыры — гравитация настолько сильна, что не выпускает даже свет!
+
+💡 **Простыми словами:** Гравитация — это невидимая сила, которая всё притягивает друг к другу. Благодаря ей мы ходим по Земле, а не летаем в космос!""",
+
+    'регресс': """**Что такое активный регресс и его виды?**
+
+🧠 **Определение:**
+Активный регресс — это психологический защитный механизм, при котором человек временно возвращается к более ранним, детским формам поведения в стрессовых ситуациях.
+
+📊 **Виды регрессии:**
+
+**1. Возрастная регрессия**
+- Взрослый начинает вести себя как ребёнок
+- Примеры: капризы, плач, детская речь
+- Причина: сильный стресс, травма
+
+**2. Когнитивная регрессия**
+- Снижение уровня мышления
+- Упрощение логики и решений
+- Проявление: примитивные реакции на сложные проблемы
+
+**3. Эмоциональная регрессия**
+- Неконтролируемые эмоции
+- Истерики, обиды, как у детей
+- Потеря эмоциональной зрелости
+
+**4. Поведенческая регрессия**
+- Возврат к детским привычкам
+- Примеры: сосание пальца, зависимость от родителей
+- Часто при болезнях или потрясениях
+
+**5. Социальная регрессия**
+- Избегание ответственности
+- Желание, чтобы другие решали проблемы
+- Инфантильность в отношениях
+
+🎯 **Когда проявляется:**
+✅ Сильный стресс или конфликт
+✅ Болезнь или усталость
+✅ Психологическая травма
+✅ Неспособность справиться с ситуацией
+
+💡 **Нормально ли это?**
+Да, кратковременная регрессия — нормальная защитная реакция. Но если она затягивается — нужна помощь психолога.
+
+🔧 **Как справиться:**
+- Осознать регрессию
+- Найти причину стресса
+- Использовать взрослые способы решения проблем
+- При необходимости — терапия
+
+**Простыми словами:** Регресс — это когда взрослый человек временно "откатывается" к детскому поведению, чтобы защититься от стресса."""
+})
+
+CODE_SORTING = StaticAnswer("""**Сортировка массива на Python**
+
+```python
+# Пузырьковая сортировка (простая для понимания)
+def bubble_sort(arr):
+    n = len(arr)
+    
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            # Если текущий элемент больше следующего
+            if arr[j] > arr[j + 1]:
+                # Меняем их местами
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+    
+    return arr
+
+# Использование
+numbers = [64, 34, 25, 12, 22, 11, 90]
+sorted_numbers = bubble_sort(numbers)
+print(sorted_numbers)  # [11, 12, 22, 25, 34, 64, 90]
+```
+
+**Как работает:**
+1. Проходим по массиву много раз
+2. Сравниваем соседние элементы
+3. Если левый больше правого — меняем местами
+4. Повторяем, пока массив не отсортируется
+
+⚡ **Быстрый способ (встроенная функция):**
+```python
+numbers = [64, 34, 25, 12, 22, 11, 90]
+numbers.sort()  # Или sorted(numbers)
+print(numbers)
+```
+
+💡 Готовый код — копируй и используй! 🚀""")
+
+CODE_HELP = StaticAnswer("""**Помогу с программированием!**
+
+**Напиши конкретную задачу:**
+- Напиши код для сортировки массива
+- Как создать функцию в Python?
+- Объясни цикл for
+- Напиши калькулятор на JavaScript
+
+И я дам готовый работающий код с объяснениями! 💻""")
+
+# smart_universal_answer: first key found in the query wins, in this order
+KNOWLEDGE_BASE = static_table({
+    'истори': """**История — наука о прошлом человечества и её виды исследований.**
+
+📚 **Что такое история:**
+
+**Определение:**
+История — наука, изучающая прошлое человечества через источники (документы, артефакты, свидетельства).
+
+🔍 **Виды истории по предмету изучения:**
+
+**1. Политическая история**
+- Изучает государства, власть, войны, революции
+- Примеры: история царских династий, образование СССР
+
+**2. Экономическая история**
+- Развитие хозяйства, торговли, финансов
+- Примеры: промышленная революция, экономические кризисы
+
+**3. Социальная история**
+- Жизнь общества, классы, сословия
+- Примеры: история крестьянства, рабочего класса
+
+**4. Культурная история**
+- Искусство, литература, наука, религия
+- Примеры: Ренессанс, эпоха Просвещения
+
+**5. История повседневности**
+- Быт, традиции, образ жизни людей
+- Примеры: как жили в Средневековье, мода разных эпох
+
+📊 **Виды истории по масштабу:**
+
+**1. Всемирная (всеобщая) история**
+- История всего человечества
+- От древних цивилизаций до наших дней
+
+**2. История отдельных стран/регионов**
+- История России, Европы, Азии и т.д.
+- Локальная история (города, села)
+
+**3. Микроистория**
+- Детальное изучение одного события/человека
+- Примеры: биография Пушкина, история одной деревни
+
+🛠️ **Виды истории по методам:**
+
+**1. Документальная история**
+- Основана на письменных источниках
+- Летописи, законы, письма
+
+**2. Устная история**
+- Основана на свидетельствах очевидцев
+- Интервью, легенды, мифы
+
+**3. Археологическая история**
+- Изучение материальных остатков
+- Раскопки, артефакты, древние постройки
+
+💡 **Зачем изучать историю:**
+✅ Понимать, как сформировался современный мир
+✅ Учиться на ошибках прошлого
+✅ Понимать причины современных событий
+✅ Развивать критическое мышление
+
+📖 **Интересные факты:**
+- Письменная история началась ~5000 лет назад (Древний Египет, Месопотамия)
+- До этого — предыстория (археология, антропология)
+- История субъективна — зависит от того, кто её пишет!
+
+**Простыми словами:** История — это изучение прошлого во всех его проявлениях: от великих войн до быта простых людей. Она делится на виды по предмету (политика, экономика, культура), масштабу (мировая, локальная) и методам исследования!""",
+
+    'счасть': """**Счастье — состояние эмоционального благополучия и удовлетворённости жизнью.**
+
+😊 **Что такое счастье:**
+
+**Философский взгляд:**
+- Античность: счастье = добродетель + мудрость (Аристотель)
+- Гедонизм: счастье = максимум удовольствия
+- Стоицизм: счастье = внутренний покой и принятие
+
+**Научный подход (психология):**
+- Счастье = сочетание эмоций (радость) + смысла жизни
+- Формула счастья: 50% генетика + 10% обстоятельства + 40% действия человека
+
+🔑 **Компоненты счастья:**
+
+1. **Позитивные эмоции** — радость, благодарность, любовь
+2. **Вовлечённость** — состояние потока, интерес к делу
+3. **Отношения** — близкие связи с людьми
+4. **Смысл** — цель, которая больше себя
+5. **Достижения** — успехи и личностный рост
+
+💡 **Как стать счастливее:**
+✅ Практика благодарности (записывать 3 хороших момента в день)
+✅ Помощь другим (волонтёрство, добрые дела)
+✅ Физическая активность (спорт повышает эндорфины)
+✅ Социальные связи (время с близкими важнее денег)
+✅ Достижение целей (маленькие шаги к мечте)
+✅ Медитация и осознанность
+
+📊 **Интересные факты:**
+- Деньги влияют на счастье только до определённого уровня (базовые потребности)
+- Социальные связи — главный предиктор счастья
+- Счастливые люди живут на 7-10 лет дольше!
+
+**Простыми словами:** Счастье — это не постоянная эйфория, а общее удовлетворение жизнью, баланс позитива, смысла и связей с людьми. Оно зависит от ваших действий больше, чем от обстоятельств!""",
+
+    'психолог': """**Психология — наука о психике и поведении человека.**
+
+🧠 **Основные разделы:**
+
+**1. Общая психология**
+- Изучает основные психические процессы: мышление, память, внимание
+- Эмоции, воля, характер, темперамент
+
+**2. Социальная психология**
+- Поведение человека в обществе
+- Группы, лидерство, конфликты
+
+**3. Клиническая психология**
+- Диагностика и лечение психических расстройств
+- Депрессия, тревожность, фобии
+
+**4. Возрастная психология**
+- Развитие психики от рождения до старости
+- Кризисы возрастов
+
+💡 Психология помогает понять себя и других, улучшить отношения, справиться со стрессом!""",
+
+    'депресс': """**Депрессия — психическое расстройство с длительным снижением настроения и потерей интереса к жизни.**
+
+😔 **Основные симптомы:**
+- Постоянная грусть, тоска
+- Потеря интереса к любимым занятиям
+- Усталость, нехватка энергии
+- Проблемы со сном (бессонница или пересыпание)
+- Изменение аппетита (потеря или переедание)
+- Чувство вины, бесполезности
+- Трудности с концентрацией
+- Мысли о смерти
+
+**Причины:**
+✅ Биологические (нарушение химии мозга)
+✅ Психологические (стресс, травма)
+✅ Социальные (одиночество, проблемы)
+
+🔧 **Лечение:**
+1. Психотерапия (когнитивно-поведенческая)
+2. Медикаменты (антидепрессанты по назначению врача)
+3. Спорт и здоровый образ жизни
+4. Поддержка близких
+
+⚠️ **Важно:** При симптомах депрессии обратитесь к психологу или психиатру!""",
+
+    'эволюц': """**Эволюция — процесс исторического развития живых организмов.**
+
+🧬 **Теория Дарвина:**
+
+**1. Естественный отбор**
+- Выживают наиболее приспособленные
+- Передают гены потомству
+
+**2. Изменчивость**
+- Мутации создают различия
+- Случайные изменения в ДНК
+
+**3. Наследственность**
+- Признаки передаются через гены
+- ДНК — носитель информации
+
+📊 **Доказательства эволюции:**
+✅ Окаменелости (ископаемые останки)
+✅ Сравнительная анатомия (похожие органы у разных видов)
+✅ Эмбриология (зародыши похожи на ранних стадиях)
+✅ Генетика (общий ДНК-код у всех живых существ)
+
+⏱️ **Сроки:**
+- Жизнь на Земле: ~3.8 млрд лет
+- Человек разумный: ~300 тыс. лет
+
+💡 Эволюция объясняет, почему на Земле такое разнообразие жизни!""",
+
+    'квант': """**Квантовая физика — наука о поведении мельчайших частиц материи.**
+
+⚛️ **Основные принципы:**
+
+**1. Корпускулярно-волновой дуализм**
+- Частицы (электроны, фотоны) ведут себя и как волны, и как частицы
+- Зависит от способа наблюдения
+
+**2. Принцип неопределённости Гейзенберга**
+- Невозможно точно знать одновременно положение и скорость частицы
+- Чем точнее измеряем одно — тем менее точно знаем другое
+
+**3. Квантовая суперпозиция**
+- Частица может находиться в нескольких состояниях одновременно
+- Пример: кот Шрёдингера (и жив, и мёртв до наблюдения)
+
+**4. Квантовая запутанность**
+- Две частицы связаны так, что изменение одной мгновенно влияет на другую
+- Даже на расстоянии километров!
+
+💡 **Применение:**
+✅ Квантовые компьютеры
+✅ Лазеры и LED
+✅ МРТ в медицине
+✅ Солнечные батареи
+
+🎯 Квантовая физика — основа современных технологий!"""
+})
+
+# every topic key -> answer, for the typo-tolerant lookup in index.topic_index()
+ALL_TOPICS = {**TOPICS, **KNOWLEDGE_BASE, 'фотосинтез': PHOTOSYNTHESIS}
+
+# topic key -> words naming it; the title field of index.topic_retrieval()
+TOPIC_WORDS = {
+    'интернет': ['интернет'],
+    'гравитация': ['гравитация', 'гравитационный'],
+    'регресс': ['регресс'],
+    'истори': ['история', 'исторический'],
+    'счасть': ['счастье', 'счастливый'],
+    'психолог': ['психология', 'психолог', 'психологический'],
+    'депресс': ['депрессия', 'депрессивный'],
+    'эволюц': ['эволюция', 'эволюционный'],
+    'квант': ['квант', 'квантовый'],
+    'фотосинтез': ['фотосинтез'],
+}
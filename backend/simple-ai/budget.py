@@ -0,0 +1,55 @@
+'''
+Per-request CPU budget for simple-ai.
+
+    with cpu_budget():
+        ...
+        check()            # raises TooComplex once the request used its budget
+
+The budget is cooperative: the router calls check() between stages and in
+loops whose length depends on the input, and process_smart_query turns
+TooComplex into a polite "too complex" answer. Time is measured with
+time.thread_time, the CPU of the calling thread, so a request is neither
+charged for other requests served by the same process nor for waiting.
+
+One-time setup (importing answer tables or numpy, building indexes) runs
+under exempt(): the request that happens to trigger it gets the time back.
+Outside cpu_budget() the deadline is infinite and check() never raises.
+'''
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+BUDGET_MS = float(os.environ.get('SIMPLE_AI_CPU_BUDGET_MS') or 50)
+
+_cpu = time.thread_time
+_deadline: ContextVar[float] = ContextVar('simple_ai_deadline', default=float('inf'))
+
+
+class TooComplex(Exception):
+    pass
+
+
+@contextmanager
+def cpu_budget(ms: float = BUDGET_MS) -> Iterator[None]:
+    token = _deadline.set(_cpu() + ms / 1000)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def exempt() -> Iterator[None]:
+    '''Moves the deadline by the CPU time spent inside the block.'''
+    started = _cpu()
+    try:
+        yield
+    finally:
+        _deadline.set(_deadline.get() + (_cpu() - started))
+
+
+def check() -> None:
+    if _cpu() > _deadline.get():
+        raise TooComplex()
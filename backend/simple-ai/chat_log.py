@@ -0,0 +1,183 @@
+'''
+Chat history writer: every answered message of a logged-in user goes to
+ai_requests, where chat-history reads it back.
+
+Vendored into ai-chat and simple-ai by tools/sync_shared.py.
+
+    record(session.user_id, message, answer)
+
+record() appends to an in-memory queue and wakes a daemon thread, so the
+request path pays no database round trip. The thread writes whatever has
+queued up in one batched INSERT, so under load many exchanges share a
+statement and an idle instance writes each one within milliseconds.
+
+A batch the database refuses (a user deleted while their token is still
+valid fails the foreign key) is written again one row at a time, and the
+rows refused on their own are logged and dropped, so one bad row does not
+hold up the rest. A batch that fails for the connection's sake goes back
+to the queue for the next attempt, at most MAX_ATTEMPTS times; past
+MAX_PENDING rows (database down for long) new ones are dropped. Whatever
+is still queued at exit is written by an atexit hook. The thread keeps its
+connection between writes.
+
+Only session users are recorded: a bare userId in the body is the client's
+word, and history is private. Without DATABASE_URL nothing is recorded.
+'''
+import atexit
+import collections
+import os
+import sys
+import threading
+import time
+from typing import Any, Deque, List, Optional, Tuple
+
+from runtime import dumps
+
+# how long the writer waits for more rows once woken, to batch bursts
+BATCH_WAIT_SECONDS = 0.05
+BATCH_ROWS = 500
+MAX_PENDING = 20000
+RETRY_SECONDS = 5.0
+# failed writes a row waits through before it is dropped: about five minutes
+MAX_ATTEMPTS = 60
+
+INSERT_SQL = 'INSERT INTO ai_requests (user_id, request_text, response_text) VALUES %s'
+
+# (user_id, request_text, response_text, failed attempts)
+Row = Tuple[int, str, str, int]
+
+_lock = threading.Lock()
+_pending: Deque[Row] = collections.deque()
+_wake = threading.Event()
+_writer: Optional[threading.Thread] = None
+_dropped = 0
+
+
+def record(user_id: int, request_text: str, response_text: Any) -> None:
+    global _dropped
+    if not os.environ.get('DATABASE_URL'):
+        return
+    with _lock:
+        if len(_pending) >= MAX_PENDING:
+            _dropped += 1
+            return
+        # PostgreSQL text cannot hold NUL; one would fail every retry of its batch
+        _pending.append((user_id, request_text.replace('\x00', ''), str(response_text).replace('\x00', ''), 0))
+    if _writer is None:
+        _start()
+    _wake.set()
+
+
+def _take() -> List[Row]:
+    with _lock:
+        batch = [_pending.popleft() for _ in range(min(BATCH_ROWS, len(_pending)))]
+    return batch
+
+
+def _put_back(batch: List[Row]) -> None:
+    global _dropped
+    retry = [(user_id, request_text, response_text, attempts + 1)
+             for user_id, request_text, response_text, attempts in batch if attempts + 1 < MAX_ATTEMPTS]
+    with _lock:
+        room = max(0, MAX_PENDING - len(_pending))
+        _pending.extendleft(reversed(retry[:room]))
+        _dropped += len(batch) - len(retry[:room])
+
+
+def _connect() -> Any:
+    import psycopg2
+    return psycopg2.connect(os.environ['DATABASE_URL'])
+
+
+def _insert(conn: Any, batch: List[Row]) -> None:
+    from psycopg2.extras import execute_values
+    with conn, conn.cursor() as cur:
+        execute_values(cur, INSERT_SQL, [row[:3] for row in batch], page_size=BATCH_ROWS)
+
+
+def _insert_each(conn: Any, batch: List[Row]) -> int:
+    '''Writes the rows one by one, dropping the ones the database refuses; returns how many were written.'''
+    global _dropped
+    import psycopg2
+    written = 0
+    for index, row in enumerate(batch):
+        try:
+            _insert(conn, [row])
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            _put_back(batch[index:])
+            raise
+        except psycopg2.Error as e:
+            with _lock:
+                _dropped += 1
+            print(dumps({'chat_log_dropped': str(e).strip(), 'user_id': row[0]}), file=sys.stderr, flush=True)
+            continue
+        except Exception:
+            _put_back(batch[index:])
+            raise
+        written += 1
+    return written
+
+
+def _write(conn: Any) -> int:
+    import psycopg2
+    written = 0
+    while True:
+        batch = _take()
+        if not batch:
+            return written
+        try:
+            _insert(conn, batch)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            _put_back(batch)
+            raise
+        except psycopg2.Error:
+            # the database refused the statement: one of the rows is bad, find it
+            written += _insert_each(conn, batch)
+            continue
+        except Exception:
+            _put_back(batch)
+            raise
+        written += len(batch)
+
+
+def flush() -> int:
+    '''Writes everything queued on a connection of its own; returns the number of rows written.'''
+    if not os.environ.get('DATABASE_URL') or not _pending:
+        return 0
+    conn = _connect()
+    try:
+        return _write(conn)
+    finally:
+        conn.close()
+
+
+def _run() -> None:
+    conn = None
+    while True:
+        _wake.wait()
+        _wake.clear()
+        time.sleep(BATCH_WAIT_SECONDS)
+        try:
+            if conn is None or conn.closed:
+                conn = _connect()
+            _write(conn)
+        except Exception as e:
+            print(dumps({'chat_log_error': str(e), 'pending': len(_pending)}), file=sys.stderr, flush=True)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+            time.sleep(RETRY_SECONDS)
+            _wake.set()
+
+
+def _start() -> None:
+    global _writer
+    with _lock:
+        if _writer is not None:
+            return
+        _writer = threading.Thread(target=_run, name='chat-log-writer', daemon=True)
+    _writer.start()
+    atexit.register(flush)
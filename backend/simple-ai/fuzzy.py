@@ -0,0 +1,131 @@
+'''
+Typo-tolerant lookup of topic keys in a query.
+
+Topic keys are stems ('истори', 'гравитация') matched as word prefixes, so a
+match is scored by the edit distance between the key and the closest prefix
+of a query word. Candidates come from a trigram index (a key that survives
+k edits keeps all but at most 4k of its trigrams), then the distance is
+computed with a banded DP that stops once a row exceeds the edit budget.
+Adjacent transpositions count as one edit, and 'ё'/'е', 'сч'/'щ' are folded
+before comparing. The first letter has to match: typos there are rare, and
+allowing them turns ordinary words into topics ('часть' -> 'счасть').
+
+    index = FuzzyIndex(['истори', 'гравитация'])
+    index.lookup('что такое гравитацыя')   # ('гравитация', 0.9)
+
+Confidence is 1 - distance / len(key); matches under min_confidence, and
+ties between different keys, return None.
+'''
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MIN_CONFIDENCE = float(os.environ.get('FUZZY_MIN_CONFIDENCE') or 0.8)
+MIN_WORD = 4
+
+WORD_RE = re.compile(r'[a-zа-яё]+')
+
+
+def max_edits(length: int) -> int:
+    if length < 5:
+        return 0
+    if length < 8:
+        return 1
+    return 2
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = '^' + text
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def fold(text: str) -> str:
+    '''Spelling variants that sound the same are compared as one.'''
+    return text.replace('ё', 'е').replace('сч', 'щ')
+
+
+def prefix_distance(key: str, word: str, limit: int) -> int:
+    '''
+    Edit distance (adjacent transpositions count as one edit) from key to the
+    closest prefix of word; limit + 1 as soon as it is exceeded.
+    '''
+    before: List[int] = []
+    previous = list(range(len(word) + 1))
+    for i, key_char in enumerate(key, 1):
+        current = [i]
+        row_min = i
+        for j, word_char in enumerate(word, 1):
+            cost = previous[j - 1] + (key_char != word_char)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if (i > 1 and j > 1 and key_char == word[j - 2] and key[i - 2] == word_char
+                    and before[j - 2] + 1 < cost):
+                cost = before[j - 2] + 1
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous)
+
+
+class FuzzyIndex:
+    def __init__(self, keys: Iterable[str], min_confidence: float = MIN_CONFIDENCE):
+        self.keys: List[str] = list(dict.fromkeys(keys))
+        self.min_confidence = min_confidence
+        self.grams: Dict[str, List[int]] = {}
+        self.required: List[int] = []
+        self.folded: List[str] = [fold(key) for key in self.keys]
+        for index, key in enumerate(self.folded):
+            key_grams = trigrams(key)
+            self.required.append(max(1, len(key_grams) - 4 * max_edits(len(key))))
+            for gram in key_grams:
+                self.grams.setdefault(gram, []).append(index)
+        self.longest = max((len(k) for k in self.keys), default=0)
+        self._words: Dict[str, Optional[Tuple[str, float]]] = {}
+
+    def match_word(self, word: str) -> Optional[Tuple[str, float]]:
+        '''Best key for a single lower-case word, memoized per word.'''
+        cached = self._words.get(word, False)
+        if cached is not False:
+            return cached
+        head = fold(word)[:self.longest + 2]
+        shared: Dict[int, int] = {}
+        for gram in trigrams(head):
+            for index in self.grams.get(gram, ()):
+                shared[index] = shared.get(index, 0) + 1
+        best: Optional[Tuple[str, float]] = None
+        tied = False
+        for index, count in shared.items():
+            if count < self.required[index]:
+                continue
+            key = self.folded[index]
+            if key[0] != head[0]:
+                continue
+            limit = max_edits(len(key))
+            distance = prefix_distance(key, head[:len(key) + limit], limit)
+            if distance > limit:
+                continue
+            confidence = 1 - distance / len(key)
+            if best is None or confidence > best[1]:
+                best, tied = (self.keys[index], confidence), False
+            elif confidence == best[1] and self.keys[index] != best[0]:
+                tied = True
+        result = None if tied or best is None or best[1] < self.min_confidence else best
+        if len(self._words) < 4096:
+            self._words[word] = result
+        return result
+
+    def lookup(self, text: str) -> Optional[Tuple[str, float]]:
+        '''Most confident key matched by any word of a lower-case text.'''
+        best: Optional[Tuple[str, float]] = None
+        for word in WORD_RE.findall(text):
+            if len(word) < MIN_WORD:
+                continue
+            match = self.match_word(word)
+            if match is not None and (best is None or match[1] > best[1]):
+                best = match
+        return best
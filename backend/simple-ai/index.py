@@ -1,125 +1,191 @@
-import json
 from typing import Dict, Any
+import importlib
+import os
 import re
 
+from runtime import (
+    METHOD_NOT_ALLOWED, RequestError, encoded_response, error_response,
+    frozen_error, json_response, parse_json_body, preflight
+)
+from budget import TooComplex, check, cpu_budget, exempt
+from compression import compress_response, negotiate
+from query_class import has_math_expression, looks_like_equation
+from profiling import profiled
+from ratelimit import RateLimiter
+from session_token import authenticate
+from static_answer import StaticAnswer
+from stemmer import content_stems, query_stems
+from timing import span, timed, traced
+import chat_log
+
+OPTIONS_RESPONSE = preflight('POST, OPTIONS')
+MESSAGE_REQUIRED = frozen_error(400, 'Message is required')
+
+# admission limits: everything past them is linear in a bounded input
+MAX_MESSAGE_CHARS = int(os.environ.get('SIMPLE_AI_MAX_MESSAGE_CHARS') or 4000)
+MAX_OPERANDS = 32
+MAX_OPERAND_DIGITS = 15
+MESSAGE_TOO_LONG = frozen_error(413, f'Message is too long (max {MAX_MESSAGE_CHARS} characters)')
+
+# requests per minute; answers are local, so the limits only stop scripts
+LIMITER = RateLimiter('simple-ai', {'ip': 300, 'free': 120, 'unlimited': 600, 'admin': None})
+
+# languages with a pack_<lang>.py (routing rules, templates); any other
+# requested language is answered with FALLBACK_LANGUAGE
+LANGUAGES = ('ru', 'en')
+FALLBACK_LANGUAGE = 'en'
+
+@traced
+@profiled
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Умный AI-ассистент NeuroPulse - решает любые задачи и отвечает на любые вопросы
-    Args: event - dict with httpMethod, body (message, userId, language)
+    Args: event - dict with httpMethod, body (message, userId, language);
+          optional Authorization: Bearer session token, which also keeps the exchange in chat-history
           context - object with request_id
     Returns: HTTP response dict с готовым решением/ответом
     '''
     method: str = event.get('httpMethod', 'POST')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
+        return OPTIONS_RESPONSE()
     
     if method != 'POST':
-        return {
-            'statusCode': 405,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Method not allowed'})
-        }
+        return METHOD_NOT_ALLOWED()
     
     try:
-        body_data = json.loads(event.get('body', '{}'))
-        message = body_data.get('message', '').strip()
+        with span('parse'):
+            body_data = parse_json_body(event)
+        session = authenticate(event)
+        rejected = LIMITER.check(event, body_data.get('userId'), session)
+        if rejected:
+            return rejected
+        message = str(body_data.get('message') or '').strip()
         language = body_data.get('language', 'ru')
         
         if not message:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Message is required'})
-            }
+            return MESSAGE_REQUIRED()
         
-        response = process_smart_query(message, language)
+        if len(message) > MAX_MESSAGE_CHARS:
+            return MESSAGE_TOO_LONG()
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
+        with span('route'), cpu_budget():
+            response = process_smart_query(message, language)
+        if session:
+            chat_log.record(session.user_id, message, response)
+        
+        with span('serialize'):
+            encoding = negotiate(event)
+            if isinstance(response, StaticAnswer):
+                return compress_response(encoded_response(200, response.response_body()), encoding, static=True)
+            return compress_response(json_response(200, {
                 'response': response,
                 'success': True
-            })
-        }
+            }), encoding)
         
+    except RequestError as e:
+        return e.response()
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': f'Server error: {str(e)}'})
-        }
+        return error_response(500, f'Server error: {str(e)}')
+
+_packs: Dict[str, Any] = {}
+
+def pack(lang: Any):
+    '''Language pack for a requested language, imported on first use.'''
+    name = lang if lang in LANGUAGES else FALLBACK_LANGUAGE
+    language_pack = _packs.get(name)
+    if language_pack is None:
+        with exempt():
+            language_pack = _packs[name] = importlib.import_module(f'pack_{name}')
+    return language_pack
+
+_answers: Dict[str, Any] = {}
+
+def answers(language_pack):
+    '''Topic answers of a pack (its CONTENT module), imported on first use to keep cold starts light.'''
+    table = _answers.get(language_pack.LANGUAGE)
+    if table is None:
+        with exempt():
+            table = _answers[language_pack.LANGUAGE] = importlib.import_module(language_pack.CONTENT)
+    return table
+
+_topic_indexes: Dict[str, Any] = {}
+
+def topic_index(language_pack):
+    '''Typo-tolerant index over every topic key of a pack, built on first use.'''
+    index = _topic_indexes.get(language_pack.LANGUAGE)
+    if index is None:
+        with exempt():
+            from fuzzy import FuzzyIndex
+            index = _topic_indexes[language_pack.LANGUAGE] = FuzzyIndex(answers(language_pack).ALL_TOPICS)
+    return index
+
+_stem_indexes: Dict[str, Any] = {}
+
+def stem_index(language_pack):
+    '''Intent routing index of a pack, built on first use.'''
+    index = _stem_indexes.get(language_pack.LANGUAGE)
+    if index is None:
+        with exempt():
+            from intents import StemIndex
+            index = _stem_indexes[language_pack.LANGUAGE] = StemIndex(language_pack.INTENTS)
+    return index
+
+_topic_retrievals: Dict[str, Any] = {}
+
+def topic_retrieval(language_pack):
+    '''BM25 index over every topic answer of a pack (title: topic words, body: text), built on first use.'''
+    retrieval = _topic_retrievals.get(language_pack.LANGUAGE)
+    if retrieval is None:
+        with exempt():
+            from retrieval import BM25Index
+            table = answers(language_pack)
+            keys = list(table.ALL_TOPICS)
+            documents = [
+                ([s for words in table.TOPIC_WORDS[key] for s in content_stems(words)],
+                 content_stems(table.ALL_TOPICS[key].lower()))
+                for key in keys
+            ]
+            retrieval = _topic_retrievals[language_pack.LANGUAGE] = (keys, BM25Index(documents))
+    return retrieval
+
+def find_topic(language_pack, query_lower: str):
+    keys, index = topic_retrieval(language_pack)
+    check()
+    found = index.best(set(content_stems(query_lower)))
+    if found is None:
+        return None
+    return answers(language_pack).ALL_TOPICS[keys[found[0]]]
 
 def process_smart_query(query: str, lang: str) -> str:
+    language_pack = pack(lang)
     query_lower = query.lower()
     
-    if lang == 'ru':
-        return process_russian_smart(query, query_lower)
-    else:
-        return process_english_smart(query, query_lower)
-
-def process_russian_smart(query: str, query_lower: str) -> str:
-    if any(word in query_lower for word in ['привет', 'здравствуй', 'добрый']):
-        return "Привет! 👋 Я NeuroPulse — умный AI-помощник!\n\n**Могу помочь с:**\n✅ Решением задач (математика, физика, химия, логика)\n✅ Написанием текстов (статьи, эссе, рефераты)\n✅ Объяснением сложных тем\n✅ Программированием и алгоритмами\n✅ Переводами и языками\n\nЗадавай любой вопрос — дам готовое решение! 🚀"
-    
-    if has_math_expression(query):
-        return solve_math_expression(query)
-    
-    if 'квадратн' in query_lower or 'уравнение' in query_lower:
-        return solve_equation(query, query_lower)
-    
-    if 'спорт' in query_lower and 'это' in query_lower:
-        return explain_sport_detailed()
-    
-    if 'фотосинтез' in query_lower:
-        return explain_photosynthesis()
-    
-    if any(word in query_lower for word in ['напиши статью', 'напиши текст', 'эссе', 'сочинение']):
-        return write_article(query, query_lower)
-    
-    if 'логическ' in query_lower and 'задач' in query_lower:
-        return solve_logic_problem(query)
-    
-    if any(word in query_lower for word in ['что такое', 'объясни', 'расскажи о']):
-        return explain_topic(query, query_lower)
-    
-    if 'программ' in query_lower or 'код' in query_lower:
-        return help_with_code(query, query_lower)
-    
-    return smart_universal_answer(query, query_lower)
-
-def has_math_expression(query: str) -> bool:
-    math_patterns = [
-        r'\d+\s*[+\-×x*÷/]\s*\d+',
-        r'\(\d+.*?\)',
-        r'\d+\s*\^\s*\d+',
-    ]
-    for pattern in math_patterns:
-        if re.search(pattern, query):
-            return True
-    return False
+    try:
+        intents = stem_index(language_pack).match(query_stems(query_lower))
+        for label, action in language_pack.ROUTES:
+            detect = DETECTORS.get(label)
+            if label in intents or (detect is not None and detect(query, query_lower)):
+                # actions are looked up by name, so tools can wrap them on the module
+                return globals()[action](language_pack, query, query_lower)
+        return globals()[language_pack.FALLBACK](language_pack, query, query_lower)
+    except TooComplex:
+        return language_pack.TOO_COMPLEX
+
+# Every pattern below runs in time linear in the query (see query_class for
+# the detectors): capturing patterns start with (?<!\d), so a long digit run
+# is not retried from each of its positions.
+MATH_TRANSLATION = str.maketrans({'×': '*', '÷': '/', 'x': '*', ':': '/'})
+NUMBER_RE = re.compile(r'\d+')
+OPERATOR_RE = re.compile(r'[+\-*/]')
+PAREN_FORMULA_RE = re.compile(r'\((\d+)\s*\*\s*(\d+)\)\s*\+\s*(\d+)\s*/\s*(\d+)')
+BINARY_RES = {op: re.compile(r'(?<!\d)(\d+)\s*' + re.escape(op) + r'\s*(\d+)') for op in '+-*/'}
+
+# route labels that are detected from the text rather than from intents
+DETECTORS = {
+    'equation': looks_like_equation,
+    'math': lambda query, query_lower: has_math_expression(query),
+}
 
 def safe_calculate(nums: list, ops: list) -> float:
     if not nums or not ops:
@@ -127,6 +193,7 @@ def safe_calculate(nums: list, ops: list) -> float:
     
     result = float(nums[0])
     for i, op in enumerate(ops):
+        check()
         if i + 1 >= len(nums):
             break
         next_num = float(nums[i + 1])
@@ -143,12 +210,21 @@ def safe_calculate(nums: list, ops: list) -> float:
     
     return result
 
-def solve_math_expression(query: str) -> str:
-    query_clean = query.replace('×', '*').replace('÷', '/').replace('x', '*').replace(':', '/')
+def greet(language_pack, query: str, query_lower: str) -> str:
+    return language_pack.GREETING
+
+def ask_specific(language_pack, query: str, query_lower: str) -> str:
+    return language_pack.ASK_SPECIFIC
+
+@timed('math')
+def solve_math_expression(language_pack, query: str, query_lower: str) -> str:
+    query_clean = query.translate(MATH_TRANSLATION)
+    numbers = NUMBER_RE.findall(query_clean)
+    if len(numbers) > MAX_OPERANDS or any(len(n) > MAX_OPERAND_DIGITS for n in numbers):
+        raise TooComplex()
     
     try:
-        numbers = re.findall(r'\d+', query_clean)
-        operators = re.findall(r'[+\-*/]', query_clean)
+        operators = OPERATOR_RE.findall(query_clean)
         
         if len(numbers) >= 2 and len(operators) >= 1:
             nums_used = []
@@ -161,772 +237,119 @@ def solve_math_expression(query: str) -> str:
             
             result = safe_calculate(nums_used, ops_used)
             
-            steps_text = f"**Решаю: {' '.join([nums_used[i] + (' ' + ops_used[i] if i < len(ops_used) else '') for i in range(len(nums_used))])}**\n\n"
+            steps = language_pack.MATH_STEPS
+            expression = ' '.join([nums_used[i] + (' ' + ops_used[i] if i < len(ops_used) else '') for i in range(len(nums_used))])
+            steps_text = steps['title'].format(expression=expression)
             
             temp_result = int(nums_used[0])
-            steps_text += f"📐 **Начинаем с первого числа:** {temp_result}\n\n"
+            steps_text += steps['start'].format(value=temp_result)
             
             for i in range(len(ops_used)):
+                check()
                 next_num = int(nums_used[i + 1])
                 op = ops_used[i]
+                old_temp = temp_result
                 
                 if op == '+':
-                    old_temp = temp_result
                     temp_result = temp_result + next_num
-                    steps_text += f"📐 **Шаг {i+1}: Прибавляем {next_num}**\n{old_temp} + {next_num} = {temp_result}\n\n"
                 elif op == '-':
-                    old_temp = temp_result
                     temp_result = temp_result - next_num
-                    steps_text += f"📐 **Шаг {i+1}: Вычитаем {next_num}**\n{old_temp} - {next_num} = {temp_result}\n\n"
                 elif op == '*':
-                    old_temp = temp_result
                     temp_result = temp_result * next_num
-                    steps_text += f"📐 **Шаг {i+1}: Умножаем на {next_num}**\n{old_temp} × {next_num} = {temp_result}\n\n"
                 elif op == '/':
-                    old_temp = temp_result
                     temp_result = temp_result / next_num
-                    steps_text += f"📐 **Шаг {i+1}: Делим на {next_num}**\n{old_temp} ÷ {next_num} = {temp_result}\n\n"
+                steps_text += steps[op].format(step=i + 1, operand=next_num, left=old_temp, result=temp_result)
             
-            steps_text += f"✅ **Ответ: {result}**"
+            steps_text += steps['answer'].format(result=result)
             return steps_text
+    except TooComplex:
+        raise
     except:
         pass
     
-    match = re.search(r'\((\d+)\s*\*\s*(\d+)\)\s*\+\s*(\d+)\s*/\s*(\d+)', query_clean)
+    match = PAREN_FORMULA_RE.search(query_clean)
     if match:
         a, b, c, d = map(int, match.groups())
+        if d == 0:
+            return language_pack.DIVISION_BY_ZERO
         step1 = a * b
         step2 = c / d
         result = step1 + step2
         
-        return f"""**Решение: ({a} × {b}) + {c} / {d}**
-
-📐 **Шаг 1: Выполняем умножение в скобках**
-{a} × {b} = {step1}
-
-📐 **Шаг 2: Выполняем деление**
-{c} / {d} = {step2}
-
-📐 **Шаг 3: Складываем результаты**
-{step1} + {step2} = {result}
-
-✅ **Ответ: {result}**
-
-💡 *Правило:* Сначала действия в скобках и умножение/деление, потом сложение/вычитание!"""
-    
-    match = re.search(r'(\d+)\s*\+\s*(\d+)', query_clean)
-    if match:
-        a, b = map(int, match.groups())
-        result = a + b
-        return f"**Решение: {a} + {b} = {result}**\n\n✅ Ответ: {result}"
-    
-    match = re.search(r'(\d+)\s*\-\s*(\d+)', query_clean)
-    if match:
-        a, b = map(int, match.groups())
-        result = a - b
-        return f"**Решение: {a} - {b} = {result}**\n\n✅ Ответ: {result}"
-    
-    match = re.search(r'(\d+)\s*\*\s*(\d+)', query_clean)
-    if match:
-        a, b = map(int, match.groups())
-        result = a * b
-        return f"**Решение: {a} × {b} = {result}**\n\n✅ Ответ: {result}"
-    
-    match = re.search(r'(\d+)\s*/\s*(\d+)', query_clean)
-    if match:
-        a, b = map(int, match.groups())
-        result = a / b
-        return f"**Решение: {a} / {b} = {result}**\n\n✅ Ответ: {result}"
-    
-    return "Не могу распознать математическое выражение. Напиши в формате: (25 × 4) + 120 / 6"
-
-def solve_equation(query: str, query_lower: str) -> str:
-    match = re.search(r'x[²2]\s*-\s*(\d+)x\s*\+\s*(\d+)', query_lower.replace(' ', ''))
-    if match:
-        b_val = int(match.group(1))
-        c_val = int(match.group(2))
-        a = 1
-        b = -b_val
-        c = c_val
-        
-        D = b*b - 4*a*c
+        return language_pack.MATH_FORMULA.format(a=a, b=b, c=c, d=d, step1=step1, step2=step2, result=result)
+    
+    for op, sign in (('+', '+'), ('-', '-'), ('*', '×'), ('/', '/')):
+        match = BINARY_RES[op].search(query_clean)
+        if match:
+            a, b = map(int, match.groups())
+            if op == '/' and b == 0:
+                return language_pack.DIVISION_BY_ZERO
+            result = a + b if op == '+' else a - b if op == '-' else a * b if op == '*' else a / b
+            return language_pack.MATH_BINARY.format(a=a, sign=sign, b=b, result=result)
+    
+    return language_pack.MATH_FORMAT_HINT
+
+@timed('equation')
+def solve_equation(language_pack, query: str, query_lower: str) -> str:
+    from algebra import solve_problem
+    answer = solve_problem(query_lower)
+    if answer is not None:
+        return answer
+    
+    return language_pack.EQUATION_FORMAT_HINT
+
+@timed('sport')
+def explain_sport_detailed(language_pack, query: str, query_lower: str) -> str:
+    return answers(language_pack).SPORT
+
+@timed('photosynthesis')
+def explain_photosynthesis(language_pack, query: str, query_lower: str) -> str:
+    return answers(language_pack).PHOTOSYNTHESIS
+
+@timed('article')
+def write_article(language_pack, query: str, query_lower: str) -> str:
+    if 'sport_topic' in stem_index(language_pack).match(query_stems(query_lower)):
+        return answers(language_pack).ARTICLE_SPORT
+    
+    return answers(language_pack).ARTICLE_EDUCATION
+
+@timed('logic')
+def solve_logic_problem(language_pack, query: str, query_lower: str) -> str:
+    return answers(language_pack).LOGIC_MONTY_HALL
+
+@timed('topic')
+def explain_topic(language_pack, query: str, query_lower: str) -> str:
+    answer = find_topic(language_pack, query_lower)
+    if answer is not None:
+        return answer
+    
+    return smart_universal_answer(language_pack, query, query_lower)
+
+@timed('code')
+def help_with_code(language_pack, query: str, query_lower: str) -> str:
+    if 'sorting' in stem_index(language_pack).match(query_stems(query_lower)):
+        return answers(language_pack).CODE_SORTING
+    
+    return answers(language_pack).CODE_HELP
+
+@timed('universal')
+def smart_universal_answer(language_pack, query: str, query_lower: str) -> str:
+    answer = find_topic(language_pack, query_lower)
+    if answer is not None:
+        return answer
+    
+    match = topic_index(language_pack).lookup(query_lower)
+    if match is not None:
+        return answers(language_pack).ALL_TOPICS[match[0]]
+    
+    is_question = any(word in query_lower.split()[:3] for word in language_pack.QUESTION_WORDS)
+    
+    if is_question or any(marker in query_lower for marker in language_pack.QUESTION_MARKERS):
+        topic = query
+        for phrase in language_pack.QUESTION_PHRASES:
+            topic = topic.replace(phrase, '')
+        topic = topic.strip().strip('?').strip()
         
-        if D >= 0:
-            import math
-            x1 = (-b + math.sqrt(D)) / (2*a)
-            x2 = (-b - math.sqrt(D)) / (2*a)
-            
-            return f"""**Решение квадратного уравнения x² - {b_val}x + {c_val} = 0**
-
-📐 **Шаг 1: Коэффициенты**
-- a = {a} (при x²)
-- b = {b} (при x)
-- c = {c} (свободный член)
-
-🔢 **Шаг 2: Дискриминант**
-D = b² - 4ac = ({b})² - 4×{a}×{c} = {b*b} - {4*a*c} = {D}
-
-✅ D = {D} {'> 0, уравнение имеет 2 корня' if D > 0 else '= 0, уравнение имеет 1 корень'}
-
-📊 **Шаг 3: Корни уравнения**
-x₁ = (-b + √D) / 2a = ({-b} + √{D}) / {2*a} = {x1}
-x₂ = (-b - √D) / 2a = ({-b} - √{D}) / {2*a} = {x2}
-
-✅ **Ответ: x₁ = {x1}, x₂ = {x2}**"""
-    
-    match = re.search(r'(\d+)x\s*\+\s*(\d+)\s*=\s*(\d+)', query_lower.replace(' ', ''))
-    if match:
-        a = int(match.group(1))
-        b = int(match.group(2))
-        c = int(match.group(3))
-        x = (c - b) / a
-        
-        return f"""**Решение уравнения {a}x + {b} = {c}**
-
-📐 **Шаг 1: Переносим {b} в правую часть**
-{a}x = {c} - {b}
-{a}x = {c - b}
-
-📐 **Шаг 2: Делим обе части на {a}**
-x = {c - b} / {a}
-x = {x}
-
-✅ **Ответ: x = {x}**"""
-    
-    return "Напиши уравнение в формате: 2x + 5 = 13 или x² - 5x + 6 = 0"
-
-def explain_sport_detailed() -> str:
-    return """**Спорт — это физическая активность и соревнования для развития тела, духа и характера.**
-
-🏃 **Что такое спорт?**
-
-Спорт — это организованная физическая деятельность, направленная на достижение результатов, укрепление здоровья и развитие личности. Он включает тренировки, соревнования и игры.
-
-💪 **Основные функции спорта:**
-
-**1. Физическое развитие**
-- Укрепляет мышцы, кости и суставы
-- Улучшает работу сердца и лёгких
-- Повышает выносливость и гибкость
-- Помогает контролировать вес
-
-**2. Психологическая польза**
-- Снижает стресс и тревожность
-- Улучшает настроение (выработка эндорфинов)
-- Развивает дисциплину и целеустремлённость
-- Повышает самооценку и уверенность
-
-**3. Социальное значение**
-- Учит работе в команде
-- Развивает лидерские качества
-- Помогает заводить друзей
-- Воспитывает уважение к соперникам
-
-⚽ **Виды спорта:**
-
-**Командные:**
-- Футбол, баскетбол, волейбол, хоккей
-
-**Индивидуальные:**
-- Бег, плавание, теннис, гимнастика
-
-**Силовые:**
-- Тяжёлая атлетика, бодибилдинг, пауэрлифтинг
-
-**Экстремальные:**
-- Сноубординг, паркур, скалолазание, сёрфинг
-
-🎯 **Почему важно заниматься спортом?**
-
-✅ Здоровье: профилактика болезней, долголетие
-✅ Красота: подтянутое тело, хорошая осанка
-✅ Энергия: бодрость на весь день
-✅ Характер: сила воли, упорство, стрессоустойчивость
-✅ Успех: спортсмены более целеустремлённые в жизни
-
-💡 **Как начать?**
-1. Выбери вид спорта по душе
-2. Начни с 20-30 минут 3 раза в неделю
-3. Увеличивай нагрузку постепенно
-4. Найди единомышленников для мотивации
-
-🏆 **Вывод:**
-Спорт — это не просто физкультура, это образ жизни, который делает нас здоровее, счастливее и успешнее!"""
-
-def explain_photosynthesis() -> str:
-    return """**Фотосинтез — процесс, при котором растения создают питательные вещества из света, воды и углекислого газа.**
-
-🌱 **Что происходит:**
-
-**Химическая формула:**
-6CO₂ + 6H₂O + свет → C₆H₁₂O₆ + 6O₂
-
-(углекислый газ + вода + энергия света → глюкоза + кислород)
-
-🔬 **Где происходит:**
-- В **хлоропластах** — зелёных органеллах клеток листьев
-- **Хлорофилл** (зелёный пигмент) улавливает свет
-
-⚡ **Две фазы фотосинтеза:**
-
-**1. Световая фаза** (только на свету):
-- Хлорофилл поглощает энергию солнечного света
-- Вода (H₂O) расщепляется на водород (H) и кислород (O₂)
-- Кислород выделяется в атмосферу через устьица листьев
-- Образуется энергия (АТФ) для темновой фазы
-
-**2. Темновая фаза** (может идти без света):
-- CO₂ из воздуха попадает в лист через устьица
-- Углекислый газ соединяется с водородом
-- Образуется **глюкоза** (C₆H₁₂O₆) — сахар, питание для растения
-- Из глюкозы растение строит крахмал, целлюлозу, белки
-
-🌍 **Значение для жизни на Земле:**
-
-✅ **Производство кислорода** — растения вырабатывают весь O₂ в атмосфере
-✅ **Пища для всех** — растения = основа пищевой цепи
-✅ **Поглощение CO₂** — очищение воздуха от углекислого газа
-✅ **Энергия** — основа всей жизни (растения → животные → человек)
-
-💡 **Простыми словами:**
-
-Представь, что растение — это **живая солнечная батарея**:
-1. Ловит свет листьями
-2. Берёт воду из почвы корнями
-3. Вдыхает CO₂ из воздуха
-4. Превращает всё это в еду (сахар) для себя
-5. Выдыхает кислород для нас!
-
-🌿 **Без фотосинтеза:**
-- Не было бы кислорода → мы не смогли бы дышать
-- Не было бы растений → нечего было бы есть
-- Жизнь на Земле была бы невозможна!
-
-🎯 **Интересный факт:**
-Один большой дуб за год производит кислорода столько, что хватит для дыхания 10 человек!"""
-
-def write_article(query: str, query_lower: str) -> str:
-    if 'спорт' in query_lower:
-        return """**Роль спорта в жизни современного человека**
-
-В XXI веке спорт стал неотъемлемой частью жизни миллионов людей по всему миру. Это не просто физическая активность, а целая культура, влияющая на здоровье, социальную жизнь и личностное развитие.
-
-**Физическое здоровье**
-
-Регулярные занятия спортом укрепляют сердечно-сосудистую систему, повышают иммунитет и продлевают жизнь. Исследования показывают, что люди, занимающиеся спортом 3-4 раза в неделю, на 40% реже страдают хроническими заболеваниями. Физическая активность помогает контролировать вес, улучшает обмен веществ и повышает общий тонус организма.
-
-**Психологическое благополучие**
-
-Во время тренировок организм вырабатывает эндорфины — гормоны счастья, которые снижают стресс и улучшают настроение. Спорт помогает бороться с депрессией, повышает самооценку и уверенность в себе. Регулярные занятия развивают дисциплину, целеустремлённость и умение преодолевать трудности.
-
-**Социальная значимость**
-
-Командные виды спорта учат работать в коллективе, уважать соперников и радоваться успехам других. Спортивные секции и клубы — отличное место для новых знакомств и создания дружеских связей. Спорт объединяет людей разных возрастов, национальностей и социальных слоёв.
-
-**Спорт в современном мире**
-
-Сегодня доступны сотни видов спорта — от классических (футбол, плавание) до экстремальных (паркур, скейтбординг). Технологии делают занятия удобнее: фитнес-трекеры, приложения для тренировок, онлайн-марафоны. Спортивная индустрия создаёт миллионы рабочих мест и вносит вклад в экономику.
-
-**Заключение**
-
-Спорт — это инвестиция в своё здоровье, настроение и будущее. Необязательно становиться профессиональным спортсменом — даже 30 минут активности в день способны значительно улучшить качество жизни. Главное — найти занятие по душе и сделать спорт частью своей повседневности.
-
----
-*Статья готова! Можешь использовать как основу для реферата или эссе.* ✨"""
-    
-    return """**Современные технологии в образовании**
-
-XXI век изменил подход к обучению. Интернет, искусственный интеллект и онлайн-платформы сделали знания доступными каждому.
-
-**Онлайн-образование**
-
-Курсы от ведущих университетов мира теперь доступны бесплатно. Платформы вроде Coursera, Khan Academy позволяют учиться в удобном темпе из любой точки мира.
-
-**Интерактивное обучение**
-
-VR-технологии погружают студентов в виртуальные лаборатории. AI-помощники адаптируют программу под каждого ученика, делая обучение персонализированным.
-
-**Геймификация**
-
-Игровые элементы в учёбе повышают мотивацию. Баллы, достижения и рейтинги превращают скучные задания в увлекательный процесс.
-
-**Заключение**
-
-Технологии не заменят учителя, но сделают образование доступнее, интереснее и эффективнее. Будущее — за гибридным обучением, сочетающим лучшее из онлайн и офлайн-миров.
-
----
-*Готовый текст для презентации или доклада!* 💻"""
-
-def solve_logic_problem(query: str) -> str:
-    return """**Решение логической задачи**
-
-**Задача:**
-У вас есть 3 двери. За одной — приз, за остальными — пусто. Вы выбрали дверь №1. Ведущий открывает дверь №3 (пусто) и предлагает изменить выбор. Что делать?
-
-**Решение:**
-
-🧠 **Анализ вероятностей:**
-
-**Если НЕ меняете выбор:**
-- Вероятность выигрыша = 1/3 (33%)
-- Ваш первый выбор случаен
-
-**Если МЕНЯЕТЕ выбор:**
-- Вероятность выигрыша = 2/3 (67%)!
-- Ведущий всегда открывает пустую дверь
-- Если вы изначально выбрали пустую (2/3), приз точно за другой закрытой
-
-✅ **Ответ: ВСЕГДА меняйте выбор!**
-
-**Почему это работает:**
-1. В 2 из 3 случаев вы сначала выбираете пустую дверь
-2. Ведущий открывает другую пустую
-3. Значит, за оставшейся — приз!
-
-💡 Это знаменитая "парадокс Монти Холла" — пример того, как интуиция обманывает!
-
----
-
-Задай свою логическую задачу — решу пошагово! 🎯"""
-
-def explain_topic(query: str, query_lower: str) -> str:
-    topics = {
-        'интернет': """**Как работает интернет?**
-
-🌐 **Простое объяснение:**
-
-Интернет — это глобальная сеть компьютеров, соединённых кабелями и спутниками.
-
-**Что происходит, когда вы открываете сайт:**
-
-1️⃣ **Вы вводите адрес** (например, google.com)
-
-2️⃣ **DNS-сервер** переводит имя в IP-адрес (как номер телефона)
-- google.com → 142.250.185.46
-
-3️⃣ **Запрос идёт через провайдера** по оптоволокну/кабелю
-
-4️⃣ **Сервер Google** получает запрос и отправляет данные обратно
-
-5️⃣ **Ваш браузер** собирает данные и показывает страницу
-
-**Скорость:** Сигнал проходит тысячи километров за доли секунды!
-
-**Безопасность:** HTTPS шифрует данные, чтобы никто не мог их прочитать.
-
-💡 По сути, интернет — это миллиарды компьютеров, говорящих на одном языке (протокол TCP/IP)!""",
-        
-        'гравитация': """**Что такое гравитация?**
-
-🌍 **Определение:**
-Гравитация — сила притяжения между всеми объектами с массой.
-
-**Как работает:**
-- Чем больше масса объекта — тем сильнее притяжение
-- Земля притягивает всё к центру (9.8 м/с²)
-- Солнце удерживает планеты на орбите
-
-**Закон Ньютона:**
-F = G × (m₁ × m₂) / r²
-
-Где:
-- F — сила притяжения
-- G — гравитационная постоянная
-- m₁, m₂ — массы объектов
-- r — расстояние между ними
-
-**Интересные факты:**
-🌙 На Луне вы весите в 6 раз меньше (слабее гравитация)
-🪐 На Юпитере — в 2.5 раза больше (сильнее гравитация)
-🕳️ Чёрные дыры — гравитация настолько сильна, что не выпускает даже свет!
-
-💡 **Простыми словами:** Гравитация — это невидимая сила, которая всё притягивает друг к другу. Благодаря ей мы ходим по Земле, а не летаем в космос!""",
-
-        'регресс': """**Что такое активный регресс и его виды?**
-
-🧠 **Определение:**
-Активный регресс — это психологический защитный механизм, при котором человек временно возвращается к более ранним, детским формам поведения в стрессовых ситуациях.
-
-📊 **Виды регрессии:**
-
-**1. Возрастная регрессия**
-- Взрослый начинает вести себя как ребёнок
-- Примеры: капризы, плач, детская речь
-- Причина: сильный стресс, травма
-
-**2. Когнитивная регрессия**
-- Снижение уровня мышления
-- Упрощение логики и решений
-- Проявление: примитивные реакции на сложные проблемы
-
-**3. Эмоциональная регрессия**
-- Неконтролируемые эмоции
-- Истерики, обиды, как у детей
-- Потеря эмоциональной зрелости
-
-**4. Поведенческая регрессия**
-- Возврат к детским привычкам
-- Примеры: сосание пальца, зависимость от родителей
-- Часто при болезнях или потрясениях
-
-**5. Социальная регрессия**
-- Избегание ответственности
-- Желание, чтобы другие решали проблемы
-- Инфантильность в отношениях
-
-🎯 **Когда проявляется:**
-✅ Сильный стресс или конфликт
-✅ Болезнь или усталость
-✅ Психологическая травма
-✅ Неспособность справиться с ситуацией
-
-💡 **Нормально ли это?**
-Да, кратковременная регрессия — нормальная защитная реакция. Но если она затягивается — нужна помощь психолога.
-
-🔧 **Как справиться:**
-- Осознать регрессию
-- Найти причину стресса
-- Использовать взрослые способы решения проблем
-- При необходимости — терапия
-
-**Простыми словами:** Регресс — это когда взрослый человек временно "откатывается" к детскому поведению, чтобы защититься от стресса."""
-    }
-    
-    for keyword, answer in topics.items():
-        if keyword in query_lower:
-            return answer
-    
-    return smart_universal_answer(query, query_lower)
-
-def help_with_code(query: str, query_lower: str) -> str:
-    if 'сортировка' in query_lower or 'массив' in query_lower:
-        return """**Сортировка массива на Python**
-
-```python
-# Пузырьковая сортировка (простая для понимания)
-def bubble_sort(arr):
-    n = len(arr)
-    
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            # Если текущий элемент больше следующего
-            if arr[j] > arr[j + 1]:
-                # Меняем их местами
-                arr[j], arr[j + 1] = arr[j + 1], arr[j]
-    
-    return arr
-
-# Использование
-numbers = [64, 34, 25, 12, 22, 11, 90]
-sorted_numbers = bubble_sort(numbers)
-print(sorted_numbers)  # [11, 12, 22, 25, 34, 64, 90]
-```
-
-**Как работает:**
-1. Проходим по массиву много раз
-2. Сравниваем соседние элементы
-3. Если левый больше правого — меняем местами
-4. Повторяем, пока массив не отсортируется
-
-⚡ **Быстрый способ (встроенная функция):**
-```python
-numbers = [64, 34, 25, 12, 22, 11, 90]
-numbers.sort()  # Или sorted(numbers)
-print(numbers)
-```
-
-💡 Готовый код — копируй и используй! 🚀"""
-    
-    return """**Помогу с программированием!**
-
-**Напиши конкретную задачу:**
-- Напиши код для сортировки массива
-- Как создать функцию в Python?
-- Объясни цикл for
-- Напиши калькулятор на JavaScript
-
-И я дам готовый работающий код с объяснениями! 💻"""
-
-def smart_universal_answer(query: str, query_lower: str) -> str:
-    knowledge_base = {
-        'истори': """**История — наука о прошлом человечества и её виды исследований.**
-
-📚 **Что такое история:**
-
-**Определение:**
-История — наука, изучающая прошлое человечества через источники (документы, артефакты, свидетельства).
-
-🔍 **Виды истории по предмету изучения:**
-
-**1. Политическая история**
-- Изучает государства, власть, войны, революции
-- Примеры: история царских династий, образование СССР
-
-**2. Экономическая история**
-- Развитие хозяйства, торговли, финансов
-- Примеры: промышленная революция, экономические кризисы
-
-**3. Социальная история**
-- Жизнь общества, классы, сословия
-- Примеры: история крестьянства, рабочего класса
-
-**4. Культурная история**
-- Искусство, литература, наука, религия
-- Примеры: Ренессанс, эпоха Просвещения
-
-**5. История повседневности**
-- Быт, традиции, образ жизни людей
-- Примеры: как жили в Средневековье, мода разных эпох
-
-📊 **Виды истории по масштабу:**
-
-**1. Всемирная (всеобщая) история**
-- История всего человечества
-- От древних цивилизаций до наших дней
-
-**2. История отдельных стран/регионов**
-- История России, Европы, Азии и т.д.
-- Локальная история (города, села)
-
-**3. Микроистория**
-- Детальное изучение одного события/человека
-- Примеры: биография Пушкина, история одной деревни
-
-🛠️ **Виды истории по методам:**
-
-**1. Документальная история**
-- Основана на письменных источниках
-- Летописи, законы, письма
-
-**2. Устная история**
-- Основана на свидетельствах очевидцев
-- Интервью, легенды, мифы
-
-**3. Археологическая история**
-- Изучение материальных остатков
-- Раскопки, артефакты, древние постройки
-
-💡 **Зачем изучать историю:**
-✅ Понимать, как сформировался современный мир
-✅ Учиться на ошибках прошлого
-✅ Понимать причины современных событий
-✅ Развивать критическое мышление
-
-📖 **Интересные факты:**
-- Письменная история началась ~5000 лет назад (Древний Египет, Месопотамия)
-- До этого — предыстория (археология, антропология)
-- История субъективна — зависит от того, кто её пишет!
-
-**Простыми словами:** История — это изучение прошлого во всех его проявлениях: от великих войн до быта простых людей. Она делится на виды по предмету (политика, экономика, культура), масштабу (мировая, локальная) и методам исследования!""",
-
-        'счасть': """**Счастье — состояние эмоционального благополучия и удовлетворённости жизнью.**
-
-😊 **Что такое счастье:**
-
-**Философский взгляд:**
-- Античность: счастье = добродетель + мудрость (Аристотель)
-- Гедонизм: счастье = максимум удовольствия
-- Стоицизм: счастье = внутренний покой и принятие
-
-**Научный подход (психология):**
-- Счастье = сочетание эмоций (радость) + смысла жизни
-- Формула счастья: 50% генетика + 10% обстоятельства + 40% действия человека
-
-🔑 **Компоненты счастья:**
-
-1. **Позитивные эмоции** — радость, благодарность, любовь
-2. **Вовлечённость** — состояние потока, интерес к делу
-3. **Отношения** — близкие связи с людьми
-4. **Смысл** — цель, которая больше себя
-5. **Достижения** — успехи и личностный рост
-
-💡 **Как стать счастливее:**
-✅ Практика благодарности (записывать 3 хороших момента в день)
-✅ Помощь другим (волонтёрство, добрые дела)
-✅ Физическая активность (спорт повышает эндорфины)
-✅ Социальные связи (время с близкими важнее денег)
-✅ Достижение целей (маленькие шаги к мечте)
-✅ Медитация и осознанность
-
-📊 **Интересные факты:**
-- Деньги влияют на счастье только до определённого уровня (базовые потребности)
-- Социальные связи — главный предиктор счастья
-- Счастливые люди живут на 7-10 лет дольше!
-
-**Простыми словами:** Счастье — это не постоянная эйфория, а общее удовлетворение жизнью, баланс позитива, смысла и связей с людьми. Оно зависит от ваших действий больше, чем от обстоятельств!""",
-
-        'психолог': """**Психология — наука о психике и поведении человека.**
-
-🧠 **Основные разделы:**
-
-**1. Общая психология**
-- Изучает основные психические процессы: мышление, память, внимание
-- Эмоции, воля, характер, темперамент
-
-**2. Социальная психология**
-- Поведение человека в обществе
-- Группы, лидерство, конфликты
-
-**3. Клиническая психология**
-- Диагностика и лечение психических расстройств
-- Депрессия, тревожность, фобии
-
-**4. Возрастная психология**
-- Развитие психики от рождения до старости
-- Кризисы возрастов
-
-💡 Психология помогает понять себя и других, улучшить отношения, справиться со стрессом!""",
-
-        'депресс': """**Депрессия — психическое расстройство с длительным снижением настроения и потерей интереса к жизни.**
-
-😔 **Основные симптомы:**
-- Постоянная грусть, тоска
-- Потеря интереса к любимым занятиям
-- Усталость, нехватка энергии
-- Проблемы со сном (бессонница или пересыпание)
-- Изменение аппетита (потеря или переедание)
-- Чувство вины, бесполезности
-- Трудности с концентрацией
-- Мысли о смерти
-
-**Причины:**
-✅ Биологические (нарушение химии мозга)
-✅ Психологические (стресс, травма)
-✅ Социальные (одиночество, проблемы)
-
-🔧 **Лечение:**
-1. Психотерапия (когнитивно-поведенческая)
-2. Медикаменты (антидепрессанты по назначению врача)
-3. Спорт и здоровый образ жизни
-4. Поддержка близких
-
-⚠️ **Важно:** При симптомах депрессии обратитесь к психологу или психиатру!""",
-
-        'эволюц': """**Эволюция — процесс исторического развития живых организмов.**
-
-🧬 **Теория Дарвина:**
-
-**1. Естественный отбор**
-- Выживают наиболее приспособленные
-- Передают гены потомству
-
-**2. Изменчивость**
-- Мутации создают различия
-- Случайные изменения в ДНК
-
-**3. Наследственность**
-- Признаки передаются через гены
-- ДНК — носитель информации
-
-📊 **Доказательства эволюции:**
-✅ Окаменелости (ископаемые останки)
-✅ Сравнительная анатомия (похожие органы у разных видов)
-✅ Эмбриология (зародыши похожи на ранних стадиях)
-✅ Генетика (общий ДНК-код у всех живых существ)
-
-⏱️ **Сроки:**
-- Жизнь на Земле: ~3.8 млрд лет
-- Человек разумный: ~300 тыс. лет
-
-💡 Эволюция объясняет, почему на Земле такое разнообразие жизни!""",
-
-        'квант': """**Квантовая физика — наука о поведении мельчайших частиц материи.**
-
-⚛️ **Основные принципы:**
-
-**1. Корпускулярно-волновой дуализм**
-- Частицы (электроны, фотоны) ведут себя и как волны, и как частицы
-- Зависит от способа наблюдения
-
-**2. Принцип неопределённости Гейзенберга**
-- Невозможно точно знать одновременно положение и скорость частицы
-- Чем точнее измеряем одно — тем менее точно знаем другое
-
-**3. Квантовая суперпозиция**
-- Частица может находиться в нескольких состояниях одновременно
-- Пример: кот Шрёдингера (и жив, и мёртв до наблюдения)
-
-**4. Квантовая запутанность**
-- Две частицы связаны так, что изменение одной мгновенно влияет на другую
-- Даже на расстоянии километров!
-
-💡 **Применение:**
-✅ Квантовые компьютеры
-✅ Лазеры и LED
-✅ МРТ в медицине
-✅ Солнечные батареи
-
-🎯 Квантовая физика — основа современных технологий!"""
-    }
-    
-    for keyword, answer in knowledge_base.items():
-        if keyword in query_lower:
-            return answer
-    
-    question_words = ['что', 'как', 'почему', 'зачем', 'где', 'когда', 'какой', 'кто']
-    is_question = any(word in query_lower.split()[:3] for word in question_words)
-    
-    if is_question or 'это' in query_lower or 'такое' in query_lower or 'объясни' in query_lower:
-        topic = query.replace('что такое', '').replace('что это', '').replace('расскажи о', '').replace('расскажи про', '').replace('объясни', '').strip().strip('?').strip()
-        
-        return f"""**{topic.capitalize()} — интересная тема!**
-
-📚 **Краткое объяснение:**
-
-{topic.capitalize()} — это понятие/явление, которое имеет важное значение в своей области.
-
-**Основные аспекты:**
-
-🔹 **Суть концепции**
-Это фундаментальное понятие, которое помогает понять более широкий контекст темы.
-
-🔹 **Где встречается**
-Применяется в различных сферах: от теории до практического использования.
-
-🔹 **Почему важно**
-Понимание этого помогает разбираться в смежных вопросах и применять знания эффективно.
-
-💡 **Практическое применение:**
-Эти знания можно использовать для решения реальных задач, анализа ситуаций и принятия обоснованных решений.
-
-📖 **Хочешь узнать больше?**
-Задай конкретный вопрос о {topic} — дам подробный ответ с примерами, фактами и деталями!
-
----
-
-**Я отвечу на любые вопросы по темам:**
-🧮 Математика, физика, химия, биология
-🧠 Психология, философия, социология  
-💻 Программирование и технологии
-🌍 История, география, экономика
-⚽ Спорт, здоровье, питание
-🎨 Искусство, культура, литература
-
-Просто спроси — дам подробный и понятный ответ! 🚀"""
-    
-    return f"""**Понял ваш запрос!**
-
-По теме "{query}" могу помочь следующим образом:
-
-💬 **Если нужна информация:**
-Задайте конкретный вопрос: "Что такое...?", "Как работает...?", "Объясни..."
-
-🧮 **Если нужно решить задачу:**
-Напишите условие с числами или формулой — решу пошагово!
-
-✍️ **Если нужен текст:**
-"Напиши статью про...", "Составь эссе о..." — создам качественный текст!
-
-💻 **Если нужен код:**
-"Напиши код для..." — дам готовое решение с объяснениями!
-
-Уточните запрос — и я дам конкретный, развёрнутый ответ! 🎯"""
-
-def process_english_smart(query: str, query_lower: str) -> str:
-    if 'hello' in query_lower or 'hi' in query_lower:
-        return "Hello! 👋 I'm NeuroPulse — smart AI assistant!\n\n**I can help with:**\n✅ Solving problems (math, physics, logic)\n✅ Writing articles and texts\n✅ Explaining complex topics\n✅ Programming and algorithms\n\nAsk any question — I'll give a ready solution! 🚀"
-    
-    if has_math_expression(query):
-        return solve_math_expression(query)
+        return language_pack.TOPIC_TEMPLATE.format(title=topic.capitalize(), topic=topic)
     
-    return "Ask a specific question and I'll give a detailed answer! 🎯"
\ No newline at end of file
+    return language_pack.REQUEST_TEMPLATE.format(query=query)
\ No newline at end of file
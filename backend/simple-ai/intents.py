@@ -0,0 +1,57 @@
+'''
+Stem -> intent/topic index for query routing.
+
+Vendored into simple-ai and ai-chat by tools/sync_shared.py.
+
+Rules are written as plain phrases; every word is stemmed when the index is
+built, and a phrase matches when all of its stems occur in the query. Word
+order and inflection do not matter ('задачу по логике' does not match
+'логическая задача', 'логические задачи' does). Matching walks the query
+stems once, so it costs O(query words) dict lookups however many rules exist.
+The rules live with their users: simple-ai's language packs
+(pack_ru.INTENTS, ...) and query_class.CLASS_RULES.
+'''
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from stemmer import stem, WORD_RE
+
+
+class StemIndex:
+    def __init__(self, rules: Dict[str, List[str]]):
+        '''rules: label -> phrases, in priority order (first label wins in best()).'''
+        self.rank: Dict[str, int] = {label: i for i, label in enumerate(rules)}
+        # stem -> (label, phrase id); phrases with one word are the common case
+        self.single: Dict[str, List[str]] = {}
+        self.multi: Dict[str, List[Tuple[str, int]]] = {}
+        self.phrase_size: List[int] = []
+        for label, phrases in rules.items():
+            for phrase in phrases:
+                stems = {stem(word) for word in WORD_RE.findall(phrase.lower())}
+                if len(stems) == 1:
+                    self.single.setdefault(stems.pop(), []).append(label)
+                    continue
+                phrase_id = len(self.phrase_size)
+                self.phrase_size.append(len(stems))
+                for s in stems:
+                    self.multi.setdefault(s, []).append((label, phrase_id))
+
+    def match(self, stems: Iterable[str]) -> Set[str]:
+        labels: Set[str] = set()
+        seen: Dict[int, int] = {}
+        for s in stems:
+            found = self.single.get(s)
+            if found:
+                labels.update(found)
+            for label, phrase_id in self.multi.get(s, ()):
+                count = seen.get(phrase_id, 0) + 1
+                seen[phrase_id] = count
+                if count == self.phrase_size[phrase_id]:
+                    labels.add(label)
+        return labels
+
+    def best(self, stems: FrozenSet[str]) -> Optional[str]:
+        '''Highest-priority label matched by the query, or None.'''
+        labels = self.match(stems)
+        if not labels:
+            return None
+        return min(labels, key=self.rank.__getitem__)
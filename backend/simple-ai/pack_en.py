@@ -0,0 +1,51 @@
+'''
+English language pack for simple-ai; see pack_ru for the layout.
+
+English has no topic content yet: greetings and arithmetic are answered,
+everything else gets ASK_SPECIFIC.
+'''
+from static_answer import StaticAnswer
+
+LANGUAGE = 'en'
+CONTENT = None
+
+INTENTS = {
+    'greeting': ['hello', 'hi'],
+}
+
+ROUTES = [
+    ('greeting', 'greet'),
+    ('math', 'solve_math_expression'),
+]
+FALLBACK = 'ask_specific'
+
+GREETING = StaticAnswer("Hello! 👋 I'm NeuroPulse — smart AI assistant!\n\n**I can help with:**\n✅ Solving problems (math, physics, logic)\n✅ Writing articles and texts\n✅ Explaining complex topics\n✅ Programming and algorithms\n\nAsk any question — I'll give a ready solution! 🚀")
+ASK_SPECIFIC = StaticAnswer("Ask a specific question and I'll give a detailed answer! 🎯")
+MATH_FORMAT_HINT = StaticAnswer("I can't read this math expression. Write it like: (25 × 4) + 120 / 6")
+DIVISION_BY_ZERO = StaticAnswer("**Division by zero is undefined** 🚫\n\nCheck the problem: the divisor is 0.")
+TOO_COMPLEX = StaticAnswer("This problem is too complex for a quick answer 🙏 Split it into smaller parts or use smaller numbers and I'll solve it step by step.")
+
+MATH_STEPS = {
+    'title': '**Solving: {expression}**\n\n',
+    'start': '📐 **Start with the first number:** {value}\n\n',
+    '+': '📐 **Step {step}: Add {operand}**\n{left} + {operand} = {result}\n\n',
+    '-': '📐 **Step {step}: Subtract {operand}**\n{left} - {operand} = {result}\n\n',
+    '*': '📐 **Step {step}: Multiply by {operand}**\n{left} × {operand} = {result}\n\n',
+    '/': '📐 **Step {step}: Divide by {operand}**\n{left} ÷ {operand} = {result}\n\n',
+    'answer': '✅ **Answer: {result}**',
+}
+MATH_BINARY = '**Solution: {a} {sign} {b} = {result}**\n\n✅ Answer: {result}'
+MATH_FORMULA = """**Solution: ({a} × {b}) + {c} / {d}**
+
+📐 **Step 1: Multiply inside the parentheses**
+{a} × {b} = {step1}
+
+📐 **Step 2: Divide**
+{c} / {d} = {step2}
+
+📐 **Step 3: Add the results**
+{step1} + {step2} = {result}
+
+✅ **Answer: {result}**
+
+💡 *Rule:* parentheses first, then multiplication and division, then addition and subtraction!"""
@@ -0,0 +1,133 @@
+'''
+Russian language pack for simple-ai: routing rules, templates and the name
+of the topic content module.
+
+index.pack('ru') imports this module the first time a Russian request
+arrives; the engine in index.py reads everything language-specific from
+here. Topic answers stay in answers_ru, imported only when a route needs
+one. A new language is a pack_<lang>.py with the same names plus an entry
+in index.LANGUAGES.
+'''
+from static_answer import StaticAnswer
+
+LANGUAGE = 'ru'
+# module with the topic answers (ALL_TOPICS, TOPIC_WORDS, ...), or None
+CONTENT = 'answers_ru'
+
+# label -> phrases, stemmed into intents.StemIndex; first label wins in best()
+INTENTS = {
+    'greeting': ['привет', 'здравствуйте', 'добрый', 'доброе'],
+    'equation': ['квадратное', 'уравнение'],
+    'sport': ['спорт это'],
+    'photosynthesis': ['фотосинтез'],
+    'article': ['напиши статью', 'напиши текст', 'эссе', 'сочинение'],
+    'logic': ['логическая задача'],
+    'definition': ['что такое', 'объясни', 'расскажи о'],
+    'code': ['программа', 'программирование', 'программировать', 'программист', 'код'],
+    'sport_topic': ['спорт', 'спортивный'],
+    'sorting': ['сортировка', 'массив', 'массива'],
+}
+
+# (label, action) in order; a label is an intent above or an engine
+# detector ('equation', 'math'); the first match answers, else FALLBACK
+ROUTES = [
+    ('greeting', 'greet'),
+    ('equation', 'solve_equation'),
+    ('math', 'solve_math_expression'),
+    ('sport', 'explain_sport_detailed'),
+    ('photosynthesis', 'explain_photosynthesis'),
+    ('article', 'write_article'),
+    ('logic', 'solve_logic_problem'),
+    ('definition', 'explain_topic'),
+    ('code', 'help_with_code'),
+]
+FALLBACK = 'smart_universal_answer'
+
+GREETING = StaticAnswer("Привет! 👋 Я NeuroPulse — умный AI-помощник!\n\n**Могу помочь с:**\n✅ Решением задач (математика, физика, химия, логика)\n✅ Написанием текстов (статьи, эссе, рефераты)\n✅ Объяснением сложных тем\n✅ Программированием и алгоритмами\n✅ Переводами и языками\n\nЗадавай любой вопрос — дам готовое решение! 🚀")
+MATH_FORMAT_HINT = StaticAnswer("Не могу распознать математическое выражение. Напиши в формате: (25 × 4) + 120 / 6")
+EQUATION_FORMAT_HINT = StaticAnswer("Напиши уравнение в формате: 2x + 5 = 13 или x² - 5x + 6 = 0")
+DIVISION_BY_ZERO = StaticAnswer("**На ноль делить нельзя** 🚫\n\nПроверь условие: делитель в выражении равен 0.")
+TOO_COMPLEX = StaticAnswer("Задача слишком сложная для быстрого ответа 🙏 Раздели её на части поменьше или сократи числа — и я решу её по шагам.")
+
+# solve_math_expression: left-to-right steps, keyed by operator
+MATH_STEPS = {
+    'title': '**Решаю: {expression}**\n\n',
+    'start': '📐 **Начинаем с первого числа:** {value}\n\n',
+    '+': '📐 **Шаг {step}: Прибавляем {operand}**\n{left} + {operand} = {result}\n\n',
+    '-': '📐 **Шаг {step}: Вычитаем {operand}**\n{left} - {operand} = {result}\n\n',
+    '*': '📐 **Шаг {step}: Умножаем на {operand}**\n{left} × {operand} = {result}\n\n',
+    '/': '📐 **Шаг {step}: Делим на {operand}**\n{left} ÷ {operand} = {result}\n\n',
+    'answer': '✅ **Ответ: {result}**',
+}
+MATH_BINARY = '**Решение: {a} {sign} {b} = {result}**\n\n✅ Ответ: {result}'
+MATH_FORMULA = """**Решение: ({a} × {b}) + {c} / {d}**
+
+📐 **Шаг 1: Выполняем умножение в скобках**
+{a} × {b} = {step1}
+
+📐 **Шаг 2: Выполняем деление**
+{c} / {d} = {step2}
+
+📐 **Шаг 3: Складываем результаты**
+{step1} + {step2} = {result}
+
+✅ **Ответ: {result}**
+
+💡 *Правило:* Сначала действия в скобках и умножение/деление, потом сложение/вычитание!"""
+
+# smart_universal_answer, when no topic matched
+QUESTION_WORDS = ['что', 'как', 'почему', 'зачем', 'где', 'когда', 'какой', 'кто']
+QUESTION_MARKERS = ['это', 'такое', 'объясни']
+# cut from the query, in this order, to get the topic of a question
+QUESTION_PHRASES = ['что такое', 'что это', 'расскажи о', 'расскажи про', 'объясни']
+TOPIC_TEMPLATE = """**{title} — интересная тема!**
+
+📚 **Краткое объяснение:**
+
+{title} — это понятие/явление, которое имеет важное значение в своей области.
+
+**Основные аспекты:**
+
+🔹 **Суть концепции**
+Это фундаментальное понятие, которое помогает понять более широкий контекст темы.
+
+🔹 **Где встречается**
+Применяется в различных сферах: от теории до практического использования.
+
+🔹 **Почему важно**
+Понимание этого помогает разбираться в смежных вопросах и применять знания эффективно.
+
+💡 **Практическое применение:**
+Эти знания можно использовать для решения реальных задач, анализа ситуаций и принятия обоснованных решений.
+
+📖 **Хочешь узнать больше?**
+Задай конкретный вопрос о {topic} — дам подробный ответ с примерами, фактами и деталями!
+
+---
+
+**Я отвечу на любые вопросы по темам:**
+🧮 Математика, физика, химия, биология
+🧠 Психология, философия, социология  
+💻 Программирование и технологии
+🌍 История, география, экономика
+⚽ Спорт, здоровье, питание
+🎨 Искусство, культура, литература
+
+Просто спроси — дам подробный и понятный ответ! 🚀"""
+REQUEST_TEMPLATE = """**Понял ваш запрос!**
+
+По теме "{query}" могу помочь следующим образом:
+
+💬 **Если нужна информация:**
+Задайте конкретный вопрос: "Что такое...?", "Как работает...?", "Объясни..."
+
+🧮 **Если нужно решить задачу:**
+Напишите условие с числами или формулой — решу пошагово!
+
+✍️ **Если нужен текст:**
+"Напиши статью про...", "Составь эссе о..." — создам качественный текст!
+
+💻 **Если нужен код:**
+"Напиши код для..." — дам готовое решение с объяснениями!
+
+Уточните запрос — и я дам конкретный, развёрнутый ответ! 🎯"""
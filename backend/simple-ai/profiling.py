@@ -0,0 +1,241 @@
+'''
+Opt-in profiling of production requests.
+
+Vendored into ai-chat and simple-ai by tools/sync_shared.py.
+
+    @traced
+    @profiled
+    def handler(event, context): ...
+
+A request is profiled when it is sampled (PROFILE_SAMPLE_RATE, 0..1) or
+carries X-Profile: <PROFILE_TOKEN>. PROFILE_MODE picks cpu (cProfile),
+memory (tracemalloc) or both (the default). Each profiled request writes
+its reports to PROFILE_DIR:
+
+    <time>-<function>-<request_id>.collapsed   one "frame;frame;frame microseconds" line
+                                               per call path: flamegraph.pl, speedscope
+    <time>-<function>-<request_id>.alloc.txt   peak, and the PROFILE_TOP_N source lines
+                                               holding the most memory at the end
+
+and logs one JSON line naming them; a request profiled by header also gets
+them back in an X-Profile-Report header. Once the directory holds more
+than PROFILE_MAX_BYTES the oldest reports are deleted.
+
+cProfile records calls and callers, not stacks, so call paths are rebuilt
+from the caller edges, splitting a function's time among its callers in
+proportion to the time each call edge took. tracemalloc and the profiler
+are per process, so one request at a time is profiled per instance; one
+that arrives meanwhile runs unprofiled. Profiled requests run slower, so
+simple-ai's CPU budget trips earlier for them.
+
+With neither PROFILE_SAMPLE_RATE nor PROFILE_TOKEN set, profiled returns
+the handler itself: requests pay nothing. Otherwise an unprofiled request
+pays one check.
+'''
+import functools
+import hmac
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from runtime import dumps
+
+SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE') or 0)
+TOKEN = os.environ.get('PROFILE_TOKEN') or ''
+MODES = set((os.environ.get('PROFILE_MODE') or 'cpu,memory').replace(' ', '').split(','))
+DIRECTORY = os.environ.get('PROFILE_DIR') or '/tmp/neuropulse-profiles'
+MAX_BYTES = int(os.environ.get('PROFILE_MAX_BYTES') or 50 * 1024 * 1024)
+TOP_N = int(os.environ.get('PROFILE_TOP_N') or 30)
+# tracemalloc frames kept per allocation; the report groups by the innermost line
+MEMORY_FRAMES = 1
+# call paths deeper than this are cut, and ones under MIN_PATH_SHARE of the request
+# are not followed: a cold start importing a library otherwise expands to 100k+ paths
+MAX_DEPTH = 64
+MIN_PATH_SHARE = 0.0005
+MAX_PATHS = 5000
+
+if 0 < SAMPLE_RATE < 1:
+    from random import random as _random
+
+_busy = threading.Lock()
+
+# pstats function key: (filename, line, name)
+Function = Tuple[str, int, str]
+
+
+def requested(event: Dict[str, Any]) -> bool:
+    '''X-Profile carries PROFILE_TOKEN.'''
+    if not TOKEN:
+        return False
+    headers = event.get('headers') or {}
+    supplied = headers.get('X-Profile') or headers.get('x-profile')
+    return bool(supplied) and hmac.compare_digest(supplied.encode(), TOKEN.encode())
+
+
+def _label(function: Function) -> str:
+    filename, line, name = function
+    if filename == '~':
+        # builtins: "<method 'join' of 'str' objects>"
+        return name.replace(';', ',')
+    return f'{os.path.basename(filename)}:{name}:{line}'.replace(';', ',')
+
+
+def collapsed(stats: Dict[Function, Tuple[Any, ...]]) -> List[str]:
+    '''pstats.Stats(...).stats as "frame;frame;... microseconds" lines, the MAX_PATHS most expensive first.'''
+    callees: Dict[Function, List[Tuple[Function, float]]] = {}
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((function, edge[3]))
+    # entered with no caller seen: the handler itself, and the profiler's disable()
+    roots = [function for function, row in stats.items() if not row[4]]
+    smallest = MIN_PATH_SHARE * sum(stats[root][3] for root in roots)
+    paths: Dict[str, float] = {}
+
+    def walk(function: Function, stack: List[str], share: float) -> None:
+        _, _, own, cumulative, _ = stats[function]
+        stack.append(_label(function))
+        key = ';'.join(stack)
+        paths[key] = paths.get(key, 0.0) + own * share
+        if len(stack) < MAX_DEPTH:
+            for callee, edge_seconds in callees.get(function, ()):
+                callee_cumulative = stats[callee][3]
+                callee_share = share * edge_seconds / callee_cumulative if callee_cumulative else 0.0
+                # recursion is folded into the first frame of the function on the path
+                if callee_share * callee_cumulative >= smallest and _label(callee) not in stack:
+                    walk(callee, stack, callee_share)
+        stack.pop()
+
+    for root in roots:
+        walk(root, [], 1.0)
+    lines = [(round(seconds * 1e6), path) for path, seconds in paths.items()]
+    lines.sort(reverse=True)
+    return [f'{path} {microseconds}' for microseconds, path in lines[:MAX_PATHS] if microseconds > 0]
+
+
+def allocations(snapshot: Any, peak: int) -> List[str]:
+    import tracemalloc
+    # the profiler's own allocations
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '*/cProfile.py'),
+        tracemalloc.Filter(False, '*/profile.py'),
+    ))
+    top = snapshot.statistics('lineno')
+    lines = [f'peak {peak} bytes, {sum(stat.size for stat in top)} bytes in {len(top)} lines held at the end']
+    for stat in top[:TOP_N]:
+        frame = stat.traceback[0]
+        lines.append(f'{stat.size:>10} bytes {stat.count:>7} blocks  {frame.filename}:{frame.lineno}')
+    return lines
+
+
+def rotate(directory: str, max_bytes: int) -> int:
+    '''Deletes the oldest reports until the directory holds at most max_bytes; returns how many.'''
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def _write(name: str, lines: List[str]) -> str:
+    path = os.path.join(DIRECTORY, name)
+    with open(path, 'w', encoding='utf-8') as report:
+        report.write('\n'.join(lines))
+        report.write('\n')
+    return path
+
+
+def _report(context: Any, profile: Any, snapshot: Any, peak: int) -> List[str]:
+    request_id = (getattr(context, 'request_id', '') or 'local').replace('/', '_')[:64]
+    base = f'{time.strftime("%Y%m%dT%H%M%S", time.gmtime())}-{getattr(context, "function_name", "") or "handler"}-{request_id}'
+    os.makedirs(DIRECTORY, exist_ok=True)
+    written = []
+    if profile is not None:
+        import pstats
+        written.append(_write(base + '.collapsed', collapsed(pstats.Stats(profile).stats)))
+    if snapshot is not None:
+        written.append(_write(base + '.alloc.txt', allocations(snapshot, peak)))
+    rotate(DIRECTORY, MAX_BYTES)
+    return written
+
+
+def profiled(handler: Callable[[Dict[str, Any], Any], Dict[str, Any]]) -> Callable:
+    '''handler(event, context) with opt-in profiling; handler itself when profiling is not configured.'''
+    if not SAMPLE_RATE and not TOKEN:
+        return handler
+
+    @functools.wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        by_header = requested(event)
+        if not (by_header or SAMPLE_RATE >= 1 or (SAMPLE_RATE and _random() < SAMPLE_RATE)):
+            return handler(event, context)
+        if not _busy.acquire(blocking=False):
+            return handler(event, context)
+        try:
+            return _profile(handler, event, context, by_header)
+        finally:
+            _busy.release()
+
+    return wrapper
+
+
+def _profile(handler: Callable, event: Dict[str, Any], context: Any, by_header: bool) -> Dict[str, Any]:
+    profile = snapshot = None
+    peak = 0
+    memory = 'memory' in MODES
+    if memory:
+        import tracemalloc
+        # someone else (PYTHONTRACEMALLOC) may already be tracing: leave it running
+        memory = not tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.start(MEMORY_FRAMES)
+    if 'cpu' in MODES:
+        import cProfile
+        profile = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        if profile is not None:
+            response = profile.runcall(handler, event, context)
+        else:
+            response = handler(event, context)
+    finally:
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    try:
+        written = _report(context, profile, snapshot, peak)
+    except Exception as e:
+        print(dumps({'profile_error': str(e)}), file=sys.stderr, flush=True)
+        return response
+    sys.stdout.write(dumps({
+        'event': 'profile',
+        'function': getattr(context, 'function_name', ''),
+        'request_id': getattr(context, 'request_id', ''),
+        'trigger': 'header' if by_header else 'sample',
+        'profiled_ms': round(elapsed_ms, 3),
+        'peak_bytes': peak,
+        'reports': written,
+    }) + '\n')
+    if by_header:
+        headers = dict(response.get('headers') or {})
+        headers['X-Profile-Report'] = ', '.join(os.path.basename(path) for path in written)
+        response['headers'] = headers
+    return response
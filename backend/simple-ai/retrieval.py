@@ -0,0 +1,114 @@
+'''
+BM25 retrieval over the simple-ai topic answers.
+
+Each answer is a document with two fields, title (the words that name the
+topic) and body (the answer text), every field kept as a CSR-style sparse
+term matrix: for term t, docs[offsets[t]:offsets[t + 1]] are the documents
+containing it and weights[...] their precomputed BM25 term weights.
+Scoring a query is one slice per query term and a single np.bincount per
+field; field scores are summed with FIELD_WEIGHTS.
+
+    index = BM25Index([(title_stems, body_stems), ...])
+    index.best(query_stems)     # (doc, score) or None below MIN_SCORE
+
+With few, long documents almost every content word occurs in some body, so
+the title weight is what makes the score threshold meaningful: a title hit
+outweighs any realistic pile of incidental body matches.
+
+numpy is imported with this module, which index.py loads on the first
+request that needs a topic lookup.
+'''
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = (5.0, 1.0)
+# on the benchmark corpus body-only matches top out near 5 and the weakest
+# title match scores about 7.8
+MIN_SCORE = float(os.environ.get('BM25_MIN_SCORE') or 6.0)
+
+
+class _Field:
+    __slots__ = ('offsets', 'docs', 'weights')
+
+    def __init__(self, documents: Sequence[Iterable[str]], terms: Dict[str, int], k1: float, b: float):
+        size = len(documents)
+        counts: List[Dict[int, int]] = []
+        lengths = np.zeros(size, dtype=np.float64)
+        for doc, tokens in enumerate(documents):
+            tf: Dict[int, int] = {}
+            for term in tokens:
+                term_id = terms.setdefault(term, len(terms))
+                tf[term_id] = tf.get(term_id, 0) + 1
+            lengths[doc] = sum(tf.values())
+            counts.append(tf)
+
+        postings: List[List[Tuple[int, int]]] = [[] for _ in terms]
+        for doc, tf in enumerate(counts):
+            for term_id, count in tf.items():
+                postings[term_id].append((doc, count))
+
+        sizes = np.fromiter((len(p) for p in postings), dtype=np.int64, count=len(postings))
+        self.offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+        total = int(self.offsets[-1])
+        self.docs = np.fromiter((d for p in postings for d, _ in p), dtype=np.int32, count=total)
+        tf_flat = np.fromiter((c for p in postings for _, c in p), dtype=np.float64, count=total)
+
+        # BM25 with the always-positive idf, folded into one weight per posting
+        idf = np.log1p((size - sizes + 0.5) / (sizes + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(float(lengths.mean()) if size else 0.0, 1.0))
+        term_of_posting = np.repeat(np.arange(len(postings)), sizes)
+        self.weights = idf[term_of_posting] * tf_flat * (k1 + 1) / (tf_flat + norm[self.docs])
+
+    def extend(self, term_count: int) -> None:
+        '''Pads offsets for terms first seen in a later field (empty postings).'''
+        missing = term_count + 1 - len(self.offsets)
+        if missing > 0:
+            self.offsets = np.concatenate([self.offsets, np.full(missing, self.offsets[-1])])
+
+
+class BM25Index:
+    def __init__(self, documents: Sequence[Sequence[Iterable[str]]],
+                 field_weights: Sequence[float] = FIELD_WEIGHTS, k1: float = K1, b: float = B):
+        '''documents: per document, one token sequence per field (title, body).'''
+        self.size = len(documents)
+        self.terms: Dict[str, int] = {}
+        self.field_weights = list(field_weights)
+        self.fields = [_Field([doc[f] for doc in documents], self.terms, k1, b)
+                       for f in range(len(self.field_weights))]
+        for field in self.fields:
+            field.extend(len(self.terms))
+
+    def scores(self, stems: Iterable[str]) -> np.ndarray:
+        term_ids = [self.terms[s] for s in stems if s in self.terms]
+        total = np.zeros(self.size)
+        if not term_ids:
+            return total
+        for field, weight in zip(self.fields, self.field_weights):
+            offsets = field.offsets
+            spans = [(offsets[t], offsets[t + 1]) for t in term_ids if offsets[t] != offsets[t + 1]]
+            if not spans:
+                continue
+            if len(spans) == 1:
+                docs = field.docs[spans[0][0]:spans[0][1]]
+                weights = field.weights[spans[0][0]:spans[0][1]]
+            else:
+                docs = np.concatenate([field.docs[start:end] for start, end in spans])
+                weights = np.concatenate([field.weights[start:end] for start, end in spans])
+            total += weight * np.bincount(docs, weights, minlength=self.size)
+        return total
+
+    def best(self, stems: Iterable[str], min_score: float = MIN_SCORE) -> Optional[Tuple[int, float]]:
+        '''Best-scoring document and its score, or None below min_score.'''
+        if not self.size:
+            return None
+        scores = self.scores(stems)
+        doc = int(scores.argmax())
+        score = float(scores[doc])
+        if score < min_score:
+            return None
+        return doc, score
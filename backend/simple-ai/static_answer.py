@@ -0,0 +1,25 @@
+'''
+Constant answers whose response bodies are rendered once.
+
+A StaticAnswer is an ordinary str everywhere else (routing, golden hashes);
+the handler recognises it and returns response_body() as-is instead of
+re-encoding several KB of text on every request.
+'''
+from typing import Dict
+
+from runtime import dumps
+
+
+class StaticAnswer(str):
+    _body = None
+
+    def response_body(self) -> str:
+        '''Compact UTF-8 JSON body {"response": ..., "success": true}, cached on the instance.'''
+        body = self._body
+        if body is None:
+            body = self._body = dumps({'response': str(self), 'success': True})
+        return body
+
+
+def static_table(table: Dict[str, str]) -> Dict[str, StaticAnswer]:
+    return {key: StaticAnswer(text) for key, text in table.items()}
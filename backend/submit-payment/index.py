@@ -1,7 +1,20 @@
-import json
 from typing import Dict, Any
 from datetime import datetime
 
+from runtime import (
+    METHOD_NOT_ALLOWED, RequestError, error_response, frozen_error,
+    frozen_json, json_response, parse_json_body, preflight
+)
+from timing import span, traced
+
+OPTIONS_RESPONSE = preflight('POST, GET, OPTIONS')
+MISSING_FIELDS = frozen_error(400, 'Missing required fields')
+PAYMENTS_LIST = frozen_json(200, {
+    'payments': [],
+    'message': 'GET method for fetching payments list'
+})
+
+@traced
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Принимает заявку на ручной платёж от пользователя
@@ -12,20 +25,12 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'POST')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
+        return OPTIONS_RESPONSE()
     
     if method == 'POST':
         try:
-            body_data = json.loads(event.get('body', '{}'))
+            with span('parse'):
+                body_data = parse_json_body(event)
             
             user_id = body_data.get('userId')
             tariff_type = body_data.get('tariffType')
@@ -33,14 +38,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             sender_name = body_data.get('senderName')
             
             if not all([user_id, tariff_type, amount, sender_name]):
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({'error': 'Missing required fields'})
-                }
+                return MISSING_FIELDS()
             
             payment_data = {
                 'id': f'pay_{context.request_id[:8]}',
@@ -54,56 +52,19 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'createdAt': datetime.utcnow().isoformat()
             }
             
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
+            with span('serialize'):
+                return json_response(200, {
                     'success': True,
                     'payment': payment_data,
                     'message': 'Payment request submitted successfully'
                 })
-            }
             
-        except json.JSONDecodeError:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Invalid JSON'})
-            }
+        except RequestError as e:
+            return e.response()
         except Exception as e:
-            return {
-                'statusCode': 500,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': f'Server error: {str(e)}'})
-            }
+            return error_response(500, f'Server error: {str(e)}')
     
     if method == 'GET':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'payments': [],
-                'message': 'GET method for fetching payments list'
-            })
-        }
+        return PAYMENTS_LIST()
     
-    return {
-        'statusCode': 405,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-        },
-        'body': json.dumps({'error': 'Method not allowed'})
-    }
+    return METHOD_NOT_ALLOWED()
@@ -0,0 +1,20 @@
+-- Token and cost accounting for ai-chat, aggregated per user, UTC day, model and language.
+-- Rows are upserted in batches by backend/ai-chat/usage.py; user_id 0 is anonymous.
+CREATE TABLE IF NOT EXISTS ai_usage_daily (
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    model VARCHAR(64) NOT NULL,
+    language VARCHAR(8) NOT NULL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0,
+    completion_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(14, 6) NOT NULL DEFAULT 0,
+    latency_ms_total BIGINT NOT NULL DEFAULT 0,
+    latency_ms_max INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, user_id, model, language)
+);
+
+-- per-user history ("how much did user N spend this month")
+CREATE INDEX IF NOT EXISTS ai_usage_daily_user_day ON ai_usage_daily (user_id, day);
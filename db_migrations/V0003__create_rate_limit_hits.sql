@@ -0,0 +1,10 @@
+-- Sliding-window rate limit counters shared by function instances, one row per key and minute.
+-- Upserted about once a second per instance by backend/_shared/ratelimit.py; rows older than
+-- two minutes are deleted. UNLOGGED skips the WAL: a crash empties the table, which only
+-- forgets the last minute of hits.
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_hits (
+    key VARCHAR(160) NOT NULL,
+    window_start BIGINT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (key, window_start)
+);
@@ -0,0 +1,13 @@
+-- Revoked session tokens (backend/_shared/session_token.py). A row names one token (jti) or,
+-- for "log out everywhere", a user whose tokens issued before revoked_at are all invalid.
+-- Rows only matter until expires_at, when the tokens they cover would have expired anyway.
+CREATE TABLE IF NOT EXISTS session_revocations (
+    id BIGSERIAL PRIMARY KEY,
+    jti VARCHAR(32),
+    user_id INTEGER,
+    revoked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- verifiers read rows newer than the last id they saw that have not expired yet
+CREATE INDEX IF NOT EXISTS session_revocations_expires_at ON session_revocations (expires_at);
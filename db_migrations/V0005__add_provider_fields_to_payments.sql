@@ -0,0 +1,11 @@
+-- Provider payment id and crediting state (backend/_shared/crediting.py). A payment is
+-- credited when credited_at is set; the unique provider id makes crediting idempotent
+-- between payment-webhook and the reconcile-payments job.
+ALTER TABLE payments
+    ADD COLUMN IF NOT EXISTS provider_payment_id VARCHAR(64),
+    ADD COLUMN IF NOT EXISTS tariff_type VARCHAR(50),
+    ADD COLUMN IF NOT EXISTS currency VARCHAR(3),
+    ADD COLUMN IF NOT EXISTS paid_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS credited_at TIMESTAMP;
+
+CREATE UNIQUE INDEX IF NOT EXISTS payments_provider_payment_id ON payments (provider_payment_id);
@@ -0,0 +1,23 @@
+-- Webhook notifications waiting to be credited (backend/payment-webhook/payment_jobs.py).
+-- payment-webhook inserts one row and acks; workers claim due rows with FOR UPDATE SKIP
+-- LOCKED. status: queued -> done, or dead after MAX_ATTEMPTS or a poison payload (see
+-- last_error). Requeue a dead job with
+--     UPDATE payment_jobs SET status = 'queued', attempts = 0, run_at = CURRENT_TIMESTAMP WHERE id = ...
+CREATE TABLE IF NOT EXISTS payment_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    provider_payment_id VARCHAR(64) NOT NULL,
+    event VARCHAR(64) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- YooKassa redelivers a notification until it gets a 2xx; a redelivery is a no-op insert
+CREATE UNIQUE INDEX IF NOT EXISTS payment_jobs_notification ON payment_jobs (provider_payment_id, event);
+
+-- the claim query only ever looks at due queued jobs
+CREATE INDEX IF NOT EXISTS payment_jobs_due ON payment_jobs (run_at) WHERE status = 'queued';
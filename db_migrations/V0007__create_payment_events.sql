@@ -0,0 +1,31 @@
+-- Outbox of payment outcomes for the browser (backend/payment-status).
+-- credited rows are inserted by the crediting statement itself (backend/_shared/crediting.py),
+-- so an event exists exactly when the credit committed; failed rows are written by
+-- payment_jobs when a notification is dead-lettered. Payments credited before this
+-- migration have no event.
+CREATE TABLE IF NOT EXISTS payment_events (
+    id BIGSERIAL PRIMARY KEY,
+    provider_payment_id VARCHAR(64) NOT NULL,
+    user_id INTEGER,
+    status VARCHAR(16) NOT NULL,
+    tariff_type VARCHAR(50),
+    requests_added INTEGER,
+    subscription_type VARCHAR(50),
+    detail TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- payment-status reads the latest event of one payment
+CREATE INDEX IF NOT EXISTS payment_events_payment ON payment_events (provider_payment_id, id);
+
+-- wakes payment-status listeners; NOTIFY is delivered on commit, never for a rolled back credit
+CREATE OR REPLACE FUNCTION notify_payment_event() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('payment_events', NEW.provider_payment_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS payment_events_notify ON payment_events;
+CREATE TRIGGER payment_events_notify AFTER INSERT ON payment_events
+    FOR EACH ROW EXECUTE FUNCTION notify_payment_event();
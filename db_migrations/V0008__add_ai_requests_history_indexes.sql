@@ -0,0 +1,17 @@
+-- Read side of ai_requests for backend/chat-history: a user's exchanges newest first, and
+-- full-text search over them. Rows are written by chat_log in ai-chat and simple-ai.
+
+-- keyset pagination: WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+-- is one index range scan however deep the page
+CREATE INDEX IF NOT EXISTS ai_requests_user_recent ON ai_requests (user_id, created_at DESC, id DESC);
+
+-- questions and answers are Russian or English, often mixed: both stemmers' lexemes are kept,
+-- and searches OR a Russian and an English query. The question weighs more than the answer.
+ALTER TABLE ai_requests ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian', coalesce(request_text, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(request_text, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce(response_text, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(response_text, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS ai_requests_search ON ai_requests USING GIN (search_vector);
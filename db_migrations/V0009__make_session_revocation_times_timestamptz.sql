@@ -0,0 +1,8 @@
+-- session_revocations times are instants compared across instances: login writes them with
+-- to_timestamp() and verifiers read them back with EXTRACT(EPOCH ...). In TIMESTAMP columns
+-- the write converted to the session TimeZone and the read took the result for UTC, so on a
+-- database not set to UTC every revocation was shifted by the offset. TIMESTAMPTZ keeps the
+-- instant. Existing rows were written in the database TimeZone, which the cast assumes too.
+ALTER TABLE session_revocations
+    ALTER COLUMN revoked_at TYPE TIMESTAMPTZ,
+    ALTER COLUMN expires_at TYPE TIMESTAMPTZ;
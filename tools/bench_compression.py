@@ -0,0 +1,106 @@
+'''
+Response compression: wire bytes, CPU and modelled transfer time.
+
+Bodies are the simple-ai static answers plus synthetic ai-chat answers of
+growing length. For each available coding the report shows bytes sent, the
+per-request cost (dynamic level; static answers are compressed once and
+served from cache) and the transfer time on slow links:
+
+    time = slow-start rounds * RTT + bytes / bandwidth
+
+with an initial congestion window of 10 segments. This models a cold
+connection, which is what a mobile client on a new page load mostly gets.
+
+    python tools/bench_compression.py
+    python tools/bench_compression.py --links 3g=750:300,edge=200:600
+'''
+import argparse
+import base64
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from functions import load_module
+
+MSS = 1460
+INITIAL_WINDOW = 10
+
+
+def transfer_ms(size: int, kbit_s: float, rtt_ms: float) -> float:
+    rounds, window, sent = 0, INITIAL_WINDOW * MSS, 0
+    while sent < size:
+        sent += window
+        window *= 2
+        rounds += 1
+    return rounds * rtt_ms + size * 8 / kbit_s
+
+
+def per_call_us(fn: Callable[[], object], repeat: int) -> float:
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        runs.append((time.perf_counter() - start) / repeat * 1e6)
+    return statistics.median(runs)
+
+
+def parse_links(value: str) -> List[Tuple[str, float, float]]:
+    links = []
+    for item in value.split(','):
+        name, _, spec = item.partition('=')
+        kbit_s, _, rtt_ms = spec.partition(':')
+        links.append((name, float(kbit_s), float(rtt_ms)))
+    return links
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=300)
+    parser.add_argument('--links', default='3g=750:300,edge=200:600', help='name=kbit/s:rtt_ms,...')
+    args = parser.parse_args()
+
+    module = load_module('simple-ai')
+    runtime = sys.modules['runtime']
+    compression = sys.modules['compression']
+    links = parse_links(args.links)
+    codings = ['gzip'] + (['br'] if compression.parse_accept_encoding('br') == 'br' else [])
+
+    answers = module.answers(module.pack('ru'))
+    bodies: Dict[str, str] = {
+        'simple-ai ARTICLE_SPORT': answers.ARTICLE_SPORT.response_body(),
+        'simple-ai KB[истори]': answers.KNOWLEDGE_BASE['истори'].response_body(),
+        'simple-ai CODE_HELP': answers.CODE_HELP.response_body(),
+        'simple-ai greeting': module.pack('ru').GREETING.response_body(),
+    }
+    paragraph = ' '.join(answers.KNOWLEDGE_BASE.values())
+    for size in (1500, 3000, 6000):
+        bodies[f'ai-chat {size} chars'] = runtime.dumps({'response': paragraph[:size]})
+
+    header = f'{"body":<26}{"coding":<9}{"bytes":>8}{"ratio":>7}{"cpu us":>9}'
+    header += ''.join(f'{name + " ms":>10}' for name, _, _ in links)
+    print(f'threshold: {compression.MIN_CHARS} chars\n')
+    print(header)
+    for label, body in bodies.items():
+        raw = body.encode('utf-8')
+        rows = [('identity', len(raw), 0.0)]
+        if len(body) >= compression.MIN_CHARS:
+            for coding in codings:
+                packed = base64.b64decode(compression.compress_body(body, coding))
+                cpu = per_call_us(lambda: compression.compress_body(body, coding), args.repeat)
+                rows.append((coding, len(packed), cpu))
+        for coding, size, cpu in rows:
+            line = f'{label[:25]:<26}{coding:<9}{size:>8}{size / len(raw):>7.0%}{cpu:>9.1f}'
+            line += ''.join(f'{transfer_ms(size, kbit_s, rtt):>10.0f}' for _, kbit_s, rtt in links)
+            print(line)
+            label = ''
+
+    static = answers.ARTICLE_SPORT.response_body()
+    cached = per_call_us(lambda: compression.compress_static(static, 'gzip'), 10000)
+    print(f'\nstatic answer served from cache: {cached:.2f} us per request')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+'''
+Generates simple_ai_corpus.jsonl, the query corpus for tools/bench_simple_ai.py.
+
+Queries are built from templates modelled on what students actually send,
+and each line carries a traffic weight so the benchmark draws a workload
+with production proportions (greetings and arithmetic dominate, long
+articles are rare). Output is deterministic for a given --seed; regenerate
+the golden file after changing the corpus:
+
+    python tools/bench_data/make_simple_ai_corpus.py
+    python tools/bench_simple_ai.py --update-golden
+'''
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+OUT = Path(__file__).resolve().parent / 'simple_ai_corpus.jsonl'
+
+# share of total traffic per category
+SHARES: Dict[str, float] = {
+    'ru_greeting': 0.12,
+    'ru_math': 0.20,
+    'ru_equation': 0.08,
+    'ru_definition': 0.18,
+    'ru_sport': 0.02,
+    'ru_article': 0.06,
+    'ru_logic': 0.02,
+    'ru_code': 0.07,
+    'ru_other': 0.10,
+    'en_greeting': 0.05,
+    'en_math': 0.05,
+    'en_other': 0.05,
+    'ru_typo': 0.03,
+}
+
+RU_GREETINGS = [
+    'привет', 'Привет', 'Привет!', 'привет!!', 'Привет, как дела?', 'привет, помоги с домашкой',
+    'Здравствуйте', 'здравствуй', 'Здравствуйте, мне нужна помощь', 'Добрый день', 'добрый вечер',
+    'Доброе утро!', 'Добрый день, можно вопрос?', 'привет, ты кто?', 'привет нейросеть',
+]
+RU_KNOWN_TOPICS = [
+    'интернет', 'гравитация', 'регресс', 'история', 'счастье', 'психология', 'депрессия',
+    'эволюция', 'квантовая физика', 'фотосинтез', 'активный регресс', 'психологическая травма',
+    'квантовая запутанность', 'история России', 'эволюция человека',
+]
+RU_OTHER_TOPICS = [
+    'блокчейн', 'ДНК', 'инфляция', 'демократия', 'электричество', 'атом', 'клетка', 'вирус',
+    'экономика', 'философия', 'литература', 'социология', 'алгоритм', 'нейросеть', 'метафора',
+    'гипербола', 'синтаксис', 'причастие', 'деепричастие', 'интеграл', 'производная', 'логарифм',
+    'теорема Пифагора', 'закон Ома', 'валентность', 'молекула', 'экосистема', 'климат',
+    'глобальное потепление', 'ренессанс', 'феодализм', 'капитализм', 'социализм', 'монархия',
+    'конституция', 'налог', 'бюджет', 'ВВП', 'спрос и предложение', 'конкуренция', 'маркетинг',
+    'менеджмент', 'эмпатия', 'темперамент', 'мотивация', 'стресс', 'память', 'внимание',
+]
+RU_DEFINITION_FORMS = [
+    'что такое {t}', 'Что такое {t}?', 'что такое {t} простыми словами', 'объясни {t}',
+    'Объясни, что такое {t}', 'расскажи о {t}', 'Расскажи о теме {t}', 'что такое {t} и его виды',
+    'объясни {t} для 7 класса', 'что такое {t}? кратко',
+]
+RU_ARTICLE_FORMS = [
+    'напиши статью про {t}', 'Напиши статью о {t}', 'напиши текст про {t}', 'эссе на тему {t}',
+    'напиши эссе про {t}', 'сочинение на тему {t}', 'Сочинение про {t} на 200 слов',
+]
+RU_ARTICLE_TOPICS = ['спорт', 'спорт и здоровье', 'дружбу', 'осень', 'технологии', 'экологию',
+                     'роль спорта', 'образование', 'семью', 'будущее']
+RU_CODE = [
+    'напиши код сортировки массива', 'сортировка массива на python', 'как написать программу',
+    'помоги с кодом', 'программа для калькулятора', 'напиши программу на python',
+    'код для поиска максимума в массиве', 'как работает цикл for в программе', 'ошибка в коде',
+    'программирование для начинающих', 'с чего начать программировать', 'код на javascript',
+]
+RU_LOGIC = [
+    'реши логическую задачу', 'логическая задача про двери', 'Помоги с логической задачей',
+    'логическая задача на смекалку', 'дай логическую задачу', 'логические задачи для 5 класса',
+]
+RU_SPORT = ['спорт это', 'что это спорт', 'спорт - это что', 'Спорт это что такое',
+            'зачем нужен спорт, что это']
+RU_OTHER = [
+    'как выучить английский', 'почему небо голубое', 'где находится Австралия',
+    'когда началась вторая мировая война', 'кто написал войну и мир', 'посоветуй книгу',
+    'как подготовиться к ЕГЭ', 'зачем учить математику', 'какой язык программирования выбрать',
+    'как перестать прокрастинировать', 'составь план доклада', 'переведи на английский слово кошка',
+    'проверь орфографию', 'какая столица Канады', 'как решать задачи на проценты',
+    'сколько планет в солнечной системе', 'почему вода мокрая', 'как устроен двигатель',
+    'дай совет как учиться', 'мне скучно', 'спасибо', 'ок', 'понятно', 'помоги', 'что ты умеешь',
+]
+EN_GREETINGS = ['hello', 'Hello', 'hi', 'Hi there', 'hello, can you help me?', 'Hi! who are you?']
+EN_OTHER = [
+    'what is photosynthesis', 'explain gravity', 'write an essay about sport', 'how does the internet work',
+    'what is quantum physics', 'tell me about history', 'help me with my homework', 'translate this text',
+    'sort an array in python', 'what is democracy', 'why is the sky blue', 'thanks', 'ok', 'solve x + 5 = 10',
+]
+RU_MATH_FORMS = [
+    '{a} + {b}', '{a} - {b}', '{a} * {b}', '{a} / {b}', '{a} × {b}', '{a} ÷ {b}', '{a}+{b}',
+    'сколько будет {a} + {b}', 'посчитай {a} * {b} - {c}', 'реши пример {a} + {b} - {c}',
+    '({a} × {b}) + {c} / {d}', '({a} * {b}) + {c} / {d}', '{a} ^ {e}', 'вычисли {a} - {b} + {c}',
+    'чему равно {a} * {b}', '{a} + {b} + {c} + {d}', 'помоги решить {a} / {d} + {b}',
+]
+EN_MATH_FORMS = ['{a} + {b}', 'what is {a} * {b}', 'solve {a} - {b}', 'calculate {a} / {d} + {c}',
+                 '({a} * {b}) + {c} / {d}']
+RU_EQUATION_FORMS = [
+    'реши уравнение {a}x + {b} = {c}', '{a}x + {b} = {c}', 'уравнение {a}x+{b}={c}',
+    'реши квадратное уравнение x² - {s}x + {p} = 0', 'x^2 - {s}x + {p} = 0 уравнение',
+    'квадратное уравнение x2 - {s}x + {p}', 'реши уравнение {a}x - {b} = {c}',
+    'уравнение x² + {s}x + {p} = 0', 'реши уравнение 2x² - {s}x + {p} = 0',
+    'реши систему уравнений x + y = {c}, x - y = {b}', 'помоги с уравнением',
+]
+
+# queries that once got a wrong answer; added to every corpus as they are, with a small weight
+RU_EQUATION_REGRESSIONS = [
+    'реши 2(x+1) = 4', 'реши уравнение номер 5: x + 2 = 7', 'реши уравнение x^2 = 4 для 8 класса',
+    'реши x^0 + x = 3',
+]
+REGRESSION_WEIGHT = 0.0001
+
+
+def numbers(rng: random.Random) -> Dict[str, int]:
+    r1, r2 = rng.randint(1, 12), rng.randint(1, 12)
+    return {
+        'a': rng.choice([rng.randint(1, 20), rng.randint(10, 999)]),
+        'b': rng.randint(1, 200),
+        'c': rng.randint(1, 500),
+        'd': rng.randint(1, 20),
+        'e': rng.randint(2, 5),
+        's': r1 + r2,
+        'p': r1 * r2,
+    }
+
+
+def from_forms(forms: List[str], fill: Callable[[random.Random], Dict]) -> Callable[[random.Random], str]:
+    return lambda rng: rng.choice(forms).format(**fill(rng))
+
+
+def pick(items: List[str]) -> Callable[[random.Random], str]:
+    return lambda rng: rng.choice(items)
+
+
+def definition(rng: random.Random) -> str:
+    topics = RU_KNOWN_TOPICS if rng.random() < 0.55 else RU_OTHER_TOPICS
+    return rng.choice(RU_DEFINITION_FORMS).format(t=rng.choice(topics))
+
+
+RU_LETTERS = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    '''One substitution, deletion, insertion or swap after the first letter.'''
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(['sub', 'del', 'ins', 'swap'])
+    if edit == 'sub':
+        return word[:i] + rng.choice(RU_LETTERS) + word[i + 1:]
+    if edit == 'del':
+        return word[:i] + word[i + 1:]
+    if edit == 'ins':
+        return word[:i] + rng.choice(RU_LETTERS) + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def typo(rng: random.Random) -> str:
+    words = rng.choice(RU_KNOWN_TOPICS).split()
+    longest = max(range(len(words)), key=lambda k: len(words[k]))
+    words[longest] = misspell(words[longest], rng)
+    form = rng.choice(RU_DEFINITION_FORMS + ['{t}', '{t} это'])
+    return form.format(t=' '.join(words))
+
+
+GENERATORS: Dict[str, Tuple[str, Callable[[random.Random], str], int]] = {
+    'ru_greeting': ('ru', pick(RU_GREETINGS), 15),
+    'ru_math': ('ru', from_forms(RU_MATH_FORMS, numbers), 1400),
+    'ru_equation': ('ru', from_forms(RU_EQUATION_FORMS, numbers), 400),
+    'ru_definition': ('ru', definition, 550),
+    'ru_sport': ('ru', pick(RU_SPORT), 5),
+    'ru_article': ('ru', from_forms(RU_ARTICLE_FORMS, lambda rng: {'t': rng.choice(RU_ARTICLE_TOPICS)}), 70),
+    'ru_logic': ('ru', pick(RU_LOGIC), 6),
+    'ru_code': ('ru', pick(RU_CODE), 12),
+    'ru_other': ('ru', pick(RU_OTHER), 25),
+    'en_greeting': ('en', pick(EN_GREETINGS), 6),
+    'en_math': ('en', from_forms(EN_MATH_FORMS, numbers), 400),
+    'en_other': ('en', pick(EN_OTHER), 14),
+    'ru_typo': ('ru', typo, 120),
+}
+
+
+def generate(seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    rows = []
+    for category, (lang, make, target) in GENERATORS.items():
+        seen = set()
+        attempts = 0
+        while len(seen) < target and attempts < target * 50:
+            attempts += 1
+            seen.add(make(rng))
+        queries = sorted(seen)
+        rng.shuffle(queries)
+        # Zipf-like popularity inside a category, normalised to its share
+        raw = [1.0 / (rank + 1) ** 0.8 for rank in range(len(queries))]
+        total = sum(raw)
+        for query, w in zip(queries, raw):
+            rows.append({'q': query, 'lang': lang, 'category': category,
+                         'weight': round(SHARES[category] * w / total, 8)})
+    rows += [{'q': query, 'lang': 'ru', 'category': 'ru_equation', 'weight': REGRESSION_WEIGHT}
+             for query in RU_EQUATION_REGRESSIONS]
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=20251019)
+    parser.add_argument('--out', type=Path, default=OUT)
+    args = parser.parse_args()
+    rows = generate(args.seed)
+    with args.out.open('w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+    print(f'wrote {len(rows)} queries to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+'''
+End-to-end benchmark of the reconcile-payments job against fake YooKassa.
+
+Seeds the fake with --payments succeeded payments spread over the last
+--hours, records all but --lost of them as credited in payments (the
+webhook got through), runs the handler, checks that exactly the lost ones
+were credited, and runs it again to check that nothing is credited twice.
+
+    DATABASE_URL=postgresql://... python tools/bench_reconcile.py --payments 300000 --lost 0.05
+
+Writes to the database given: users named bench_reconcile_* are created
+once and reset, and their payments deleted, on every run. Needs migrations V0001 and
+V0005 applied.
+'''
+import argparse
+import datetime
+import io
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+from functions import Context, load_handler, make_event
+
+USER_PREFIX = 'bench_reconcile_'
+TARIFFS = (('starter', '199.00'), ('advanced', '299.00'), ('unlimited', '749.00'))
+
+
+def seed_users(conn, count: int) -> list:
+    '''count bench users with nothing credited; reused between runs (deleting users is slow).'''
+    with conn, conn.cursor() as cur:
+        cur.execute('DELETE FROM payments WHERE user_id IN (SELECT id FROM users WHERE username LIKE %s)',
+                    (USER_PREFIX + '%',))
+        cur.execute('''
+            INSERT INTO users (username, password_hash)
+            SELECT %s || n, 'x' FROM generate_series(1, %s) n
+            ON CONFLICT (username) DO NOTHING
+        ''', (USER_PREFIX, count))
+        cur.execute('''
+            UPDATE users SET bonus_requests = 0, subscription_type = NULL, subscription_requests = 0
+            WHERE username LIKE %s
+            RETURNING id
+        ''', (USER_PREFIX + '%',))
+        return sorted(row[0] for row in cur.fetchall())[:count]
+
+
+def seed_payments(store, users: list, count: int, hours: float, rng: random.Random) -> list:
+    '''Adds succeeded payments, oldest first; returns (id, user, tariff, amount, created_at) tuples.'''
+    now = datetime.datetime.now(datetime.timezone.utc)
+    start = now - datetime.timedelta(hours=hours)
+    step = datetime.timedelta(hours=hours) / max(count, 1)
+    seeded = []
+    for n in range(count):
+        created = (start + step * n).strftime('%Y-%m-%dT%H:%M:%S.') + f'{(start + step * n).microsecond // 1000:03d}Z'
+        user = rng.choice(users)
+        tariff, amount = rng.choice(TARIFFS)
+        payment_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        store.add({'id': payment_id, 'status': 'succeeded', 'paid': True,
+                   'amount': {'value': amount, 'currency': 'RUB'}, 'description': f'NeuroPulse {tariff} tariff',
+                   'metadata': {'userId': str(user), 'tariffType': tariff, 'country': 'ru'},
+                   'created_at': created, 'captured_at': created, 'test': True})
+        seeded.append((payment_id, user, tariff, amount, created))
+    return seeded
+
+
+def record_credited(conn, payments: list) -> None:
+    buffer = io.StringIO()
+    for payment_id, user, tariff, amount, created in payments:
+        buffer.write(f'{user}\t{amount}\tRUB\tyookassa\tsucceeded\t{payment_id}\t{tariff}\t{created}\t{created}\n')
+    buffer.seek(0)
+    with conn, conn.cursor() as cur:
+        cur.copy_expert('COPY payments (user_id, amount, currency, payment_method, status, provider_payment_id, '
+                        'tariff_type, paid_at, credited_at) FROM STDIN', buffer)
+
+
+def run(handler, hours: float) -> dict:
+    since = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours + 1)).isoformat()
+    started = time.perf_counter()
+    response = handler(make_event('POST', {'since': since}, headers={'X-Admin-Token': 'bench'}), Context('bench'))
+    elapsed = time.perf_counter() - started
+    if response['statusCode'] != 200:
+        raise SystemExit(f'reconcile failed: {response["statusCode"]} {response["body"]}')
+    stats = json.loads(response['body'])
+    stats['seconds'] = round(elapsed, 2)
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--payments', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--lost', type=float, default=0.05, help='share of payments whose webhook was lost')
+    parser.add_argument('--hours', type=float, default=48)
+    parser.add_argument('--latency', default='0', help='fake YooKassa latency spec (see fake_upstreams)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if not os.environ.get('DATABASE_URL'):
+        print('DATABASE_URL is required', file=sys.stderr)
+        return 2
+    import psycopg2
+    import fake_upstreams
+
+    server, url = fake_upstreams.start(config=fake_upstreams.FakeConfig(latency=args.latency))
+    os.environ.update(fake_upstreams.fake_environment(url))
+    os.environ['RECONCILE_ADMIN_TOKEN'] = 'bench'
+    rng = random.Random(args.seed)
+
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    started = time.perf_counter()
+    users = seed_users(conn, args.users)
+    payments = seed_payments(server.payments, users, args.payments, args.hours, rng)
+    lost = {p[0] for p in rng.sample(payments, int(len(payments) * args.lost))}
+    record_credited(conn, [p for p in payments if p[0] not in lost])
+    print(f'seeded {len(payments)} payments for {len(users)} users, {len(lost)} lost webhooks '
+          f'in {time.perf_counter() - started:.1f}s')
+
+    handler = load_handler('reconcile-payments')
+    first = run(handler, args.hours)
+    print('first run: ', {k: v for k, v in first.items() if k != 'skippedIds'})
+    second = run(handler, args.hours)
+    print('second run:', {k: v for k, v in second.items() if k != 'skippedIds'})
+
+    expected = sum(20 if p[2] == 'starter' else 40 if p[2] == 'advanced' else 0 for p in payments if p[0] in lost)
+    with conn, conn.cursor() as cur:
+        cur.execute('SELECT COALESCE(SUM(bonus_requests), 0) FROM users WHERE username LIKE %s', (USER_PREFIX + '%',))
+        bonus = cur.fetchone()[0]
+        cur.execute('SELECT COUNT(*) FROM payments p JOIN users u ON u.id = p.user_id '
+                    'WHERE u.username LIKE %s AND p.credited_at IS NOT NULL', (USER_PREFIX + '%',))
+        credited_rows = cur.fetchone()[0]
+    conn.close()
+
+    ok = (first['credited'] == len(lost) and second['credited'] == 0 and bonus == expected
+          and credited_rows == len(payments))
+    print(f'bonus_requests added {bonus} (expected {expected}), credited payments rows {credited_rows}')
+    print('ok' if ok else 'MISMATCH')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
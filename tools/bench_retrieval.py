@@ -0,0 +1,126 @@
+'''
+BM25 topic retrieval at scale: build time, memory and query latency.
+
+simple-ai has ten topic answers today; this builds the same BM25Index over
+a synthetic knowledge base of --topics documents to show how it scales.
+Body words follow a Zipf distribution over a --vocab word vocabulary seeded
+with the stems of the real answers, and every topic gets a unique title
+word plus a couple of shared ones. Each query names one topic and adds
+body words; noise queries are random vocabulary. The report gives the hit
+rate for the intended topic and the score gap a threshold has to fall in.
+
+    python tools/bench_retrieval.py
+    python tools/bench_retrieval.py --topics 10000 --queries 5000
+'''
+import argparse
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from functions import load_module
+
+
+def percentile(values: List[float], pct: float) -> float:
+    return float(np.percentile(np.asarray(values), pct))
+
+
+def synthetic_corpus(real_stems: List[str], topics: int, vocab: int, body_words: Tuple[int, int],
+                     rng: np.random.Generator) -> Tuple[List[Tuple[List[str], List[str]]], List[str]]:
+    words = list(dict.fromkeys(real_stems))
+    words += [f'w{i}' for i in range(max(0, vocab - len(words)))]
+    ranks = np.arange(1, len(words) + 1)
+    popularity = 1.0 / ranks ** 1.07
+    popularity /= popularity.sum()
+    shared_titles = [f'cat{i}' for i in range(max(1, topics // 20))]
+    documents = []
+    for topic in range(topics):
+        name = f'topic{topic}'
+        title = [name] + [shared_titles[i] for i in rng.integers(0, len(shared_titles), 2)]
+        length = int(rng.integers(*body_words))
+        body = [words[i] for i in rng.choice(len(words), size=length, p=popularity)]
+        body += [name] * int(rng.integers(1, 4))
+        documents.append((title, body))
+    return documents, words
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--topics', type=int, default=10000)
+    parser.add_argument('--vocab', type=int, default=50000)
+    parser.add_argument('--body-min', type=int, default=150)
+    parser.add_argument('--body-max', type=int, default=600)
+    parser.add_argument('--queries', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    module = load_module('simple-ai')
+    stemmer = sys.modules['stemmer']
+    ru = module.pack('ru')
+    module.topic_retrieval(ru)
+    retrieval = sys.modules['retrieval']
+    table = module.answers(ru)
+    real_stems = [s for text in table.ALL_TOPICS.values() for s in stemmer.content_stems(text.lower())]
+
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    documents, words = synthetic_corpus(real_stems, args.topics, args.vocab, (args.body_min, args.body_max), rng)
+    generated = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = retrieval.BM25Index(documents)
+    built = time.perf_counter() - started
+    nbytes = sum(f.offsets.nbytes + f.docs.nbytes + f.weights.nbytes for f in index.fields)
+    postings = sum(len(f.docs) for f in index.fields)
+
+    queries = []
+    for _ in range(args.queries):
+        target = int(rng.integers(0, args.topics))
+        extra = [words[i] for i in rng.integers(0, min(len(words), 2000), int(rng.integers(1, 5)))]
+        queries.append((target, {f'topic{target}', *extra}))
+    noise = [{words[i] for i in rng.integers(0, len(words), int(rng.integers(2, 6)))} for _ in range(args.queries)]
+
+    for _, stems in queries[:200]:
+        index.best(stems)
+    latencies, hits, topic_scores = [], 0, []
+    for target, stems in queries:
+        start = time.perf_counter_ns()
+        found = index.best(stems, 0.0)
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+        hits += found is not None and found[0] == target
+        topic_scores.append(found[1] if found else 0.0)
+    noise_latencies, noise_scores = [], []
+    for stems in noise:
+        start = time.perf_counter_ns()
+        found = index.best(stems, 0.0)
+        noise_latencies.append((time.perf_counter_ns() - start) / 1000)
+        noise_scores.append(found[1] if found else 0.0)
+
+    live_keys, live_index = module.topic_retrieval(ru)
+    live = [stemmer.content_stems(q) for q in ('что такое гравитация', 'история психологии',
+                                               'депрессия и счастье', 'когда началась вторая мировая война')]
+    live_latencies = []
+    for _ in range(2000):
+        for stems in live:
+            start = time.perf_counter_ns()
+            live_index.best(set(stems))
+            live_latencies.append((time.perf_counter_ns() - start) / 1000)
+
+    print(f'topics {args.topics}, vocabulary {len(words)}, terms {len(index.terms)}, postings {postings}')
+    print(f'corpus generated in {generated:.1f}s, index built in {built * 1000:.0f} ms, '
+          f'{nbytes / 2 ** 20:.1f} MiB of postings')
+    print(f'\n{"query set":<28}{"p50 us":>10}{"p99 us":>10}{"max us":>10}')
+    for label, values in (('topic queries', latencies), ('noise queries', noise_latencies),
+                          (f'live index ({len(live_keys)} topics)', live_latencies)):
+        print(f'{label:<28}{percentile(values, 50):>10.1f}{percentile(values, 99):>10.1f}{max(values):>10.1f}')
+    print(f'\nintended topic returned: {hits / len(queries):.1%}')
+    print(f'best score, topic queries: p1 {percentile(topic_scores, 1):.2f}  p50 {percentile(topic_scores, 50):.2f}')
+    print(f'best score, noise queries: p50 {percentile(noise_scores, 50):.2f}  p99 {percentile(noise_scores, 99):.2f}')
+    print(f'(idf grows with the corpus, so BM25_MIN_SCORE={retrieval.MIN_SCORE:g} is calibrated for the live '
+          f'answers; pick one between the two rows above for a corpus like this)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
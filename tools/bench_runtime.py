@@ -0,0 +1,71 @@
+'''
+Microbenchmark for the trivial request paths (OPTIONS, 405, 400).
+
+Compares the current simple-ai handler against an inline copy of the
+pre-runtime implementation, which rebuilt header dicts and re-encoded the
+constant bodies on every call.
+
+    python tools/bench_runtime.py [--number 200000]
+'''
+import argparse
+import json
+import timeit
+
+from functions import Context, load_handler, make_event
+
+
+def legacy_handler(event, context):
+    method = event.get('httpMethod', 'POST')
+    if method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': ''
+        }
+    if method != 'POST':
+        return {
+            'statusCode': 405,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': 'Method not allowed'})
+        }
+    body_data = json.loads(event.get('body', '{}'))
+    if not body_data.get('message', '').strip():
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': 'Message is required'})
+        }
+    raise AssertionError('benchmark only covers trivial paths')
+
+
+CASES = {
+    'OPTIONS': make_event('OPTIONS'),
+    '405': make_event('GET'),
+    '400 empty message': make_event('POST', {'message': '', 'userId': 1, 'language': 'ru'}),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args()
+
+    current = load_handler('simple-ai')
+    context = Context('bench')
+    print(f'{"path":<20}{"legacy ns":>12}{"runtime ns":>12}{"speedup":>10}')
+    for label, event in CASES.items():
+        assert legacy_handler(event, context)['statusCode'] == current(event, context)['statusCode']
+        old = min(timeit.repeat(lambda: legacy_handler(event, context), number=args.number, repeat=3))
+        new = min(timeit.repeat(lambda: current(event, context), number=args.number, repeat=3))
+        old_ns = old / args.number * 1e9
+        new_ns = new / args.number * 1e9
+        print(f'{label:<20}{old_ns:>12.0f}{new_ns:>12.0f}{old_ns / new_ns:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
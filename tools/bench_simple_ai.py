@@ -0,0 +1,243 @@
+'''
+Benchmark suite for simple-ai routing and answer rendering.
+
+Replays a weighted sample of tools/bench_data/simple_ai_corpus.jsonl through
+process_smart_query and the routing helpers, and reports p50/p99 latency and
+peak allocation per branch. Every run first checks answers against the
+golden hashes, so an optimized router has to produce byte-identical output.
+
+    python tools/bench_simple_ai.py                       # golden check + report
+    python tools/bench_simple_ai.py --save base.json      # record a baseline
+    python tools/bench_simple_ai.py --compare base.json   # exit 1 on regression
+    python tools/bench_simple_ai.py --update-golden       # after an intended change
+'''
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from functions import load_module
+
+DATA = Path(__file__).resolve().parent / 'bench_data'
+CORPUS = DATA / 'simple_ai_corpus.jsonl'
+GOLDEN = DATA / 'simple_ai_golden.json'
+
+# functions that produce the final answer; the first one entered names the branch
+LEAVES = [
+    'solve_math_expression', 'solve_equation', 'explain_sport_detailed', 'explain_photosynthesis',
+    'write_article', 'solve_logic_problem', 'explain_topic', 'help_with_code', 'smart_universal_answer',
+]
+
+
+def load_corpus() -> List[Dict[str, Any]]:
+    with CORPUS.open(encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def answer_hash(answer: str) -> str:
+    return hashlib.sha256(answer.encode('utf-8')).hexdigest()[:16]
+
+
+def golden_key(row: Dict[str, Any]) -> str:
+    return f"{row['lang']}\t{row['q']}"
+
+
+def classify(module: Any, corpus: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, str]]:
+    '''Runs the corpus once with the leaf functions wrapped to see which branch answers.'''
+    entered: List[str] = []
+    originals = {name: getattr(module, name) for name in LEAVES if hasattr(module, name)}
+
+    def wrap(name: str, fn: Callable) -> Callable:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            entered.append(name)
+            return fn(*args, **kwargs)
+        return wrapper
+
+    for name, fn in originals.items():
+        setattr(module, name, wrap(name, fn))
+    branches, hashes = [], {}
+    try:
+        for row in corpus:
+            entered.clear()
+            answer = module.process_smart_query(row['q'].strip(), row['lang'])
+            branches.append(f"{row['lang']}:{entered[0] if entered else 'inline'}")
+            hashes[golden_key(row)] = answer_hash(answer)
+    finally:
+        for name, fn in originals.items():
+            setattr(module, name, fn)
+    return branches, hashes
+
+
+def check_golden(hashes: Dict[str, str]) -> List[str]:
+    expected = json.loads(GOLDEN.read_text(encoding='utf-8'))
+    return [key for key, value in expected.items() if hashes.get(key) != value]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def sample_workload(corpus: List[Dict[str, Any]], size: int, seed: int) -> List[int]:
+    rng = random.Random(seed)
+    return rng.choices(range(len(corpus)), weights=[row['weight'] for row in corpus], k=size)
+
+
+def time_calls(calls: List[Tuple[str, Callable[[], Any]]]) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {}
+    clock = time.perf_counter_ns
+    for label, call in calls:
+        start = clock()
+        call()
+        samples.setdefault(label, []).append((clock() - start) / 1000.0)
+    return samples
+
+
+def measure_allocations(calls: List[Tuple[str, Callable[[], Any]]]) -> Dict[str, float]:
+    peaks: Dict[str, List[int]] = {}
+    tracemalloc.start()
+    try:
+        for label, call in calls:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call()
+            peaks.setdefault(label, []).append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return {label: sum(values) / len(values) for label, values in peaks.items()}
+
+
+def uncached_solve(query_lower: str) -> Any:
+    algebra = sys.modules['algebra']
+    return algebra.solve_text.__wrapped__(algebra.extract(query_lower))
+
+
+def build_calls(module: Any, corpus: List[Dict[str, Any]], branches: List[str],
+                workload: List[int]) -> Dict[str, List[Tuple[str, Callable[[], Any]]]]:
+    '''End-to-end calls per branch plus direct calls of the routing helpers.'''
+    suites: Dict[str, List[Tuple[str, Callable[[], Any]]]] = {'process_smart_query': [], 'helpers': []}
+    direct = {name: getattr(module, name) for name in
+              ('solve_math_expression', 'solve_equation', 'explain_topic', 'smart_universal_answer')}
+    for index in workload:
+        row = corpus[index]
+        query, lang = row['q'].strip(), row['lang']
+        branch = branches[index]
+        suites['process_smart_query'].append(
+            (branch, lambda q=query, l=lang: module.process_smart_query(q, l)))
+        language_pack = module.pack(lang)
+        suites['helpers'].append(('has_math_expression', lambda q=query: module.has_math_expression(q)))
+        leaf = branch.split(':', 1)[1]
+        if leaf in ('explain_topic', 'smart_universal_answer'):
+            suites['helpers'].append(('topic_index.lookup', lambda q=query, p=language_pack:
+                                      module.topic_index(p).lookup(q.lower())))
+        if leaf == 'solve_equation':
+            # what a parse-cache miss costs; solve_equation itself answers repeats from the cache
+            suites['helpers'].append(('algebra.solve_text (uncached)', lambda q=query: uncached_solve(q.lower())))
+        if leaf in direct:
+            suites['helpers'].append((leaf, lambda q=query, p=language_pack, f=direct[leaf]: f(p, q, q.lower())))
+    return suites
+
+
+def summarize(samples: Dict[str, List[float]], allocs: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    result = {}
+    for label, values in samples.items():
+        values.sort()
+        result[label] = {
+            'count': len(values),
+            'p50_us': round(percentile(values, 50), 3),
+            'p99_us': round(percentile(values, 99), 3),
+            'alloc_kib': round(allocs.get(label, 0.0) / 1024, 3),
+        }
+    return result
+
+
+def print_report(title: str, stats: Dict[str, Dict[str, float]]) -> None:
+    print(f'\n{title}')
+    print(f'{"branch":<36}{"calls":>8}{"p50 us":>10}{"p99 us":>10}{"peak KiB":>10}')
+    for label in sorted(stats, key=lambda k: -stats[k]['count']):
+        s = stats[label]
+        print(f'{label:<36}{s["count"]:>8}{s["p50_us"]:>10.1f}{s["p99_us"]:>10.1f}{s["alloc_kib"]:>10.2f}')
+
+
+def compare(report: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float,
+            p99_tolerance: float, min_calls: int) -> List[str]:
+    failures = []
+    for suite, stats in report.items():
+        for label, s in stats.items():
+            base = baseline.get(suite, {}).get(label)
+            if not base or s['count'] < min_calls:
+                continue
+            checks = [('p50_us', tolerance), ('p99_us', p99_tolerance), ('alloc_kib', tolerance)]
+            for metric, tol in checks:
+                if base[metric] > 0 and s[metric] > base[metric] * (1 + tol):
+                    failures.append(f'{suite}/{label} {metric}: {base[metric]} -> {s[metric]}')
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000, help='weighted workload size')
+    parser.add_argument('--alloc-calls', type=int, default=3000, help='calls traced for allocations')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', type=Path, help='write the report as a baseline')
+    parser.add_argument('--compare', type=Path, help='baseline to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='allowed p50/alloc regression')
+    parser.add_argument('--p99-tolerance', type=float, default=0.50, help='allowed p99 regression')
+    parser.add_argument('--min-calls', type=int, default=50, help='ignore branches with fewer samples')
+    parser.add_argument('--update-golden', action='store_true')
+    args = parser.parse_args()
+
+    module = load_module('simple-ai')
+    corpus = load_corpus()
+    branches, hashes = classify(module, corpus)
+
+    if args.update_golden:
+        GOLDEN.write_text(json.dumps(hashes, ensure_ascii=False, indent=0, sort_keys=True) + '\n',
+                          encoding='utf-8')
+        print(f'golden: wrote {len(hashes)} answers to {GOLDEN}')
+        return 0
+
+    mismatched = check_golden(hashes)
+    if mismatched:
+        print(f'golden: {len(mismatched)} answers changed, e.g.:', file=sys.stderr)
+        for key in mismatched[:10]:
+            print('   ', key.replace('\t', ' | '), file=sys.stderr)
+        return 2
+    print(f'golden: {len(hashes)} answers identical')
+
+    workload = sample_workload(corpus, args.calls, args.seed)
+    suites = build_calls(module, corpus, branches, workload)
+    for _, call in suites['process_smart_query'][:500]:
+        call()
+
+    report = {}
+    for suite, calls in suites.items():
+        allocs = measure_allocations(calls[:args.alloc_calls])
+        report[suite] = summarize(time_calls(calls), allocs)
+        print_report(suite, report[suite])
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        print(f'\nbaseline saved to {args.save}')
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        failures = compare(report, baseline, args.tolerance, args.p99_tolerance, args.min_calls)
+        if failures:
+            print('\nregressions:', file=sys.stderr)
+            for line in failures:
+                print('   ', line, file=sys.stderr)
+            return 1
+        print('\nno regressions against baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
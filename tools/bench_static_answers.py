@@ -0,0 +1,113 @@
+'''
+Bytes and CPU per static simple-ai answer: legacy encoding vs pre-rendered bodies.
+
+For every StaticAnswer (the language packs and their content modules) the
+response body is produced three ways:
+
+    legacy      json.dumps(..., default ensure_ascii)  - \\uXXXX escapes, as shipped before
+    dumps       runtime.dumps(...) on every request   - compact UTF-8
+    prerender   StaticAnswer.response_body()          - encoded once, reused
+
+and the full handler is timed on queries that route to static answers.
+
+    python tools/bench_static_answers.py
+    python tools/bench_static_answers.py --repeat 20000
+'''
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict
+
+from functions import Context, load_module, make_event
+
+
+def static_answers(module: Any) -> Dict[str, str]:
+    packs = [module.pack(lang) for lang in module.LANGUAGES]
+    namespaces = [(p.__name__, vars(p)) for p in packs]
+    namespaces += [(p.CONTENT, vars(module.answers(p))) for p in packs if p.CONTENT]
+    StaticAnswer = sys.modules['static_answer'].StaticAnswer
+    found: Dict[str, str] = {}
+    for source, namespace in namespaces:
+        for name, value in namespace.items():
+            if isinstance(value, StaticAnswer):
+                found[f'{source}.{name}'] = value
+            elif isinstance(value, dict):
+                for key, item in value.items():
+                    if isinstance(item, StaticAnswer):
+                        found[f'{source}.{name}[{key}]'] = item
+    return found
+
+
+def per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        runs.append((time.perf_counter() - start) / repeat * 1e6)
+    return statistics.median(runs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5000, help='calls per timing run')
+    args = parser.parse_args()
+
+    module = load_module('simple-ai')
+    runtime = sys.modules['runtime']
+    answers = static_answers(module)
+
+    print(f'{"answer":<34}{"legacy B":>10}{"utf-8 B":>9}{"saved":>7}'
+          f'{"legacy us":>11}{"dumps us":>10}{"prerender us":>14}')
+    totals = {'legacy_b': 0, 'utf8_b': 0, 'legacy_us': 0.0, 'dumps_us': 0.0, 'prerender_us': 0.0}
+    for name, answer in answers.items():
+        data = {'response': str(answer), 'success': True}
+        legacy = json.dumps(data)
+        body = answer.response_body()
+        if json.loads(body) != json.loads(legacy) or body != runtime.dumps(data):
+            print(f'{name}: pre-rendered body differs from the encoded one', file=sys.stderr)
+            return 1
+        row = {
+            'legacy_b': len(legacy.encode('utf-8')),
+            'utf8_b': len(body.encode('utf-8')),
+            'legacy_us': per_call_us(lambda: json.dumps(data), args.repeat),
+            'dumps_us': per_call_us(lambda: runtime.dumps(data), args.repeat),
+            'prerender_us': per_call_us(answer.response_body, args.repeat),
+        }
+        for key, value in row.items():
+            totals[key] += value
+        print(f'{name[:33]:<34}{row["legacy_b"]:>10}{row["utf8_b"]:>9}'
+              f'{1 - row["utf8_b"] / row["legacy_b"]:>7.0%}{row["legacy_us"]:>11.2f}'
+              f'{row["dumps_us"]:>10.2f}{row["prerender_us"]:>14.3f}')
+    print(f'{"total":<34}{totals["legacy_b"]:>10}{totals["utf8_b"]:>9}'
+          f'{1 - totals["utf8_b"] / totals["legacy_b"]:>7.0%}{totals["legacy_us"]:>11.2f}'
+          f'{totals["dumps_us"]:>10.2f}{totals["prerender_us"]:>14.3f}')
+
+    queries = [('ru', 'привет'), ('ru', 'что такое фотосинтез'), ('ru', 'история россии'),
+               ('ru', 'что такое гравитация'), ('ru', 'напиши статью про спорт'), ('en', 'hello')]
+    handler = module.handler.__wrapped__
+    context = Context(function_name='simple-ai')
+    print(f'\n{"handler, static answer":<34}{"body B":>10}{"prerender us":>14}{"re-encode us":>14}')
+    for lang, query in queries:
+        event = make_event('POST', json.dumps({'message': query, 'language': lang}, ensure_ascii=False))
+        response = handler(event, context)
+        answer = module.process_smart_query(query, lang)
+        if not isinstance(answer, sys.modules['static_answer'].StaticAnswer):
+            print(f'{query!r} does not route to a static answer', file=sys.stderr)
+            return 1
+
+        def reencoded(event: Dict[str, Any] = event, lang: str = lang) -> Dict[str, Any]:
+            body = runtime.parse_json_body(event)
+            answer = module.process_smart_query(str(body.get('message') or '').strip(), lang)
+            return runtime.json_response(200, {'response': str(answer), 'success': True})
+
+        print(f'{lang + ": " + query:<34}{len(response["body"].encode("utf-8")):>10}'
+              f'{per_call_us(lambda: handler(event, context), args.repeat):>14.2f}'
+              f'{per_call_us(reencoded, args.repeat):>14.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
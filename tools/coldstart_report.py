@@ -0,0 +1,184 @@
+'''
+Cold-start report: import time and resident memory per function.
+
+Every measurement runs in a fresh interpreter inside the function directory
+(the way the platform starts it) under `-X importtime`:
+
+    import index            -> import_ms, rss after import, heaviest modules
+    OPTIONS preflight       -> options_ms
+    first tests.json call   -> first_ms, modules imported lazily, rss after
+
+Bytecode caching is controlled explicitly: "source" compiles every module
+from .py (a fresh read-only deploy), "cached" reuses .pyc files from a
+private cache. Numbers are medians over --runs. Upstreams are served by
+tools/fake_upstreams.py so the first real request stays offline.
+
+    python tools/coldstart_report.py
+    python tools/coldstart_report.py --functions ai-chat --top 15
+    python tools/coldstart_report.py --history tools/bench_data/coldstart_history.jsonl
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import fake_upstreams
+from functions import BACKEND, FUNCTIONS, load_tests
+
+MARK_IMPORT = '--coldstart-import--'
+MARK_REQUEST = '--coldstart-request--'
+
+PROBE = '''
+import os, sys, time
+
+PAGE_KB = os.sysconf('SC_PAGE_SIZE') // 1024
+
+def rss_kb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGE_KB
+
+class Context:
+    request_id = 'coldstart-probe'
+    function_name = FUNCTION
+
+result = {'rss_start_kb': rss_kb()}
+sys.stderr.write(MARK_IMPORT + '\\n')
+started = time.perf_counter()
+import index
+result['import_ms'] = (time.perf_counter() - started) * 1000
+result['rss_import_kb'] = rss_kb()
+
+started = time.perf_counter()
+index.handler({'httpMethod': 'OPTIONS', 'headers': {}, 'body': ''}, Context())
+result['options_ms'] = (time.perf_counter() - started) * 1000
+
+sys.stderr.write(MARK_REQUEST + '\\n')
+if TEST is not None:
+    body = TEST.get('body')
+    event = {'httpMethod': TEST['method'], 'headers': {}, 'queryStringParameters': {},
+             'body': json.dumps(body) if body is not None else None, 'isBase64Encoded': False}
+    started = time.perf_counter()
+    index.handler(event, Context())
+    result['first_ms'] = (time.perf_counter() - started) * 1000
+result['rss_first_kb'] = rss_kb()
+print(json.dumps(result))
+'''
+
+
+def parse_importtime(stderr: str) -> Tuple[List[Tuple[int, int, str]], List[Tuple[int, int, str]]]:
+    '''Splits -X importtime output into modules loaded by `import index` and by the first request.'''
+    sections: Dict[str, List[Tuple[int, int, str]]] = {'startup': [], 'import': [], 'request': []}
+    current = 'startup'
+    for line in stderr.splitlines():
+        if line == MARK_IMPORT:
+            current = 'import'
+            continue
+        if line == MARK_REQUEST:
+            current = 'request'
+            continue
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        sections[current].append((int(self_us), int(cumulative_us), name.strip()))
+    return sections['import'], sections['request']
+
+
+def probe(function: str, mode: str, cache_dir: str, env: Dict[str, str]) -> Tuple[Dict[str, Any], str]:
+    tests = [t for t in load_tests(function) if t.get('method') != 'OPTIONS']
+    test = tests[0] if tests else None
+    code = (f'import json\nFUNCTION = {function!r}\nTEST = json.loads({json.dumps(test)!r})\n'
+            f'MARK_IMPORT = {MARK_IMPORT!r}\nMARK_REQUEST = {MARK_REQUEST!r}\n' + PROBE)
+    run_env = dict(env)
+    if mode == 'source':
+        run_env['PYTHONDONTWRITEBYTECODE'] = '1'
+        run_env.pop('PYTHONPYCACHEPREFIX', None)
+    else:
+        run_env.pop('PYTHONDONTWRITEBYTECODE', None)
+        run_env['PYTHONPYCACHEPREFIX'] = cache_dir
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=BACKEND / function,
+                          env=run_env, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f'{function}: probe failed\n{proc.stderr[-2000:]}')
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def measure(function: str, mode: str, runs: int, cache_dir: str, env: Dict[str, str]) -> Dict[str, Any]:
+    if mode == 'cached':
+        probe(function, mode, cache_dir, env)
+    samples, stderr = [], ''
+    for _ in range(runs):
+        result, stderr = probe(function, mode, cache_dir, env)
+        samples.append(result)
+    summary = {key: round(statistics.median(s[key] for s in samples), 3)
+               for key in samples[0]}
+    imported, lazy = parse_importtime(stderr)
+    summary['modules_at_import'] = len(imported)
+    summary['modules_on_first_request'] = len(lazy)
+    summary['heaviest_imports'] = sorted(imported, key=lambda m: -m[0])
+    summary['lazy_imports_ms'] = round(sum(m[0] for m in lazy) / 1000, 3)
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND, capture_output=True,
+                              text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', default=','.join(FUNCTIONS))
+    parser.add_argument('--modes', default='source,cached')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5, help='heaviest modules to list per function')
+    parser.add_argument('--json', type=Path, help='write the full report here')
+    parser.add_argument('--history', type=Path, help='append a summary line to this JSONL file')
+    args = parser.parse_args()
+
+    _, url = fake_upstreams.start()
+    env = {**os.environ, **fake_upstreams.fake_environment(url), 'TIMING_SAMPLE_RATE': '0'}
+    report: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix='coldstart-pyc-') as cache_dir:
+        for function in [n for n in args.functions.split(',') if n]:
+            report[function] = {mode: measure(function, mode, args.runs, cache_dir, env)
+                                for mode in args.modes.split(',')}
+
+    print(f'{"function":<18}{"mode":<8}{"import ms":>10}{"rss MiB":>9}{"OPTIONS ms":>11}'
+          f'{"1st req ms":>11}{"lazy ms":>9}{"rss 1st MiB":>12}')
+    for function, modes in report.items():
+        for mode, r in modes.items():
+            print(f'{function:<18}{mode:<8}{r["import_ms"]:>10.1f}{r["rss_import_kb"] / 1024:>9.1f}'
+                  f'{r["options_ms"]:>11.2f}{r.get("first_ms", 0):>11.1f}{r["lazy_imports_ms"]:>9.1f}'
+                  f'{r["rss_first_kb"] / 1024:>12.1f}')
+    for function, modes in report.items():
+        r = next(iter(modes.values()))
+        print(f'\n{function}: heaviest modules imported by index (self ms, cumulative ms)')
+        for self_us, cumulative_us, name in r['heaviest_imports'][:args.top]:
+            print(f'    {self_us / 1000:>7.2f} {cumulative_us / 1000:>8.2f}  {name}')
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    if args.history:
+        line = {
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'functions': {fn: {mode: {k: r[k] for k in ('import_ms', 'rss_import_kb', 'options_ms',
+                                                         'lazy_imports_ms')}
+                               for mode, r in modes.items()}
+                          for fn, modes in report.items()},
+        }
+        with args.history.open('a', encoding='utf-8') as f:
+            f.write(json.dumps(line) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,570 @@
+'''
+Local stand-ins for the third-party APIs the functions call.
+
+    python tools/fake_upstreams.py --port 8900 --latency 300
+    python tools/fake_upstreams.py --latency lognormal:250:0.5 --token-ms 10 --seed 7
+    python tools/fake_upstreams.py --error-rate 0.02 --rate-limit-rate 0.05 --rpm 600
+    python tools/fake_upstreams.py --record upstreams.jsonl --proxy-openai https://api.openai.com/v1
+    python tools/fake_upstreams.py --replay upstreams.jsonl
+
+Serves
+
+    POST /v1/chat/completions        plain and "stream": true (SSE chunks, then [DONE]); "model"
+                                     in the answer is the dated snapshot, as upstream
+    POST /v3/payments                a repeated Idempotence-Key returns the same payment
+    GET  /v3/payments/<id>
+    GET  /v3/payments?limit=&cursor=&status=&created_at.gte=&created_at.lt=   newest first
+
+Point the functions at it with
+
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1  OPENAI_API_KEY=fake
+    YOOKASSA_API_URL=http://127.0.0.1:8900/v3 YOOKASSA_SHOP_ID=1 YOOKASSA_SECRET_KEY=fake
+
+or call fake_environment() to get the same mapping for in-process use.
+
+Latency. Every request first waits for a draw from --latency (time to first
+byte): a number of ms, or fixed:MS, uniform:LO:HI, normal:MEAN:SD,
+lognormal:MEDIAN:SIGMA. A chat completion then takes --token-ms per
+completion token, spread over the chunks when streaming. The answer is
+--answer-tokens long unless max_tokens is smaller (finish_reason "length"),
+so a lower cap is faster here the way it is upstream.
+
+Failures. --error-rate answers 500 and --rate-limit-rate answers 429 with
+Retry-After, both in each API's own error format. --rpm / --tpm enforce a
+per-minute request / token budget for each API key the way OpenAI does
+(prompt plus max_tokens), and every chat response carries the
+x-ratelimit-* headers.
+
+All draws come from one generator seeded by --seed, so a single-threaded
+run is repeatable; with concurrency only the distributions are.
+
+Record and replay. With --record FILE, requests for a service that has a
+--proxy-* URL are forwarded to the real API and each answer is appended to
+FILE. --replay FILE answers recorded requests from the file, in recorded
+order when a request was recorded several times, still with the configured
+latency; anything else falls back to the synthetic answers (404 with
+--replay-strict). Requests are matched on method, path and JSON body;
+credentials are forwarded but never written.
+'''
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# filler for synthetic answers; one word is one token
+ANSWER_WORDS = ('the', 'answer', 'is', 'explained', 'step', 'by', 'step', 'with', 'an', 'example',
+                'ответ', 'объясняется', 'по', 'шагам', 'на', 'примере')
+# words per streamed chunk
+CHUNK_TOKENS = 4
+MAX_PAYMENTS = 1000000
+FORWARDED_HEADERS = ('Authorization', 'Content-Type', 'Idempotence-Key', 'OpenAI-Organization')
+# OpenAI answers with the dated snapshot that served an alias, not the alias that was asked for
+SNAPSHOTS = {
+    'gpt-4o-mini': 'gpt-4o-mini-2024-07-18',
+    'gpt-4o': 'gpt-4o-2024-08-06',
+    'gpt-4.1-mini': 'gpt-4.1-mini-2025-04-14',
+    'gpt-4.1-nano': 'gpt-4.1-nano-2025-04-14',
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    '''Latency spec -> function drawing milliseconds from the generator. Raises ValueError.'''
+    kind, _, rest = str(spec).partition(':')
+    args = [float(v) for v in rest.split(':')] if rest else []
+    if not rest and kind.replace('.', '', 1).isdigit():
+        kind, args = 'fixed', [float(kind)]
+    if kind == 'fixed' and len(args) == 1:
+        return lambda rng: args[0]
+    if kind == 'uniform' and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == 'normal' and len(args) == 2:
+        return lambda rng: max(0.0, rng.gauss(args[0], args[1]))
+    if kind == 'lognormal' and len(args) == 2:
+        mu = math.log(max(args[0], 1e-3))
+        return lambda rng: rng.lognormvariate(mu, args[1])
+    raise ValueError(f'bad latency spec {spec!r}: use MS, fixed:MS, uniform:LO:HI, normal:MEAN:SD '
+                     'or lognormal:MEDIAN:SIGMA')
+
+
+class FakeConfig:
+    '''What the servers do besides answering: latency, failures, limits, record/replay.'''
+
+    def __init__(self, latency: str = '0', token_ms: float = 0.0, answer_tokens: int = 60,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after_s: float = 1.0,
+                 rpm: int = 0, tpm: int = 0, seed: Optional[int] = None, payment_status: str = 'pending',
+                 record: Optional[str] = None, replay: Optional[str] = None, replay_strict: bool = False,
+                 proxy_openai: Optional[str] = None, proxy_yookassa: Optional[str] = None):
+        self.latency = parse_latency(latency)
+        self.token_ms = token_ms
+        self.answer_tokens = answer_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_s = retry_after_s
+        self.rpm = rpm
+        self.tpm = tpm
+        self.payment_status = payment_status
+        self.record = record
+        self.replay_strict = replay_strict
+        self.proxies = {'openai': proxy_openai, 'yookassa': proxy_yookassa}
+        self.recorded: Dict[str, List[Dict[str, Any]]] = load_recording(replay) if replay else {}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self, fn: Callable[[random.Random], Any]) -> Any:
+        with self.lock:
+            return fn(self.rng)
+
+
+def load_recording(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    recorded: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recorded.setdefault(entry['key'], []).append(entry)
+    return recorded
+
+
+def request_key(method: str, path: str, raw: bytes) -> str:
+    try:
+        body = json.dumps(json.loads(raw), sort_keys=True, ensure_ascii=False) if raw else ''
+    except ValueError:
+        body = raw.decode('utf-8', 'replace')
+    return hashlib.sha256(f'{method} {path}\n{body}'.encode('utf-8')).hexdigest()[:32]
+
+
+class RateWindow:
+    '''Per-minute request and token budget with OpenAI-style x-ratelimit headers.'''
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = 0
+        self.requests = 0
+        self.tokens = 0
+        self.lock = threading.Lock()
+
+    def take(self, tokens: int) -> Tuple[bool, Dict[str, str]]:
+        now = time.time()
+        with self.lock:
+            window = int(now // 60)
+            if window != self.window:
+                self.window, self.requests, self.tokens = window, 0, 0
+            allowed = (not self.rpm or self.requests < self.rpm) and (not self.tpm or self.tokens + tokens <= self.tpm)
+            if allowed:
+                self.requests += 1
+                self.tokens += tokens
+            reset = f'{(window + 1) * 60 - now:.3f}s'
+            headers = {}
+            if self.rpm:
+                headers.update({'x-ratelimit-limit-requests': str(self.rpm),
+                                'x-ratelimit-remaining-requests': str(max(0, self.rpm - self.requests)),
+                                'x-ratelimit-reset-requests': reset})
+            if self.tpm:
+                headers.update({'x-ratelimit-limit-tokens': str(self.tpm),
+                                'x-ratelimit-remaining-tokens': str(max(0, self.tpm - self.tokens)),
+                                'x-ratelimit-reset-tokens': reset})
+        return allowed, headers
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'fake-upstreams'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    @property
+    def config(self) -> FakeConfig:
+        return self.server.config
+
+    def _read_raw(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status: int, raw: bytes, content_type: str = 'application/json',
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _send_json(self, status: int, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(data, ensure_ascii=False).encode('utf-8'), headers=headers)
+
+    def _start_stream(self, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _write_chunk(self, raw: bytes) -> None:
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(raw), raw))
+        self.wfile.flush()
+
+    def _service(self) -> Optional[str]:
+        path = urlsplit(self.path).path.rstrip('/')
+        if path.endswith('/chat/completions'):
+            return 'openai'
+        if '/payments' in path:
+            return 'yookassa'
+        return None
+
+    def _handle(self, method: str) -> None:
+        raw = self._read_raw() if method == 'POST' else b''
+        service = self._service()
+        if service is None:
+            self._send_json(404, {'error': f'unknown endpoint {self.path}'})
+            return
+        time.sleep(self.config.draw(self.config.latency) / 1000.0)
+
+        key = request_key(method, self.path, raw)
+        entries = self.config.recorded.get(key)
+        if entries:
+            self._replay(entries)
+            return
+        if self.config.replay_strict and self.config.recorded:
+            self._send_json(404, {'error': f'no recorded response for {method} {self.path}'})
+            return
+        if self.config.record and self.config.proxies.get(service):
+            self._proxy(service, method, raw, key)
+            return
+
+        failure = self.config.draw(lambda rng: rng.random())
+        if failure < self.config.error_rate:
+            self._send_error(service, 500)
+            return
+        if failure < self.config.error_rate + self.config.rate_limit_rate:
+            self._send_error(service, 429)
+            return
+
+        if service == 'openai':
+            self._chat_completion(json.loads(raw or b'{}'))
+        elif method == 'POST':
+            self._send_json(200, self.server.payments.create(json.loads(raw or b'{}'),
+                                                             self.headers.get('Idempotence-Key'),
+                                                             self.config.payment_status))
+        else:
+            self._payments_get()
+
+    def do_POST(self) -> None:
+        self._handle('POST')
+
+    def do_GET(self) -> None:
+        self._handle('GET')
+
+    def _send_error(self, service: str, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        headers = dict(headers or {})
+        if status == 429:
+            headers['Retry-After'] = f'{self.config.retry_after_s:g}'
+            headers['retry-after-ms'] = str(int(self.config.retry_after_s * 1000))
+        if service == 'openai':
+            error = {'message': 'Rate limit reached for requests' if status == 429 else 'The server had an error',
+                     'type': 'requests' if status == 429 else 'server_error',
+                     'code': 'rate_limit_exceeded' if status == 429 else None}
+            self._send_json(status, {'error': error}, headers)
+        else:
+            self._send_json(status, {'type': 'error', 'id': str(uuid.uuid4()),
+                                     'code': 'too_many_requests' if status == 429 else 'internal_server_error',
+                                     'description': 'Too many requests' if status == 429 else 'Internal error'},
+                            headers)
+
+    def _chat_completion(self, request: Dict[str, Any]) -> None:
+        prompt = ' '.join(str(m.get('content', '')) for m in request.get('messages', []))
+        prompt_tokens = max(1, len(prompt) // 4)
+        cap = request.get('max_completion_tokens') or request.get('max_tokens') or 4096
+        allowed, headers = self.server.limits(self.headers.get('Authorization') or '').take(prompt_tokens + cap)
+        if not allowed:
+            self._send_error('openai', 429, headers)
+            return
+        words = answer_words(prompt, min(cap, self.config.answer_tokens))
+        finish_reason = 'length' if self.config.answer_tokens > cap else 'stop'
+        model = request.get('model', 'gpt-4o-mini')
+        model = SNAPSHOTS.get(model, model)
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:24]}'
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': len(words),
+                 'total_tokens': prompt_tokens + len(words)}
+
+        if not request.get('stream'):
+            time.sleep(self.config.token_ms * len(words) / 1000.0)
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': ' '.join(words)},
+                    'finish_reason': finish_reason
+                }],
+                'usage': usage
+            }, headers)
+            return
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, **extra: Any) -> None:
+            data = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                    'model': model, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}], **extra}
+            self._write_chunk(b'data: ' + json.dumps(data, ensure_ascii=False).encode('utf-8') + b'\n\n')
+
+        self._start_stream(headers)
+        chunk({'role': 'assistant', 'content': ''})
+        for start in range(0, len(words), CHUNK_TOKENS):
+            part = words[start:start + CHUNK_TOKENS]
+            time.sleep(self.config.token_ms * len(part) / 1000.0)
+            chunk({'content': (' ' if start else '') + ' '.join(part)})
+        chunk({}, finish_reason)
+        if (request.get('stream_options') or {}).get('include_usage'):
+            data = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                    'model': model, 'choices': [], 'usage': usage}
+            self._write_chunk(b'data: ' + json.dumps(data).encode('utf-8') + b'\n\n')
+        self._write_chunk(b'data: [DONE]\n\n')
+        self._write_chunk(b'')
+
+    def _payments_get(self) -> None:
+        parts = urlsplit(self.path)
+        tail = parts.path.rstrip('/').rsplit('/payments', 1)[1].strip('/')
+        if tail:
+            payment = self.server.payments.get(tail)
+            if payment is None:
+                self._send_json(404, {'type': 'error', 'id': str(uuid.uuid4()), 'code': 'not_found',
+                                      'description': f'Payment {tail} not found'})
+                return
+            self._send_json(200, payment)
+            return
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        self._send_json(200, self.server.payments.page(query))
+
+    def _replay(self, entries: List[Dict[str, Any]]) -> None:
+        with self.config.lock:
+            entry = entries[0]
+            if len(entries) > 1:
+                entries.append(entries.pop(0))
+        body = entry['body'].encode('utf-8')
+        if entry.get('contentType', '').startswith('text/event-stream'):
+            self._start_stream()
+            for event in body.split(b'\n\n'):
+                if event.strip():
+                    time.sleep(self.config.token_ms * CHUNK_TOKENS / 1000.0)
+                    self._write_chunk(event + b'\n\n')
+            self._write_chunk(b'')
+            return
+        self._send(entry['status'], body, entry.get('contentType') or 'application/json', entry.get('headers'))
+
+    def _proxy(self, service: str, method: str, raw: bytes, key: str) -> None:
+        import urllib.error
+        import urllib.request
+        prefix = '/v1' if service == 'openai' else '/v3'
+        path = self.path[len(prefix):] if self.path.startswith(prefix) else self.path
+        headers = {name: self.headers[name] for name in FORWARDED_HEADERS if self.headers.get(name)}
+        request = urllib.request.Request(self.config.proxies[service].rstrip('/') + path, data=raw or None,
+                                         headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                status, content_type, body = response.status, response.headers.get('Content-Type', ''), response.read()
+                kept = {k: v for k, v in response.headers.items() if k.lower().startswith(('x-ratelimit', 'retry-after'))}
+        except urllib.error.HTTPError as e:
+            status, content_type, body = e.code, e.headers.get('Content-Type', ''), e.read()
+            kept = {k: v for k, v in e.headers.items() if k.lower().startswith(('x-ratelimit', 'retry-after'))}
+        entry = {'key': key, 'method': method, 'path': self.path, 'status': status, 'contentType': content_type,
+                 'headers': kept, 'body': body.decode('utf-8', 'replace')}
+        with self.config.lock:
+            with open(self.config.record, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._send(status, body, content_type or 'application/json', kept)
+
+
+def answer_words(prompt: str, count: int) -> List[str]:
+    '''Deterministic answer of `count` words: an echo of the prompt, then filler.'''
+    words = ['Fake', 'answer', 'to:'] + prompt[-200:].split()
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+    while len(words) < count:
+        words.append(rng.choice(ANSWER_WORDS))
+    return words[:max(1, count)]
+
+
+class PaymentStore:
+    '''Created payments, oldest first, with YooKassa's idempotence and cursor paging.
+
+    Payments are appended in created_at order, so a created_at range is a
+    slice found by bisection and a page costs O(limit), not O(payments). The
+    cursor is the absolute position to continue from (newest first).
+    '''
+
+    def __init__(self):
+        self.order: List[Dict[str, Any]] = []
+        self.created: List[str] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        # payments dropped from the front of order; positions stay absolute
+        self.evicted = 0
+        self.idempotence: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def create(self, request: Dict[str, Any], idempotence_key: Optional[str], status: str) -> Dict[str, Any]:
+        with self.lock:
+            existing = self.idempotence.get(idempotence_key or '')
+            if existing in self.by_id:
+                return self.by_id[existing]
+            payment_id = str(uuid.uuid4())
+            payment = {
+                'id': payment_id,
+                'status': status,
+                'paid': status == 'succeeded',
+                'amount': request.get('amount', {}),
+                'description': request.get('description', ''),
+                'metadata': request.get('metadata', {}),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+                'test': True,
+                'confirmation': {
+                    'type': 'redirect',
+                    'confirmation_url': f'https://yoomoney.ru/checkout/payments/v2/contract?orderId={payment_id}'
+                }
+            }
+            self._append(payment)
+            if idempotence_key:
+                self.idempotence[idempotence_key] = payment_id
+            return payment
+
+    def add(self, payment: Dict[str, Any]) -> None:
+        '''Stores a ready-made payment (bench seeding); created_at must not be older than the last one.'''
+        with self.lock:
+            self._append(payment)
+
+    def _append(self, payment: Dict[str, Any]) -> None:
+        self.order.append(payment)
+        self.created.append(payment['created_at'])
+        self.by_id[payment['id']] = payment
+        if len(self.order) > MAX_PAYMENTS:
+            drop = len(self.order) // 2
+            for old in self.order[:drop]:
+                del self.by_id[old['id']]
+            del self.order[:drop]
+            del self.created[:drop]
+            self.evicted += drop
+
+    def get(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.by_id.get(payment_id)
+
+    def page(self, query: Dict[str, str]) -> Dict[str, Any]:
+        limit = max(1, min(int(query.get('limit') or 10), 100))
+        status = query.get('status')
+        with self.lock:
+            low = bisect.bisect_left(self.created, query.get('created_at.gte', ''))
+            high = len(self.order)
+            if query.get('created_at.lt'):
+                high = bisect.bisect_left(self.created, query['created_at.lt'])
+            if query.get('cursor'):
+                high = min(high, int(query['cursor']) - self.evicted)
+            items = []
+            position = high - 1
+            while position >= low and len(items) < limit:
+                payment = self.order[position]
+                if not status or payment['status'] == status:
+                    items.append(payment)
+                position -= 1
+        page = {'type': 'list', 'items': items}
+        if position >= low:
+            page['next_cursor'] = str(position + 1 + self.evicted)
+        return page
+
+
+def start(host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0.0,
+          config: Optional[FakeConfig] = None) -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer((host, port), FakeUpstreamHandler)
+    server.daemon_threads = True
+    server.config = config or FakeConfig(latency=f'fixed:{latency_ms}')
+    windows: Dict[str, RateWindow] = {}
+    windows_lock = threading.Lock()
+
+    def limits(api_key: str) -> RateWindow:
+        with windows_lock:
+            window = windows.get(api_key)
+            if window is None:
+                window = windows[api_key] = RateWindow(server.config.rpm, server.config.tpm)
+            return window
+
+    server.limits = limits
+    server.payments = PaymentStore()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def fake_environment(base_url: str) -> Dict[str, str]:
+    return {
+        'OPENAI_BASE_URL': f'{base_url}/v1',
+        'OPENAI_API_KEY': 'fake',
+        'YOOKASSA_API_URL': f'{base_url}/v3',
+        'YOOKASSA_SHOP_ID': '1',
+        'YOOKASSA_SECRET_KEY': 'fake',
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser, prefix: str = '') -> None:
+    '''Adds the FakeConfig options; loadgen uses prefix="upstream-".'''
+    add = lambda name, **kw: parser.add_argument(f'--{prefix}{name}', **kw)
+    add('latency', default=None, help='time to first byte: MS, fixed:MS, uniform:LO:HI, normal:MEAN:SD, '
+                                      'lognormal:MEDIAN:SIGMA')
+    add('token-ms', type=float, default=0.0, help='generation time per completion token')
+    add('answer-tokens', type=int, default=60, help='completion length before max_tokens applies')
+    add('error-rate', type=float, default=0.0, help='share of requests answered 500')
+    add('rate-limit-rate', type=float, default=0.0, help='share of requests answered 429')
+    add('retry-after', type=float, default=1.0, help='Retry-After seconds on 429')
+    add('rpm', type=int, default=0, help='chat requests per minute and key before 429 (0: unlimited)')
+    add('tpm', type=int, default=0, help='chat tokens per minute and key before 429 (0: unlimited)')
+    add('seed', type=int, default=None)
+    add('payment-status', default='pending', choices=('pending', 'waiting_for_capture', 'succeeded', 'canceled'))
+    add('record', default=None, help='append proxied responses to this JSONL file')
+    add('replay', default=None, help='answer from a file written by --record')
+    add('replay-strict', action='store_true', help='404 for requests missing from --replay')
+    add('proxy-openai', default=None, help='real OpenAI base URL for --record')
+    add('proxy-yookassa', default=None, help='real YooKassa base URL for --record')
+
+
+def config_from_args(args: argparse.Namespace, prefix: str = '', latency_ms: float = 0.0) -> FakeConfig:
+    get = lambda name: getattr(args, (prefix + name).replace('-', '_'))
+    return FakeConfig(latency=get('latency') or str(latency_ms), token_ms=get('token-ms'),
+                      answer_tokens=get('answer-tokens'), error_rate=get('error-rate'),
+                      rate_limit_rate=get('rate-limit-rate'), retry_after_s=get('retry-after'), rpm=get('rpm'),
+                      tpm=get('tpm'), seed=get('seed'), payment_status=get('payment-status'),
+                      record=get('record'), replay=get('replay'), replay_strict=get('replay-strict'),
+                      proxy_openai=get('proxy-openai'), proxy_yookassa=get('proxy-yookassa'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='same as --latency MS')
+    add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        config = config_from_args(args, latency_ms=args.latency_ms)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    server, url = start(args.host, args.port, config=config)
+    print(f'fake upstreams on {url}')
+    for key, value in fake_environment(url).items():
+        print(f'  {key}={value}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+'''
+Helpers for driving the cloud functions outside the hosting platform.
+
+Function directories are put on sys.path so their vendored modules
+(runtime.py and friends) resolve the same way they do when deployed. Shared
+module names are identical copies, and function-specific modules must use
+names that are unique across backend/.
+'''
+import importlib.util
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+BACKEND = Path(__file__).resolve().parent.parent / 'backend'
+FUNC2URL: Dict[str, str] = json.loads((BACKEND / 'func2url.json').read_text(encoding='utf-8'))
+# function directories; ones added since the last deploy are not in func2url.json yet
+FUNCTIONS = sorted(path.parent.name for path in BACKEND.glob('*/index.py'))
+
+Handler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+# tools replay the same user and IP thousands of times a second; export
+# RATE_LIMITS (JSON limits, see backend/_shared/ratelimit.py) to exercise the limiter
+os.environ.setdefault('RATE_LIMITS', 'off')
+
+_loaded: Dict[str, Any] = {}
+
+
+class Context:
+    '''Minimal stand-in for the platform context object.'''
+
+    def __init__(self, request_id: Optional[str] = None, function_name: str = ''):
+        self.request_id = request_id or str(uuid.uuid4())
+        self.function_name = function_name
+        self.memory_limit_in_mb = 128
+
+
+def load_module(name: str) -> Any:
+    if name in _loaded:
+        return _loaded[name]
+    fn_dir = BACKEND / name
+    if str(fn_dir) not in sys.path:
+        sys.path.insert(0, str(fn_dir))
+    module_name = 'fn_' + name.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, fn_dir / 'index.py')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    _loaded[name] = module
+    return module
+
+
+def load_handler(name: str) -> Handler:
+    return load_module(name).handler
+
+
+def make_event(method: str = 'POST', body: Any = None, headers: Optional[Dict[str, str]] = None,
+               query: Optional[Dict[str, str]] = None, path: str = '/') -> Dict[str, Any]:
+    if body is not None and not isinstance(body, str):
+        body = json.dumps(body, ensure_ascii=False)
+    return {
+        'httpMethod': method,
+        'path': path,
+        'headers': dict(headers or {}),
+        'queryStringParameters': dict(query or {}),
+        'body': body,
+        'isBase64Encoded': False,
+        'requestContext': {'identity': {'sourceIp': '127.0.0.1'}}
+    }
+
+
+def load_tests(name: str) -> list:
+    path = BACKEND / name / 'tests.json'
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding='utf-8')).get('tests', [])
@@ -0,0 +1,158 @@
+'''
+Worst-case latency of simple-ai under hostile and random input.
+
+Sends adversarial messages of up to SIMPLE_AI_MAX_MESSAGE_CHARS through the
+full handler (long digit runs, unclosed "(1(1(1...", thousands of operands,
+huge numbers, degenerate equations and systems) followed by --random
+messages drawn from the characters the router reacts to. Every response
+must be 200 (400 for a blank message), never 500, and the slowest call
+must stay under --max-ms. Over-long messages must be refused with 413, and
+a request that runs out of CPU budget must still get the polite answer.
+
+With --legacy the regexes this replaced are timed on the same inputs, to
+show what the limits protect against.
+
+    python tools/fuzz_simple_ai.py
+    python tools/fuzz_simple_ai.py --random 20000 --max-ms 20 --legacy
+'''
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from functions import Context, load_module, make_event
+
+ALPHABET = '0123456789' * 4 + '+-*/×÷:^=()., \nxyz' * 2 + 'привет уравнение что такое hello'
+
+LEGACY_PATTERNS = [
+    r'\d+\s*[+\-×x*÷/]\s*\d+',
+    r'\(\d+.*?\)',
+    r'\d+\s*\^\s*\d+',
+    r'(\d+)\s*\+\s*(\d+)',
+]
+
+
+def adversarial(limit: int) -> List[Tuple[str, str]]:
+    '''(label, message) pairs sized to just fit the message limit.'''
+    def fill(unit: str, tail: str = '') -> str:
+        return (unit * (limit // len(unit) + 1))[:limit - len(tail)] + tail
+
+    return [
+        ('digit run', fill('1')),
+        ('digit run + letter', fill('1', 'a')),
+        ('digits and spaces', fill('1' + ' ' * 40, 'a')),
+        ('unclosed parens', fill('(1')),
+        ('unclosed parens per line', fill('(1' * 30 + '\n')),
+        ('operator chain', fill('7+')),
+        ('product chain', fill('999999999999999*')),
+        ('huge operands', fill('9', '+1')),
+        ('powers', fill('2^')),
+        ('equation, long terms', fill('+x', '=0')),
+        ('equation, huge power', 'x^' + fill('9')[:limit - 6] + '=1'),
+        ('equation, huge number', fill('9', 'x=1')),
+        ('system, many equations', fill('x+y=1,')),
+        ('system, degenerate', fill('x+y+z=1;')),
+        ('equation keyword + noise', 'уравнение ' + fill('x^2-')[:limit - 11]),
+        ('topic words', fill('что такое гравитация история счастье ')),
+        ('typos', fill('гравитацыя истрия щастье ')),
+    ]
+
+
+def timed_call(handler: Callable, message: str, lang: str) -> Tuple[int, float]:
+    event = make_event('POST', {'message': message, 'language': lang})
+    started = time.perf_counter()
+    response = handler(event, Context())
+    return response['statusCode'], (time.perf_counter() - started) * 1000
+
+
+def legacy_ms(message: str) -> float:
+    started = time.perf_counter()
+    for pattern in LEGACY_PATTERNS:
+        re.search(pattern, message)
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--random', type=int, default=5000, help='random messages after the adversarial set')
+    parser.add_argument('--max-ms', type=float, default=25.0, help='fail if any call takes longer')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--legacy', action='store_true', help='also time the replaced regexes')
+    args = parser.parse_args()
+
+    module = load_module('simple-ai')
+    handler = module.handler
+    limit = module.MAX_MESSAGE_CHARS
+    failures: List[str] = []
+
+    # warm every lazy table so the first adversarial case does not pay for imports
+    for warm in ('привет', 'что такое гравитация', 'гравитацыя', 'x^3 - 1 = 0', 'x + y = 2, x - y = 0', 'hello'):
+        timed_call(handler, warm, 'ru')
+
+    rows: List[Tuple[str, int, float, float, Any]] = []
+    for label, message in adversarial(limit):
+        for lang in ('ru', 'en'):
+            worst, status = 0.0, 0
+            for _ in range(3):
+                status, ms = timed_call(handler, message, lang)
+                worst = max(worst, ms)
+            legacy = legacy_ms(message) if args.legacy and lang == 'ru' else None
+            rows.append((f'{label} [{lang}]', len(message), worst, status, legacy))
+            if status != 200:
+                failures.append(f'{label} [{lang}]: status {status}')
+
+    for size in (limit + 1, limit * 10):
+        status, ms = timed_call(handler, '1' * size, 'ru')
+        rows.append((f'over limit ({size} chars)', size, ms, status, None))
+        if status != 413:
+            failures.append(f'over limit ({size} chars): status {status}, expected 413')
+
+    budget = sys.modules['budget']
+    with budget.cpu_budget(0):
+        exhausted = module.process_smart_query('(25 × 4) + 120 / 6', 'ru')
+    rows.append(('cpu budget exhausted', 18, 0.0, 200 if exhausted is module.pack('ru').TOO_COMPLEX else 500, None))
+    if exhausted is not module.pack('ru').TOO_COMPLEX:
+        failures.append(f'cpu budget exhausted: got {exhausted[:60]!r}, expected pack_ru.TOO_COMPLEX')
+
+    rng = random.Random(args.seed)
+    random_ms: List[float] = []
+    statuses: Dict[int, int] = {}
+    slowest = ('', 0.0)
+    for _ in range(args.random):
+        size = min(limit, int(rng.expovariate(1 / 200)) + 1)
+        message = ''.join(rng.choice(ALPHABET) for _ in range(size))
+        status, ms = timed_call(handler, message, rng.choice(('ru', 'en')))
+        statuses[status] = statuses.get(status, 0) + 1
+        random_ms.append(ms)
+        if ms > slowest[1]:
+            slowest = (message, ms)
+        if status not in (200, 400):
+            failures.append(f'random message -> status {status}: {json.dumps(message[:80], ensure_ascii=False)}')
+
+    print(f'message limit {limit} chars, cpu budget {budget.BUDGET_MS:g} ms\n')
+    print(f'{"case":<44}{"chars":>7}{"max ms":>9}{"status":>8}' + (f'{"legacy ms":>11}' if args.legacy else ''))
+    for label, size, ms, status, legacy in rows:
+        extra = f'{legacy:>11.1f}' if legacy is not None else ''
+        print(f'{label:<44}{size:>7}{ms:>9.2f}{status:>8}{extra}')
+    random_ms.sort()
+    print(f'\nrandom messages: {len(random_ms)}, statuses {statuses}')
+    print(f'  p50 {random_ms[len(random_ms) // 2]:.3f} ms  p99 {random_ms[int(len(random_ms) * 0.99)]:.3f} ms  '
+          f'max {random_ms[-1]:.3f} ms')
+
+    worst = max([ms for _, _, ms, _, _ in rows] + random_ms)
+    if worst > args.max_ms:
+        failures.append(f'slowest call took {worst:.2f} ms (limit {args.max_ms:g} ms)')
+        if random_ms[-1] == worst:
+            failures.append(f'  slowest random message: {json.dumps(slowest[0][:120], ensure_ascii=False)}')
+    if failures:
+        print('\nFAILED:', *failures, sep='\n  ', file=sys.stderr)
+        return 1
+    print(f'\nok: every call under {args.max_ms:g} ms, no server errors')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+'''
+Load generator that replays backend/<fn>/tests.json at volume.
+
+Each request is drawn from the selected functions' tests.json files and its
+response is checked against expectedStatus / expectedBody while the run is
+in progress. Targets are the handlers in-process or a server started with
+tools/serve.py.
+
+    python tools/loadgen.py --concurrency 16 --duration 10
+    python tools/loadgen.py --target http://127.0.0.1:8000 --rate 500 --duration 30
+    python tools/loadgen.py --functions ai-chat,create-payment --fake-upstreams --upstream-latency-ms 400
+    python tools/loadgen.py --functions ai-chat --fake-upstreams --upstream-latency lognormal:300:0.5 \
+        --upstream-token-ms 8 --upstream-rate-limit-rate 0.05 --upstream-seed 1
+
+Without --rate the run is closed-loop: every worker sends its next request as
+soon as the previous one completes. With --rate arrivals follow a Poisson
+schedule regardless of how fast responses come back (open loop), and latency
+is measured from the scheduled start, so queueing delay is counted.
+
+--fake-upstreams starts tools/fake_upstreams.py in-process and points OpenAI
+and YooKassa at it; every fake_upstreams option is available with an
+--upstream- prefix. With --target the server must be started with the same
+environment.
+
+A test may list the environment it needs in "requiresEnv" (the
+payment-webhook cases that queue a succeeded payment need DATABASE_URL).
+When a variable is unset its tests are skipped and reported as skipped,
+not run into a 503:
+
+    DATABASE_URL=postgresql://... python tools/loadgen.py --fake-upstreams   # every case
+'''
+import argparse
+import base64
+import bisect
+import http.client
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from functions import FUNCTIONS, Context, load_handler, load_tests, make_event
+
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+TYPE_PLACEHOLDERS = {
+    'string': lambda v: isinstance(v, str),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+}
+
+
+def body_matches(expected: Any, actual: Any, partial: bool) -> bool:
+    if isinstance(expected, str) and expected in TYPE_PLACEHOLDERS:
+        return TYPE_PLACEHOLDERS[expected](actual)
+    if isinstance(expected, dict):
+        if not isinstance(actual, dict):
+            return False
+        if not partial and set(expected) != set(actual):
+            return False
+        return all(key in actual and body_matches(value, actual[key], partial)
+                   for key, value in expected.items())
+    if isinstance(expected, list):
+        return (isinstance(actual, list) and len(expected) == len(actual)
+                and all(body_matches(e, a, partial) for e, a in zip(expected, actual)))
+    return expected == actual
+
+
+def check(test: Dict[str, Any], status: int, body: str) -> Optional[str]:
+    if status != test.get('expectedStatus', 200):
+        return f'status {status} (expected {test.get("expectedStatus", 200)})'
+    if 'expectedBody' not in test:
+        return None
+    try:
+        actual = json.loads(body) if body else None
+    except ValueError:
+        return 'body is not JSON'
+    if not body_matches(test['expectedBody'], actual, test.get('bodyMatcher', 'partial') == 'partial'):
+        return 'body mismatch'
+    return None
+
+
+class Scenario:
+    def __init__(self, function: str, test: Dict[str, Any]):
+        self.function = function
+        self.test = test
+        self.body = None if test.get('body') is None else json.dumps(test['body'], ensure_ascii=False)
+
+
+class InProcessTarget:
+    def __init__(self, functions: List[str]):
+        self.handlers = {name: load_handler(name) for name in functions}
+
+    def send(self, scenario: Scenario) -> Tuple[int, str]:
+        test = scenario.test
+        event = make_event(test['method'], scenario.body, test.get('headers'), path=test.get('path', '/'))
+        result = self.handlers[scenario.function](event, Context(function_name=scenario.function))
+        body = result.get('body') or ''
+        if result.get('isBase64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', 'replace')
+        return result.get('statusCode', 200), body
+
+
+class HttpTarget:
+    def __init__(self, base_url: str, timeout: float):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.local.conn = conn
+        return conn
+
+    def send(self, scenario: Scenario) -> Tuple[int, str]:
+        test = scenario.test
+        path = f'{self.prefix}/{scenario.function}{test.get("path", "/")}'
+        headers = {'Content-Type': 'application/json', **test.get('headers', {})}
+        body = scenario.body.encode('utf-8') if scenario.body is not None else None
+        conn = self._connection()
+        try:
+            conn.request(test['method'], path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read().decode('utf-8', 'replace')
+        except Exception:
+            conn.close()
+            self.local.conn = None
+            raise
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+
+    def record(self, function: str, latency_ms: float, error: Optional[str]) -> None:
+        with self.lock:
+            self.latencies.setdefault(function, []).append(latency_ms)
+            if error:
+                per_fn = self.errors.setdefault(function, {})
+                per_fn[error] = per_fn.get(error, 0) + 1
+
+
+def execute(target: Any, scenario: Scenario, started: float, stats: Stats) -> None:
+    try:
+        status, body = target.send(scenario)
+        error = check(scenario.test, status, body)
+    except Exception as e:
+        error = f'exception: {type(e).__name__}'
+    stats.record(scenario.function, (time.perf_counter() - started) * 1000, error)
+
+
+def run_closed(target: Any, scenarios: List[Scenario], concurrency: int, duration: float,
+               stats: Stats, seed: int) -> None:
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed + index)
+        while time.perf_counter() < deadline:
+            execute(target, rng.choice(scenarios), time.perf_counter(), stats)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_open(target: Any, scenarios: List[Scenario], concurrency: int, duration: float,
+             rate: float, stats: Stats, seed: int) -> int:
+    rng = random.Random(seed)
+    pending: 'queue.Queue[Optional[Tuple[Scenario, float]]]' = queue.Queue()
+
+    def worker() -> None:
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            execute(target, item[0], item[1], stats)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+
+    start = time.perf_counter()
+    scheduled = start
+    sent = 0
+    while scheduled - start < duration:
+        scheduled += rng.expovariate(rate)
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        pending.put((rng.choice(scenarios), scheduled))
+        sent += 1
+    for _ in threads:
+        pending.put(None)
+    for t in threads:
+        t.join()
+    return sent
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def print_report(stats: Stats, elapsed: float) -> None:
+    total = sum(len(v) for v in stats.latencies.values())
+    print(f'\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)')
+    for function in sorted(stats.latencies):
+        values = sorted(stats.latencies[function])
+        errors = stats.errors.get(function, {})
+        failed = sum(errors.values())
+        print(f'\n== {function}: {len(values)} requests, {len(values) / elapsed:.1f} req/s, '
+              f'{failed} errors ({failed / len(values):.1%})')
+        print(f'   p50 {percentile(values, 50):.2f} ms  p90 {percentile(values, 90):.2f} ms  '
+              f'p99 {percentile(values, 99):.2f} ms  max {values[-1]:.2f} ms')
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for value in values:
+            counts[bisect.bisect_left(BUCKETS_MS, value)] += 1
+        peak = max(counts)
+        for i, count in enumerate(counts):
+            if not count:
+                continue
+            label = f'<= {BUCKETS_MS[i]:g} ms' if i < len(BUCKETS_MS) else f'> {BUCKETS_MS[-1]:g} ms'
+            print(f'   {label:>12} {count:>8} {"#" * max(1, round(40 * count / peak))}')
+        for error, count in sorted(errors.items(), key=lambda kv: -kv[1]):
+            print(f'   error: {error}: {count}')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', default=','.join(FUNCTIONS))
+    parser.add_argument('--target', default='inproc', help='"inproc" or base URL of tools/serve.py')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=0.0, help='open-loop arrivals per second')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    parser.add_argument('--timeout', type=float, default=30.0, help='HTTP timeout, seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--fake-upstreams', action='store_true')
+    parser.add_argument('--upstream-latency-ms', type=float, default=0.0)
+    import fake_upstreams
+    fake_upstreams.add_arguments(parser, prefix='upstream-')
+    args = parser.parse_args()
+
+    functions = [n for n in args.functions.split(',') if n]
+    if args.fake_upstreams:
+        config = fake_upstreams.config_from_args(args, prefix='upstream-', latency_ms=args.upstream_latency_ms)
+        _, url = fake_upstreams.start(config=config)
+        os.environ.update(fake_upstreams.fake_environment(url))
+
+    scenarios, skipped = [], []
+    for fn in functions:
+        for test in load_tests(fn):
+            missing = [name for name in test.get('requiresEnv', []) if not os.environ.get(name)]
+            if missing:
+                skipped.append(f'{fn}: {test.get("name", "")} (needs {", ".join(missing)})')
+            else:
+                scenarios.append(Scenario(fn, test))
+    for line in skipped:
+        print(f'skipped {line}')
+    if not scenarios:
+        parser.error('no tests.json scenarios for the selected functions')
+
+    target = InProcessTarget(functions) if args.target == 'inproc' else HttpTarget(args.target, args.timeout)
+    stats = Stats()
+    started = time.perf_counter()
+    if args.rate > 0:
+        run_open(target, scenarios, args.concurrency, args.duration, args.rate, stats, args.seed)
+    else:
+        run_closed(target, scenarios, args.concurrency, args.duration, stats, args.seed)
+    print_report(stats, time.perf_counter() - started)
+    return 1 if stats.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
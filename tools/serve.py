@@ -0,0 +1,334 @@
+'''
+Self-hosted server mode for the cloud functions (Linux, pre-fork).
+
+Maps HTTP requests onto the platform event/context shape and calls the
+unchanged handler(event, context). Routes come from backend/func2url.json:
+every function answers on /<name> and on the path of its platform URL, so a
+client only has to swap the host.
+
+    python tools/serve.py --bind 0.0.0.0:8000 --workers 4
+    python tools/serve.py --functions simple-ai,ai-chat --concurrency ai-chat=64
+
+The master imports the handlers, binds the socket and forks workers that
+share it, so caches and imports stay warm for the life of a worker. Each
+worker serves connections on threads, but a per-function semaphore caps how
+many run at once: CPU-bound functions default to one per process (scale with
+--workers), ai-chat spends its time waiting on the upstream and defaults to
+many.
+
+Connections are kept alive between requests for --keepalive seconds. A
+draining worker answers with Connection: close and shuts idle connections
+down, so it exits as soon as its in-flight requests are done.
+
+Signals (to the master):
+    HUP         graceful restart - start fresh workers, drain the old ones
+    TERM / INT  graceful stop - stop accepting, finish in-flight requests
+'''
+import argparse
+import base64
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from functions import FUNC2URL, FUNCTIONS, Context, load_handler
+
+DEFAULT_CONCURRENCY = {'ai-chat': 64}
+DEFAULT_KEEPALIVE = 5.0
+
+
+class Route:
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.handler = load_handler(name)
+        self.slots = threading.BoundedSemaphore(limit)
+
+
+def build_routes(names: List[str], concurrency: Dict[str, int]) -> Dict[str, Route]:
+    routes: Dict[str, Route] = {}
+    for name in names:
+        route = Route(name, concurrency.get(name, DEFAULT_CONCURRENCY.get(name, 1)))
+        routes[name] = route
+        url_path = urlsplit(FUNC2URL.get(name, '')).path.strip('/')
+        if url_path:
+            routes[url_path] = route
+    return routes
+
+
+def build_event(method: str, path: str, headers: Dict[str, str], body: bytes,
+                client_ip: str, request_id: str) -> Dict[str, Any]:
+    url = urlsplit(path)
+    try:
+        text, is_b64 = body.decode('utf-8'), False
+    except UnicodeDecodeError:
+        text, is_b64 = base64.b64encode(body).decode('ascii'), True
+    return {
+        'httpMethod': method,
+        'path': url.path,
+        'url': path,
+        'headers': headers,
+        'queryStringParameters': dict(parse_qsl(url.query)),
+        'body': text,
+        'isBase64Encoded': is_b64,
+        'requestContext': {
+            'requestId': request_id,
+            'identity': {'sourceIp': client_ip}
+        }
+    }
+
+
+class FunctionRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'neuropulse-serve'
+    disable_nagle_algorithm = True
+    routes: Dict[str, Route] = {}
+    # idle keep-alive connections and slow clients give up after this; set from --keepalive
+    timeout = DEFAULT_KEEPALIVE
+
+    def handle_one_request(self) -> None:
+        # waiting for the next request line: a draining server may shut this connection down
+        if not self.server.mark_idle(self.connection):
+            self.close_connection = True
+            return
+        super().handle_one_request()
+
+    def parse_request(self) -> bool:
+        self.server.mark_busy(self.connection)
+        return super().parse_request()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.access_log:
+            sys.stderr.write(f'[{os.getpid()}] {self.address_string()} {format % args}\n')
+
+    def _dispatch(self) -> None:
+        segments = urlsplit(self.path).path.strip('/').split('/', 1)
+        route = self.routes.get(segments[0])
+        if route is None:
+            self._send(404, {'Content-Type': 'application/json'}, b'{"error":"Unknown function"}')
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        request_id = str(uuid.uuid4())
+        event = build_event(self.command, self.path, dict(self.headers.items()), body,
+                            self.client_address[0], request_id)
+        context = Context(request_id, route.name)
+
+        with route.slots:
+            try:
+                result = route.handler(event, context)
+            except Exception as e:
+                self._send(502, {'Content-Type': 'application/json'},
+                           f'{{"error":"Unhandled exception: {type(e).__name__}"}}'.encode())
+                return
+
+        payload = result.get('body') or ''
+        if result.get('isBase64Encoded'):
+            raw = base64.b64decode(payload)
+        else:
+            raw = payload.encode('utf-8') if isinstance(payload, str) else payload
+        self._send(result.get('statusCode', 200), result.get('headers') or {}, raw)
+
+    def _send(self, status: int, headers: Dict[str, str], raw: bytes) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            if key.lower() != 'content-length':
+                self.send_header(key, str(value))
+        self.send_header('Content-Length', str(len(raw)))
+        if self.server.draining:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(raw)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_HEAD = _dispatch
+
+
+class WorkerServer(ThreadingHTTPServer):
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, sock: socket.socket, access_log: bool, max_requests: int):
+        super().__init__(sock.getsockname()[:2], FunctionRequestHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = sock
+        self.access_log = access_log
+        self.max_requests = max_requests
+        self.served = 0
+        self.draining = False
+        self._idle: Dict[socket.socket, bool] = {}
+        self._idle_lock = threading.Lock()
+
+    def mark_idle(self, connection: socket.socket) -> bool:
+        '''False once draining: the connection should close instead of waiting.'''
+        with self._idle_lock:
+            if self.draining:
+                self._idle.pop(connection, None)
+                return False
+            self._idle[connection] = True
+            return True
+
+    def mark_busy(self, connection: socket.socket) -> None:
+        with self._idle_lock:
+            self._idle[connection] = False
+
+    def shutdown_request(self, request: Any) -> None:
+        with self._idle_lock:
+            self._idle.pop(request, None)
+        super().shutdown_request(request)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        super().process_request(request, client_address)
+        self.served += 1
+        if self.max_requests and self.served == self.max_requests:
+            self.stop()
+
+    def stop(self, *_: Any) -> None:
+        with self._idle_lock:
+            self.draining = True
+            idle = [connection for connection, waiting in self._idle.items() if waiting]
+        # the handler blocked reading the next request line sees end of stream and returns
+        for connection in idle:
+            try:
+                connection.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        # shutdown() blocks until serve_forever returns, so it cannot run on
+        # the thread that is serving (or inside a signal handler on it)
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def run_worker(sock: socket.socket, access_log: bool, max_requests: int) -> None:
+    server = WorkerServer(sock, access_log, max_requests)
+    signal.signal(signal.SIGTERM, server.stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    server.serve_forever(poll_interval=0.2)
+    server.server_close()
+
+
+class Master:
+    def __init__(self, sock: socket.socket, workers: int, access_log: bool,
+                 max_requests: int, graceful_timeout: float):
+        self.sock = sock
+        self.size = workers
+        self.access_log = access_log
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.workers: Dict[int, int] = {}
+        self.generation = 0
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(self.sock, self.access_log, self.max_requests)
+            finally:
+                os._exit(0)
+        self.workers[pid] = self.generation
+
+    def reap(self) -> List[Tuple[int, int]]:
+        exited = []
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            exited.append((pid, self.workers.pop(pid, -1)))
+        return exited
+
+    def signal_workers(self, sig: int, generation: Optional[int] = None) -> None:
+        for pid, gen in list(self.workers.items()):
+            if generation is None or gen == generation:
+                try:
+                    os.kill(pid, sig)
+                except ProcessLookupError:
+                    pass
+
+    def reload(self) -> None:
+        old = self.generation
+        self.generation += 1
+        for _ in range(self.size):
+            self.spawn()
+        self.signal_workers(signal.SIGTERM, old)
+        print(f'[master] reloaded: generation {self.generation}', file=sys.stderr)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, 'reload_requested', True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, 'stopping', True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, 'stopping', True))
+
+        for _ in range(self.size):
+            self.spawn()
+
+        while not self.stopping:
+            time.sleep(0.2)
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            for pid, gen in self.reap():
+                current = sum(1 for g in self.workers.values() if g == self.generation)
+                if not self.stopping and gen == self.generation and current < self.size:
+                    self.spawn()
+
+        self.signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        self.signal_workers(signal.SIGKILL)
+        self.reap()
+
+
+def parse_concurrency(values: List[str]) -> Dict[str, int]:
+    result = {}
+    for value in values:
+        name, _, limit = value.partition('=')
+        result[name] = int(limit)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bind', default='127.0.0.1:8000')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--functions', default=','.join(FUNCTIONS),
+                        help='comma-separated function names (default: all)')
+    parser.add_argument('--concurrency', action='append', default=[], metavar='NAME=N',
+                        help='max concurrent requests per worker for a function')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='recycle a worker after this many connections (0 = never)')
+    parser.add_argument('--graceful-timeout', type=float, default=30.0)
+    parser.add_argument('--keepalive', type=float, default=DEFAULT_KEEPALIVE,
+                        help='seconds an idle connection is kept open')
+    parser.add_argument('--access-log', action='store_true')
+    args = parser.parse_args()
+
+    names = [n for n in args.functions.split(',') if n]
+    unknown = set(names) - set(FUNCTIONS)
+    if unknown:
+        parser.error(f'unknown functions: {", ".join(sorted(unknown))}')
+
+    FunctionRequestHandler.routes = build_routes(names, parse_concurrency(args.concurrency))
+    FunctionRequestHandler.timeout = args.keepalive
+
+    host, _, port = args.bind.rpartition(':')
+    sock = socket.create_server((host or '0.0.0.0', int(port)), backlog=1024, reuse_port=False)
+    print(f'[master] {os.getpid()} serving {", ".join(names)} on {args.bind} '
+          f'with {args.workers} workers', file=sys.stderr)
+    Master(sock, args.workers, args.access_log, args.max_requests, args.graceful_timeout).run()
+    sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+'''
+Vendors backend/_shared modules into the function directories that use them.
+
+Each cloud function is deployed from its own directory, so shared code has to
+be copied next to index.py. Run after editing anything in backend/_shared:
+
+    python tools/sync_shared.py          # write copies
+    python tools/sync_shared.py --check  # exit 1 if a copy is stale (CI)
+'''
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / 'backend'
+SHARED = BACKEND / '_shared'
+
+# every function directory, deployed (func2url.json) or not yet
+ALL_FUNCTIONS = sorted(path.parent.name for path in BACKEND.glob('*/index.py'))
+
+# shared module -> functions that import it
+VENDORED = {
+    'runtime.py': ALL_FUNCTIONS,
+    'timing.py': ALL_FUNCTIONS,
+    'compression.py': ['ai-chat', 'simple-ai'],
+    'stemmer.py': ['ai-chat', 'simple-ai'],
+    'intents.py': ['ai-chat', 'simple-ai'],
+    'query_class.py': ['ai-chat', 'simple-ai'],
+    'ratelimit.py': ['ai-chat', 'login', 'simple-ai'],
+    'session_token.py': ['ai-chat', 'chat-history', 'login', 'simple-ai'],
+    'chat_log.py': ['ai-chat', 'simple-ai'],
+    'profiling.py': ['ai-chat', 'simple-ai'],
+    'crediting.py': ['payment-webhook', 'reconcile-payments'],
+    'yookassa.py': ['payment-webhook', 'reconcile-payments'],
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--check', action='store_true', help='only report stale copies')
+    args = parser.parse_args()
+
+    stale = []
+    for module, functions in VENDORED.items():
+        source = (SHARED / module).read_bytes()
+        for fn in functions:
+            target = BACKEND / fn / module
+            if target.exists() and target.read_bytes() == source:
+                continue
+            stale.append(target.relative_to(BACKEND.parent))
+            if not args.check:
+                target.write_bytes(source)
+
+    verb = 'stale' if args.check else 'updated'
+    for path in stale:
+        print(f'{verb}: {path}')
+    return 1 if args.check and stale else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())